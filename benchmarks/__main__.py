@@ -0,0 +1,89 @@
+"""
+Run the benchmark suites and compare them with a stored baseline.
+
+poetry run python -m benchmarks [catalog] [cascade] [parser] [fetch] [lookups]
+poetry run python -m benchmarks --save-baseline
+
+Exits with status 1 if a benchmark got slower or uses more memory than the baseline
+by more than the tolerance. Baselines are machine specific, save one before changing
+the code and compare on the same machine.
+"""
+
+import argparse
+import importlib
+import sys
+
+from benchmarks.harness import (
+    DEFAULT_BASELINE,
+    DEFAULT_TOLERANCE,
+    HEADER,
+    BenchResult,
+    SkipBenchmark,
+    compare,
+    load_baseline,
+    run_case,
+    save_baseline,
+)
+
+SUITES = {
+    "catalog": "benchmarks.bench_catalog",
+    "cascade": "benchmarks.bench_ui_cascade",
+    "parser": "benchmarks.bench_driver_page_parser",
+    "fetch": "benchmarks.bench_fetch_urls",
+    "lookups": "benchmarks.bench_http_engine",
+}
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="benchmarks", description=__doc__.strip())
+    parser.add_argument("suites", nargs="*", help=f"Any of {', '.join(SUITES)}")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Store the results as new baseline instead of comparing",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help="Allowed relative slowdown or memory growth, 0.25 means 25%%",
+    )
+    args = parser.parse_args(argv)
+    if unknown := set(args.suites) - set(SUITES):
+        parser.error(f"unknown suites: {', '.join(sorted(unknown))}")
+
+    baseline = load_baseline(args.baseline)
+    results: list[BenchResult] = []
+    regressions = 0
+    print(HEADER)
+    for suite_name in args.suites or SUITES:
+        try:
+            cases = importlib.import_module(SUITES[suite_name]).suite()
+        except (ImportError, SkipBenchmark) as e:
+            print(f"{suite_name}: skipped, {e}")
+            continue
+        for case in cases:
+            result = run_case(case)
+            results.append(result)
+            if args.save_baseline:
+                print(result.row())
+                continue
+            note, regression = compare(
+                result, baseline.get(result.name), args.tolerance
+            )
+            regressions += regression
+            print(f"{result.row()}  {note}")
+
+    if args.save_baseline:
+        save_baseline(
+            list({**baseline, **{r.name: r for r in results}}.values()), args.baseline
+        )
+        print(f"Saved baseline to {args.baseline}")
+    elif not baseline:
+        print(f"No baseline at {args.baseline}, store one with --save-baseline")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""
+DropdownData load time and lookups for every catalog backend.
+
+poetry run python -m benchmarks catalog
+"""
+
+import os
+import tempfile
+
+from benchmarks.harness import BenchCase
+from pyvidia_update.source.catalog_jsonl import (
+    leaves_from_catalog,
+    write_catalog_jsonl,
+)
+from pyvidia_update.source.get_data import DropdownData
+from pyvidia_update.source.name_index import ProductNameIndex
+
+_MISSING = os.path.join(tempfile.gettempdir(), "pyvidia-benchmark-missing")
+
+
+class _MappedData(DropdownData):
+    jsonl_data_path = _MISSING
+    pickle_data_path = _MISSING
+
+
+class _PickleData(DropdownData):
+    catalog_data_path = _MISSING
+    jsonl_data_path = _MISSING
+
+
+def _jsonl_data_class(catalog) -> type[DropdownData]:
+    path = os.path.join(
+        tempfile.mkdtemp(prefix="pyvidia-benchmark-"), "catalog.jsonl.gz"
+    )
+    write_catalog_jsonl(leaves_from_catalog(catalog), path)
+
+    class _JsonlData(DropdownData):
+        catalog_data_path = _MISSING
+        jsonl_data_path = path
+        pickle_data_path = _MISSING
+
+    return _JsonlData
+
+
+def _lookup_cases(label: str, dd: DropdownData) -> list[BenchCase]:
+    paths = [record.path for record in dd.catalog]
+    nodes = sorted({path[:depth] for path in paths for depth in range(6)})
+    getters = (
+        dd.get_product_type_data,
+        dd.get_product_series_data,
+        dd.get_product_data,
+        dd.get_os_data,
+        dd.get_dt_data,
+        dd.get_language_data,
+    )
+    cases = []
+    for depth, getter in enumerate(getters):
+        level_nodes = [node for node in nodes if len(node) == depth]
+
+        def lookup(getter=getter, level_nodes=level_nodes):
+            for node in level_nodes:
+                getter(*node)
+
+        cases.append(
+            BenchCase(
+                f"{label} {getter.__name__} x{len(level_nodes)}", lookup, repeat=5
+            )
+        )
+
+    def download_links():
+        for path in paths:
+            dd.get_download_link(*path)
+
+    cases.append(BenchCase(f"{label} get_download_link x{len(paths)}", download_links))
+    return cases
+
+
+def _name_index_cases(dd: DropdownData) -> list[BenchCase]:
+    index = ProductNameIndex.from_catalog(dd.catalog)
+    # nvidia-smi style names of every product
+    products = {record.path[:3] for record in dd.catalog}
+    gpu_names = sorted({f"NVIDIA {dd.catalog.name(path)}" for path in products})
+
+    def match_all():
+        for name in gpu_names:
+            index.match(name)
+
+    return [
+        BenchCase(
+            "build product name index",
+            lambda: ProductNameIndex.from_catalog(dd.catalog),
+        ),
+        BenchCase(f"match gpu names x{len(gpu_names)}", match_all),
+    ]
+
+
+def suite() -> list[BenchCase]:
+    mapped = _MappedData()
+    pickled = _PickleData()
+    jsonl_data = _jsonl_data_class(pickled.catalog)
+    return [
+        BenchCase(
+            "load mapped catalog", lambda: _MappedData().catalog.close(), number=20
+        ),
+        BenchCase("load pickle", _PickleData),
+        BenchCase("load jsonl.gz export", jsonl_data),
+        *_lookup_cases("mapped", mapped),
+        *_lookup_cases("pickle", pickled),
+        *_name_index_cases(mapped),
+    ]
@@ -0,0 +1,152 @@
+"""
+Compare the streaming driver page extraction with the full BeautifulSoup parse.
+
+poetry run python -m benchmarks.bench_driver_page_parser [saved_page.html ...]
+
+Without arguments a synthetic page shaped like an Nvidia driver results page is used.
+The suite (python -m benchmarks parser) uses the driver pages of the replay fixtures
+in tests/fixtures/driver-pages.jsonl and any page saved to benchmarks/pages/*.html.
+"""
+
+import glob
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+from benchmarks.harness import BenchCase
+from pyvidia_update.source.driver_cache import DriverInfoCache
+from pyvidia_update.source.driver_page_parser import extract_driver_fields
+from pyvidia_update.source.get_current_driver_version import (
+    _info_from_fields,
+    _parse_driver_info,
+    get_current_driver_version,
+)
+from scraper.replay import Fixture, FixtureStore, ReplayServer
+
+CHUNK_SIZE = 16 * 1024
+REPEAT = 20
+PAGES_DIR = os.path.join(os.path.dirname(__file__), "pages")
+PAGE_FIXTURES = os.path.join(
+    os.path.dirname(__file__), "..", "tests", "fixtures", "driver-pages.jsonl"
+)
+
+
+def synthetic_page() -> bytes:
+    head = "".join(
+        f"<script>var config{i} = {{'key': 'value{i}'}};</script>\n" for i in range(400)
+    )
+    rows = "".join(
+        f"<tr><td class='label'>Field {i}</td><td>Value {i}</td></tr>\n"
+        for i in range(200)
+    )
+    tail = "".join(
+        f"<div class='footer'><p>Footer {i}</p></div>\n" for i in range(2000)
+    )
+    return (
+        f"<!DOCTYPE html><html><head>{head}</head><body><table>{rows}"
+        "<tr><td>Version:</td><td id='tdVersion'>555.85 &nbsp;<b>WHQL</b></td></tr>"
+        "<tr><td>Release Date:</td><td id='tdReleaseDate'>2024.5.21</td></tr>"
+        f"</table>{tail}</body></html>"
+    ).encode()
+
+
+def _chunks(page: bytes):
+    for start in range(0, len(page), CHUNK_SIZE):
+        yield page[start : start + CHUNK_SIZE]
+
+
+def streaming(page: bytes):
+    return _info_from_fields(extract_driver_fields(_chunks(page)))
+
+
+def soup(page: bytes):
+    return _parse_driver_info(page.decode("utf-8", errors="replace"))
+
+
+def measure(func, page: bytes) -> tuple[float, int, object]:
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        result = func(page)
+    elapsed = (time.perf_counter() - start) / REPEAT
+
+    tracemalloc.start()
+    func(page)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, result
+
+
+def recorded_pages() -> list[tuple[str, bytes]]:
+    pages = []
+    if os.path.exists(PAGE_FIXTURES):
+        store = FixtureStore(PAGE_FIXTURES)
+        for fixture in store.fixtures():
+            if "driverresults" in fixture.key:
+                # /download/driverresults.aspx/228212/en-us -> 228212-en-us
+                name = "-".join(fixture.key.split("/")[-2:])
+                pages.append((name, fixture.body))
+    for path in sorted(glob.glob(os.path.join(PAGES_DIR, "*.html"))):
+        with open(path, "rb") as f:
+            pages.append((os.path.basename(path), f.read()))
+    return pages or [("synthetic", synthetic_page())]
+
+
+def _serve_pages(pages: list[tuple[str, bytes]]) -> ReplayServer:
+    store = FixtureStore(os.path.join(tempfile.mkdtemp(), "pages.jsonl"))
+    for name, page in pages:
+        headers = {"Content-Type": "text/html; charset=utf-8"}
+        store.add(Fixture(f"/{name.lower()}", 200, headers, page))
+    server = ReplayServer(("127.0.0.1", 0), store)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def suite() -> list[BenchCase]:
+    pages = recorded_pages()
+    server = _serve_pages(pages)
+    # ttl=0 disables the cache, every call fetches and parses the page
+    cache = DriverInfoCache(
+        cache_file=os.path.join(tempfile.mkdtemp(), "cache.pkl"), ttl=0
+    )
+    cases = []
+    for name, page in pages:
+        url = f"{server.base_url}/{name}"
+        cases += [
+            BenchCase(f"parse streaming {name}", lambda page=page: streaming(page)),
+            BenchCase(f"parse soup {name}", lambda page=page: soup(page)),
+            BenchCase(
+                f"get_current_driver_version {name}",
+                lambda url=url: get_current_driver_version(url, cache=cache, proxy=""),
+                number=5,
+            ),
+        ]
+    return cases
+
+
+def main(paths: list[str]):
+    pages = []
+    for path in paths:
+        with open(path, "rb") as f:
+            pages.append((path, f.read()))
+    if not pages:
+        pages = [("synthetic", synthetic_page())]
+
+    for name, page in pages:
+        print(f"{name} ({len(page) / 1024:.0f} KiB)")
+        results = []
+        for func in (streaming, soup):
+            elapsed, peak, result = measure(func, page)
+            results.append(result)
+            print(
+                f"  {func.__name__:<10} {elapsed * 1000:8.2f} ms "
+                f"{peak / 1024:10.0f} KiB peak  {result}"
+            )
+        if results[0] != results[1]:
+            print("  WARNING: streaming and BeautifulSoup results differ")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,97 @@
+"""
+Throughput of the scraper's download url fetcher against a local replay server.
+
+poetry run python -m benchmarks fetch
+
+The replay server answers processDriver.aspx after a fixed latency, so the numbers
+show the scheduling overhead of the fetcher, its token bucket and its concurrency
+limiter, not Nvidia's response times. Importing the scraper needs selenium.
+"""
+
+import asyncio
+import os
+
+from benchmarks.harness import (
+    BenchCase,
+    SkipBenchmark,
+    replay_store,
+    start_replay_server,
+)
+from scraper.replay import Fixture, FixtureStore, fixture_key
+
+PROCESS_DRIVER_PATH = "/Download/processDriver.aspx"
+PRODUCTS = 50
+OPERATING_SYSTEMS = ("57", "135")
+LANGUAGES = ("1", "9")
+LATENCY = 0.005
+
+
+def _paths() -> list[tuple[str, ...]]:
+    return [
+        ("1", "127", str(1000 + product), osid, "1", lid)
+        for product in range(PRODUCTS)
+        for osid in OPERATING_SYSTEMS
+        for lid in LANGUAGES
+    ]
+
+
+def _url_store(paths: list[tuple[str, ...]]) -> FixtureStore:
+    """One download url per product, shared by all its OS and languages."""
+    store = replay_store()
+    for dtcid, psid, pfid, osid, dtid, lid in paths:
+        query = (
+            f"dtcid={dtcid}&psid={psid}&pfid={pfid}&osid={osid}&dtid={dtid}&lid={lid}"
+        )
+        store.add(
+            Fixture(
+                fixture_key(f"{PROCESS_DRIVER_PATH}?{query}"),
+                200,
+                {"Content-Type": "text/html"},
+                f"//us.download.nvidia.com/Windows/{pfid}/driver.exe".encode(),
+            )
+        )
+    return store
+
+
+def _tree(paths: list[tuple[str, ...]]) -> dict:
+    tree: dict = {}
+    for path in paths:
+        node = tree
+        for option_id in path:
+            node = node.setdefault(option_id, {"verbose_name": f"Option {option_id}"})
+    return tree
+
+
+def suite() -> list[BenchCase]:
+    try:
+        from scraper.nvidia_driver_dropdowns import (
+            NvidiaDriverScraper,
+            NvidiaUrlLookupParameter,
+        )
+    except ImportError as e:
+        raise SkipBenchmark(f"The scraper dependencies are required: {e}") from e
+
+    paths = _paths()
+    server = start_replay_server(_url_store(paths), latency=LATENCY)
+    data_dir = os.path.dirname(replay_store().path)
+
+    class BenchScraper(NvidiaDriverScraper):
+        json_file_path = os.path.join(data_dir, "nvidia-dropdown-values.json")
+        requests_per_second = 1_000_000
+
+    def fetch(dedupe: bool):
+        scraper = BenchScraper()
+        scraper._base_url = f"{server.base_url}{PROCESS_DRIVER_PATH}"
+        scraper.dedupe_lookups = dedupe
+        scraper.json_output = _tree(paths)
+        lookups = [NvidiaUrlLookupParameter.from_path(path) for path in paths]
+        asyncio.run(scraper._fetch_urls(lookups))
+
+    return [
+        BenchCase(f"_fetch_urls {len(paths)} lookups", lambda: fetch(False), repeat=3),
+        BenchCase(
+            f"_fetch_urls {len(paths)} lookups deduplicated",
+            lambda: fetch(True),
+            repeat=3,
+        ),
+    ]
@@ -0,0 +1,82 @@
+"""
+Throughput of the HTTP dropdown engine against a local replay server.
+
+poetry run python -m benchmarks lookups
+
+The replay server answers the lookup requests of a generated catalog after a fixed
+latency, so the numbers show the scheduling overhead of the engine and not Nvidia's
+response times.
+"""
+
+import asyncio
+import xml.etree.ElementTree as ET
+
+from benchmarks.harness import BenchCase, replay_store, start_replay_server
+from scraper.http_engine import LOOKUP_LEVELS, HttpDropdownEngine
+from scraper.replay import Fixture, FixtureStore, fixture_key
+
+LOOKUP_PATH = "/Download/API/lookupValueSearch.aspx"
+PRODUCTS = 100
+LATENCY = 0.005
+OPTIONS = {
+    "osid": {"57": "Windows 10 64-bit", "135": "Windows 11", "12": "Linux 64-bit"},
+    "dtid": {"1": "Game Ready Driver (GRD)", "18": "Studio Driver (SD)"},
+    "lid": {"1": "English (US)", "9": "Deutsch"},
+}
+
+
+def _add_lookup(store: FixtureStore, level: str, parent_id: str | None, options: dict):
+    root = ET.Element("LookupValueSearch")
+    values = ET.SubElement(root, "LookupValues")
+    for option_id, name in options.items():
+        value = ET.SubElement(values, "LookupValue", ParentID=parent_id or "0")
+        ET.SubElement(value, "Name").text = name
+        ET.SubElement(value, "Value").text = option_id
+
+    query = f"TypeID={LOOKUP_LEVELS[level].type_id}"
+    if parent_id is not None:
+        query += f"&ParentID={parent_id}"
+    store.add(
+        Fixture(
+            fixture_key(f"{LOOKUP_PATH}?{query}"),
+            200,
+            {"Content-Type": "text/xml"},
+            ET.tostring(root),
+        )
+    )
+
+
+def _lookup_store() -> FixtureStore:
+    """One product type with one series of ``PRODUCTS`` products."""
+    store = replay_store()
+    _add_lookup(store, "dtcid", None, {"1": "GeForce"})
+    _add_lookup(store, "psid", "1", {"127": "GeForce RTX 40 Series"})
+    products = {str(1000 + i): f"Product {i}" for i in range(PRODUCTS)}
+    _add_lookup(store, "pfid", "127", products)
+    for pfid in products:
+        for level, options in OPTIONS.items():
+            _add_lookup(store, level, pfid, options)
+    return store
+
+
+def suite() -> list[BenchCase]:
+    server = start_replay_server(_lookup_store(), latency=LATENCY)
+    lookups = 3 + PRODUCTS * len(OPTIONS)
+
+    def build(max_concurrency: int):
+        engine = HttpDropdownEngine(
+            lookup_url=f"{server.base_url}{LOOKUP_PATH}",
+            max_concurrency=max_concurrency,
+            requests_per_second=1_000_000,
+        )
+        asyncio.run(engine.build())
+        assert engine.requests_sent == lookups, engine.failed_lookups
+
+    return [
+        BenchCase(f"http engine {lookups} lookups", lambda: build(10), repeat=3),
+        BenchCase(
+            f"http engine {lookups} lookups sequential",
+            lambda: build(1),
+            repeat=3,
+        ),
+    ]
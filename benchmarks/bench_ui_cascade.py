@@ -0,0 +1,65 @@
+"""
+The dropdown cascade of the config window, measured on the choice lists it shows.
+
+poetry run python -m benchmarks cascade
+
+Selecting an option refills every dropdown below it with its first option and looks
+up the download link, the same steps ConfigFrame runs, but without wxPython. Only
+the choice cache and the catalog lookups are measured, not the widgets.
+"""
+
+from benchmarks.harness import BenchCase
+from pyvidia_update.source.catalog import CATALOG_LEVELS
+from pyvidia_update.source.choices import EMPTY_CHOICES, ChoiceList, ChoiceListCache
+from pyvidia_update.source.get_data import DropdownData
+
+# Every option of the product type, series and product dropdowns is selected once
+SELECTED_LEVELS = 3
+
+
+class _Cascade:
+    def __init__(self, dd: DropdownData, cache: ChoiceListCache):
+        self.dd = dd
+        self.choices = cache
+        self.selected: list[str | None] = [None] * len(CATALOG_LEVELS)
+        self.dl_link = ""
+        self.links = 0
+
+    def _get_choices(self, depth: int) -> ChoiceList:
+        path = tuple(self.selected[:depth])
+        return EMPTY_CHOICES if None in path else self.choices.get(path)
+
+    def options(self, depth: int) -> int:
+        return len(self._get_choices(depth).ids)
+
+    def select(self, depth: int, index: int):
+        """Select an option and refill the dropdowns below it, like a user would."""
+        self.selected[depth] = self._get_choices(depth).id_at(index)
+        for child_depth in range(depth + 1, len(CATALOG_LEVELS)):
+            self.selected[child_depth] = self._get_choices(child_depth).id_at(0)
+        self.dl_link = self.dd.get_download_link(*self.selected)
+        self.links += 1
+
+
+def suite() -> list[BenchCase]:
+    dd = DropdownData()
+
+    def cascade(cache: ChoiceListCache) -> int:
+        state = _Cascade(dd, cache)
+
+        def select_all(depth: int):
+            for index in range(state.options(depth)):
+                state.select(depth, index)
+                if depth + 1 < SELECTED_LEVELS:
+                    select_all(depth + 1)
+
+        select_all(0)
+        return state.links
+
+    warm_cache = ChoiceListCache(dd.catalog)
+    return [
+        BenchCase(
+            "cascade cold choice cache", lambda: cascade(ChoiceListCache(dd.catalog))
+        ),
+        BenchCase("cascade warm choice cache", lambda: cascade(warm_cache)),
+    ]
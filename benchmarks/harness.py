@@ -0,0 +1,119 @@
+"""
+Minimal benchmark harness: time and peak memory of benchmark cases, compared with a
+stored baseline.
+"""
+
+import gc
+import json
+import os
+import statistics
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from scraper.replay import FixtureStore, ReplayServer
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+DEFAULT_TOLERANCE = 0.25
+
+
+class SkipBenchmark(Exception):
+    """Raised by a suite or case whose optional dependencies are missing."""
+
+
+@dataclass
+class BenchCase:
+    name: str
+    func: Callable[[], object]
+    # Calls per timed run, the reported time is per call
+    number: int = 1
+    repeat: int = 5
+
+
+@dataclass
+class BenchResult:
+    name: str
+    best_ms: float
+    median_ms: float
+    peak_kib: float
+
+    def row(self) -> str:
+        return (
+            f"{self.name:<48} {self.best_ms:10.3f} {self.median_ms:10.3f} "
+            f"{self.peak_kib:12.0f}"
+        )
+
+
+HEADER = f"{'benchmark':<48} {'best ms':>10} {'median ms':>10} {'peak KiB':>12}"
+
+
+def replay_store() -> "FixtureStore":
+    """An empty fixture store in a new temporary directory."""
+    from scraper.replay import FixtureStore
+
+    directory = tempfile.mkdtemp(prefix="pyvidia-benchmark-")
+    return FixtureStore(os.path.join(directory, "fixtures.jsonl"))
+
+
+def start_replay_server(store: "FixtureStore", latency: float) -> "ReplayServer":
+    """Serve ``store`` on a free local port, answering after ``latency`` seconds."""
+    from scraper.replay import ReplayFaults, ReplayServer
+
+    server = ReplayServer(("127.0.0.1", 0), store, faults=ReplayFaults(latency=latency))
+    threading.Thread(
+        target=server.serve_forever, name="replay-server", daemon=True
+    ).start()
+    return server
+
+
+def run_case(case: BenchCase) -> BenchResult:
+    case.func()  # Warm up caches and lazy imports
+    timings = []
+    for _ in range(case.repeat):
+        gc.collect()
+        start = time.perf_counter()
+        for _ in range(case.number):
+            case.func()
+        timings.append((time.perf_counter() - start) / case.number)
+
+    gc.collect()
+    tracemalloc.start()
+    case.func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return BenchResult(
+        name=case.name,
+        best_ms=min(timings) * 1000,
+        median_ms=statistics.median(timings) * 1000,
+        peak_kib=peak / 1024,
+    )
+
+
+def load_baseline(path: str) -> dict[str, BenchResult]:
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return {name: BenchResult(**result) for name, result in json.load(f).items()}
+
+
+def save_baseline(results: list[BenchResult], path: str):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({result.name: asdict(result) for result in results}, f, indent=2)
+
+
+def compare(
+    result: BenchResult, baseline: BenchResult | None, tolerance: float
+) -> tuple[str, bool]:
+    """Describe the change against ``baseline`` and whether it is a regression."""
+    if baseline is None:
+        return "new", False
+    time_change = result.median_ms / baseline.median_ms - 1 if baseline.median_ms else 0
+    memory_change = result.peak_kib / baseline.peak_kib - 1 if baseline.peak_kib else 0
+    regression = time_change > tolerance or memory_change > tolerance
+    note = f"time {time_change:+.0%}, memory {memory_change:+.0%}"
+    return f"{note}  REGRESSION" if regression else note, regression
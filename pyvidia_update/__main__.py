@@ -0,0 +1,5 @@
+import sys
+
+from pyvidia_update.cli import main
+
+sys.exit(main())
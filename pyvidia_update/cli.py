@@ -0,0 +1,356 @@
+"""
+Headless update checks without any GUI dependencies.
+
+python -m pyvidia_update check [--dl-link URL ... | --dtcid .. --lid ..]
+python -m pyvidia_update profiles {list,add,remove} ...
+python -m pyvidia_update daemon [--interval SECONDS]
+python -m pyvidia_update serve [--host HOST] [--port PORT]
+python -m pyvidia_update --metrics {prometheus,json} check ...
+"""
+
+import argparse
+import datetime as dt
+import json
+import logging
+import signal
+import sys
+import threading
+
+from pyvidia_update.source.batch_check import GpuCheckResult, check_selections
+from pyvidia_update.source.get_current_driver_version import (
+    RETRYABLE_STATUSES,
+    DriverInfoStatus,
+)
+from pyvidia_update.source.metrics import metrics
+from pyvidia_update.source.scheduler import NetworkMonitor, UpdateScheduler
+from pyvidia_update.source.user_saved_data import (
+    SelectedDrivers,
+    load_profiles,
+    save_profiles,
+)
+
+logger = logging.getLogger(__name__)
+
+
+SELECTION_ARGS = {
+    "dtcid": "product_type",
+    "psid": "product_series",
+    "pfid": "product",
+    "osid": "os",
+    "dtid": "dt",
+    "lid": "language",
+}
+
+
+def _passed_selections(args: argparse.Namespace) -> list[SelectedDrivers]:
+    """Selections of the command line, one per ``--dl-link`` or the dropdown ids."""
+    selections = [
+        SelectedDrivers.from_dict({"dl_link": dl_link}) for dl_link in args.dl_link
+    ]
+    if any(getattr(args, arg) for arg in SELECTION_ARGS):
+        selections.append(
+            SelectedDrivers.from_dict(
+                {field: getattr(args, arg) for arg, field in SELECTION_ARGS.items()}
+            )
+        )
+    return selections
+
+
+def _selections_from_args(args: argparse.Namespace) -> list[SelectedDrivers]:
+    return _passed_selections(args) or load_profiles()
+
+
+def _has_selection(selection: SelectedDrivers) -> bool:
+    return bool(selection.dl_link or selection.product)
+
+
+def _saved_selections() -> list[SelectedDrivers]:
+    return [selection for selection in load_profiles() if _has_selection(selection)]
+
+
+def _detect_selections() -> list[SelectedDrivers]:
+    """Selections of the local GPUs, matched against the catalog by name."""
+    from pyvidia_update.source.get_data import DropdownData
+    from pyvidia_update.source.get_system_info import get_nvidia_gpus
+    from pyvidia_update.source.name_index import detect_selections
+
+    return detect_selections(DropdownData().catalog, get_nvidia_gpus())
+
+
+def _resolve_download_links(selections: list[SelectedDrivers]):
+    """Look up the download url of selections that only store dropdown ids."""
+    unresolved = [selection for selection in selections if not selection.dl_link]
+    if not unresolved:
+        return
+    from pyvidia_update.source.get_data import DropdownData
+
+    dd = DropdownData()
+    for selection in unresolved:
+        selection.dl_link = dd.get_download_link(
+            selection.product_type,
+            selection.product_series,
+            selection.product,
+            selection.os,
+            selection.dt,
+            selection.language,
+        )
+
+
+def _report(results: list[GpuCheckResult]) -> dict:
+    return {
+        "checked_at": dt.datetime.now(dt.UTC).isoformat(),
+        "update_available": any(result.update_available for result in results),
+        "results": [result.to_dict() for result in results],
+    }
+
+
+def run_check(args: argparse.Namespace, max_age: float | None = None) -> dict:
+    selections = _selections_from_args(args)
+    if not any(_has_selection(selection) for selection in selections):
+        # Nothing passed and nothing saved, check the drivers of the local GPUs
+        selections = _detect_selections() or selections
+    _resolve_download_links(selections)
+    return _report(
+        check_selections(selections, max_workers=args.max_workers, max_age=max_age)
+    )
+
+
+def _print_json(data: dict, indent: int | None = None):
+    sys.stdout.write(json.dumps(data, indent=indent) + "\n")
+    sys.stdout.flush()
+
+
+def command_check(args: argparse.Namespace) -> int:
+    report = run_check(args)
+    _print_json(report, indent=2 if args.pretty else None)
+    if args.exit_code and report["update_available"]:
+        return 2
+    return 0
+
+
+def command_profiles_list(args: argparse.Namespace) -> int:
+    _print_json(
+        [
+            {"index": index, **selection.to_dict()}
+            for index, selection in enumerate(_saved_selections())
+        ],
+        indent=2,
+    )
+    return 0
+
+
+def command_profiles_add(args: argparse.Namespace) -> int:
+    added = _passed_selections(args)
+    if not added:
+        logger.error("Pass --dl-link or the dropdown ids of the selection to add")
+        return 1
+    # The first profile added keeps the selection of the config window
+    save_profiles(_saved_selections() + added)
+    return command_profiles_list(args)
+
+
+def command_profiles_remove(args: argparse.Namespace) -> int:
+    selections = _saved_selections()
+    if unknown := sorted(set(args.index) - set(range(len(selections)))):
+        logger.error(f"No saved profiles with index {', '.join(map(str, unknown))}")
+        return 1
+    save_profiles(
+        [
+            selection
+            for index, selection in enumerate(selections)
+            if index not in args.index
+        ]
+    )
+    return command_profiles_list(args)
+
+
+def command_daemon(args: argparse.Namespace) -> int:
+    def check() -> bool:
+        # Scheduled checks revalidate the cached driver pages
+        report = run_check(args, max_age=0)
+        _print_json(report)
+        # Selections without a driver are not retried any sooner than the others
+        return not any(
+            DriverInfoStatus(result["status"]) in RETRYABLE_STATUSES
+            for result in report["results"]
+        )
+
+    scheduler = UpdateScheduler(
+        check,
+        interval=args.interval,
+        jitter=args.jitter,
+        run_immediately=True,
+    )
+    network_monitor = NetworkMonitor(scheduler.wake)
+    stopped = threading.Event()
+
+    def stop(signum, frame):
+        logger.info(f"Received signal {signum}, stopping")
+        stopped.set()
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    scheduler.start()
+    network_monitor.start()
+    # Wake up regularly so signals are handled on every platform
+    while not stopped.wait(1):
+        pass
+    network_monitor.stop(timeout=5)
+    scheduler.stop(timeout=5)
+    return 0
+
+
+def command_serve(args: argparse.Namespace) -> int:
+    from pyvidia_update.source.check_proxy import (
+        CheckProxyServer,
+        SingleFlightCache,
+        UpstreamFetcher,
+    )
+
+    server = CheckProxyServer(
+        (args.host, args.port),
+        cache=SingleFlightCache(
+            UpstreamFetcher(), ttl=args.ttl, error_ttl=args.error_ttl
+        ),
+        allowed_hosts=args.allow_host,
+    )
+    stopped = threading.Event()
+
+    def stop(signum, frame):
+        logger.info(f"Received signal {signum}, stopping")
+        stopped.set()
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, port = server.server_address[:2]
+    sys.stderr.write(f"Serving update checks on http://{host}:{port}\n")
+    while not stopped.wait(1):
+        pass
+    server.shutdown()
+    server.server_close()
+    return 0
+
+
+def _add_selection_arguments(parser: argparse.ArgumentParser, batch: bool = True):
+    parser.add_argument(
+        "--dl-link",
+        action="append",
+        default=[],
+        help="Driver download url, repeat it for several selections",
+    )
+    for arg, field in SELECTION_ARGS.items():
+        parser.add_argument(f"--{arg}", help=f"Dropdown id of the {field} selection")
+    if not batch:
+        return
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=4,
+        help="Maximum number of concurrent driver page fetches",
+    )
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="pyvidia_update",
+        description="Check for Nvidia driver updates without the GUI. "
+        "Without selection arguments the saved profiles are checked.",
+    )
+    parser.add_argument("-v", "--verbose", action="store_true")
+    parser.add_argument(
+        "--metrics",
+        choices=("prometheus", "json"),
+        help="Write timings and counters of the checks to stderr when done",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    check = subparsers.add_parser("check", help="Run one update check")
+    _add_selection_arguments(check)
+    check.add_argument("--pretty", action="store_true", help="Indent the JSON")
+    check.add_argument(
+        "--exit-code",
+        action="store_true",
+        help="Exit with status 2 if an update is available",
+    )
+    check.set_defaults(func=command_check)
+
+    daemon = subparsers.add_parser(
+        "daemon", help="Check periodically, printing one JSON line per check"
+    )
+    _add_selection_arguments(daemon)
+    daemon.add_argument("--interval", type=float, default=60 * 60)
+    daemon.add_argument("--jitter", type=float, default=0.1)
+    daemon.set_defaults(func=command_daemon)
+
+    profiles = subparsers.add_parser(
+        "profiles", help="Manage the selections checked when none are passed"
+    )
+    profile_commands = profiles.add_subparsers(dest="profiles_command", required=True)
+    profile_commands.add_parser("list", help="Print the saved profiles").set_defaults(
+        func=command_profiles_list
+    )
+    add = profile_commands.add_parser("add", help="Save one or more selections")
+    _add_selection_arguments(add, batch=False)
+    add.set_defaults(func=command_profiles_add)
+    remove = profile_commands.add_parser("remove", help="Delete saved selections")
+    remove.add_argument("index", type=int, nargs="+", help="Index shown by list")
+    remove.set_defaults(func=command_profiles_remove)
+
+    from pyvidia_update.source.check_proxy import (
+        DEFAULT_ALLOWED_HOSTS,
+        DEFAULT_ERROR_TTL,
+        DEFAULT_PORT,
+        DEFAULT_PROXY_TTL,
+    )
+
+    serve = subparsers.add_parser(
+        "serve",
+        help="Run a caching check proxy, point clients at it with "
+        "PYVIDIA_CHECK_PROXY=http://<host>:<port>",
+    )
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serve.add_argument(
+        "--ttl",
+        type=float,
+        default=DEFAULT_PROXY_TTL,
+        help="Seconds a fetched driver version is served from the cache",
+    )
+    serve.add_argument(
+        "--error-ttl",
+        type=float,
+        default=DEFAULT_ERROR_TTL,
+        help="Seconds a failed fetch is served from the cache",
+    )
+    serve.add_argument(
+        "--allow-host",
+        action="append",
+        default=list(DEFAULT_ALLOWED_HOSTS),
+        help="Additional host[:port] the proxy may fetch driver pages from",
+    )
+    serve.set_defaults(func=command_serve)
+    return parser
+
+
+def _write_metrics(output_format: str):
+    if output_format == "json":
+        sys.stderr.write(json.dumps(metrics.snapshot(), indent=2) + "\n")
+    else:
+        sys.stderr.write(metrics.to_prometheus())
+    sys.stderr.flush()
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.WARNING, stream=sys.stderr
+    )
+    if args.metrics or args.command == "serve":
+        metrics.enable()
+    try:
+        return args.func(args)
+    finally:
+        if args.metrics:
+            _write_metrics(args.metrics)
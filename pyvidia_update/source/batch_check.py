@@ -0,0 +1,107 @@
+import functools
+import logging
+import re
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from pyvidia_update.source.get_current_driver_version import (
+    CurrentDriverInfo,
+    get_current_driver_version,
+)
+from pyvidia_update.source.get_system_info import GpuInfo, get_nvidia_gpus
+from pyvidia_update.source.user_saved_data import SelectedDrivers
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class GpuCheckResult:
+    gpu: GpuInfo | None
+    selection: SelectedDrivers
+    latest: CurrentDriverInfo
+    update_available: bool
+
+    def to_dict(self) -> dict:
+        return {
+            "gpu_index": self.gpu.index if self.gpu else None,
+            "gpu_name": self.gpu.name if self.gpu else None,
+            "pci_bus_id": self.gpu.pci_bus_id if self.gpu else None,
+            "installed_version": self.gpu.driver_version if self.gpu else None,
+            "selection": self.selection.to_dict(),
+            "latest_version": self.latest.version,
+            "release_date": self.latest.release_date,
+            "status": self.latest.status.value,
+            "update_available": self.update_available,
+        }
+
+
+def _version_key(version: str) -> tuple[int, ...] | None:
+    if not re.fullmatch(r"\d+(\.\d+)*", version):
+        return None
+    return tuple(int(part) for part in version.split("."))
+
+
+def is_update_available(installed: str | None, latest: CurrentDriverInfo) -> bool:
+    if installed is None or not latest.ok:
+        return False
+    installed_key, latest_key = _version_key(installed), _version_key(latest.version)
+    if installed_key is None or latest_key is None:
+        return installed != latest.version
+    return latest_key > installed_key
+
+
+def fetch_latest_versions(
+    dl_links: Iterable[str | None],
+    max_workers: int = 4,
+    max_age: float | None = None,
+) -> dict[str | None, CurrentDriverInfo]:
+    """Fetch every distinct download url once, at most ``max_workers`` at a time."""
+    unique_links = list(dict.fromkeys(dl_links))
+    if not unique_links:
+        return {}
+    fetch = functools.partial(get_current_driver_version, max_age=max_age)
+    with ThreadPoolExecutor(
+        max_workers=max(1, min(max_workers, len(unique_links))),
+        thread_name_prefix="pyvidia-batch-check",
+    ) as pool:
+        return dict(zip(unique_links, pool.map(fetch, unique_links)))
+
+
+def check_selections(
+    selections: list[SelectedDrivers],
+    max_workers: int = 4,
+    gpus: list[GpuInfo] | None = None,
+    max_age: float | None = None,
+) -> list[GpuCheckResult]:
+    """
+    Check N driver selections against every local GPU.
+
+    Identical download urls are only fetched once and all GPUs come from a single
+    ``nvidia-smi`` call. Returns one row per GPU and selection.
+    """
+    latest_versions = fetch_latest_versions(
+        (selection.dl_link for selection in selections),
+        max_workers=max_workers,
+        max_age=max_age,
+    )
+    if gpus is None:
+        gpus = get_nvidia_gpus()
+    if not gpus:
+        logger.warning("No Nvidia GPUs found, comparing without installed version")
+
+    results = []
+    for gpu in gpus or [None]:
+        for selection in selections:
+            latest = latest_versions[selection.dl_link]
+            results.append(
+                GpuCheckResult(
+                    gpu=gpu,
+                    selection=selection,
+                    latest=latest,
+                    update_available=is_update_available(
+                        gpu.driver_version if gpu else None, latest
+                    ),
+                )
+            )
+    return results
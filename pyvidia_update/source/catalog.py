@@ -0,0 +1,201 @@
+import logging
+import os
+import pickle
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from dataclasses import dataclass
+from types import MappingProxyType
+
+logger = logging.getLogger(__name__)
+
+
+CATALOG_LEVELS = ("dtcid", "psid", "pfid", "osid", "dtid", "lid")
+NOT_FOUND_URL = "not_found"
+
+_EMPTY_VIEW: Mapping[str, str] = MappingProxyType({})
+
+# Called with the id and verbose_name of a node, False skips the node and its subtree
+LevelPredicate = Callable[[str, str], bool]
+
+
+@dataclass(frozen=True, slots=True)
+class CatalogRecord:
+    dtcid: str
+    psid: str
+    pfid: str
+    osid: str
+    dtid: str
+    lid: str
+    download_url: str
+
+    @property
+    def path(self) -> tuple[str, ...]:
+        return (self.dtcid, self.psid, self.pfid, self.osid, self.dtid, self.lid)
+
+
+@dataclass(frozen=True, slots=True)
+class CatalogLeaf:
+    """A language entry of the nested dropdown dict, ``node`` is the dict itself."""
+
+    path: tuple[str, ...]
+    node: dict
+
+    @property
+    def download_url(self) -> str | None:
+        return self.node.get("download_url")
+
+
+def iter_catalog_nodes(
+    data: dict,
+    predicates: Mapping[str, LevelPredicate] | None = None,
+    path: tuple[str, ...] = (),
+) -> Iterator[tuple[tuple[str, ...], dict]]:
+    """
+    Lazily walk the nested dropdown dict in pre-order, yielding ``(path, node)``.
+
+    ``predicates`` maps a level of ``CATALOG_LEVELS`` to a ``LevelPredicate``, nodes
+    it rejects are skipped together with their subtree. ``path`` is the path of
+    ``data`` itself when walking a subtree, e.g. ``("1", "127")`` for a series.
+    """
+    predicates = predicates or {}
+    stack = [(path, iter(data.items()))]
+    while stack:
+        node_path, items = stack[-1]
+        for key, value in items:
+            if key == "verbose_name":
+                continue
+            child_path = node_path + (key,)
+            predicate = predicates.get(CATALOG_LEVELS[len(child_path) - 1])
+            if predicate is not None and not predicate(
+                key, value.get("verbose_name", "")
+            ):
+                continue
+            yield child_path, value
+            if len(child_path) < len(CATALOG_LEVELS):
+                stack.append((child_path, iter(value.items())))
+            break
+        else:
+            stack.pop()
+
+
+def iter_catalog_leaves(
+    data: dict,
+    predicates: Mapping[str, LevelPredicate] | None = None,
+    leaf_predicate: Callable[[CatalogLeaf], bool] | None = None,
+    path: tuple[str, ...] = (),
+) -> Iterator[CatalogLeaf]:
+    """
+    Lazily yield the language entries of the nested dropdown dict.
+
+    ``predicates`` prune the walk like for ``iter_catalog_nodes``, ``leaf_predicate``
+    filters the leaves themselves, e.g. by their download url.
+    """
+    for node_path, node in iter_catalog_nodes(data, predicates, path):
+        if len(node_path) != len(CATALOG_LEVELS):
+            continue
+        leaf = CatalogLeaf(node_path, node)
+        if leaf_predicate is None or leaf_predicate(leaf):
+            yield leaf
+
+
+class DriverCatalog:
+    """
+    Flat table of all driver selections with per-level parent -> children indexes.
+
+    Every node of the dropdown hierarchy is addressed by its path of ids, e.g.
+    ``("1", "127")`` for a product series. The indexes are built once, so looking up
+    the children of a node or the download url of a leaf is a single dict probe
+    returning a precomputed, read-only view.
+    """
+
+    def __init__(self):
+        self._records: list[CatalogRecord] = []
+        self._names: dict[tuple[str, ...], str] = {}
+        self._children: dict[tuple[str, ...], dict[str, str]] = {(): {}}
+        self._children_views: dict[tuple[str, ...], Mapping[str, str]] = {}
+        self._children_by_name: dict[tuple[str, ...], Mapping[str, str]] = {}
+        self._urls: dict[tuple[str, ...], str] = {}
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __iter__(self) -> Iterator[CatalogRecord]:
+        return iter(self._records)
+
+    def _add_node(self, path: tuple[str, ...], name: str):
+        self._names[path] = name
+        self._children.setdefault(path[:-1], {})[path[-1]] = name
+        if len(path) < len(CATALOG_LEVELS):
+            self._children.setdefault(path, {})
+
+    def _add_record(self, record: CatalogRecord):
+        self._records.append(record)
+        self._urls[record.path] = record.download_url
+
+    def _freeze(self):
+        for path, children in self._children.items():
+            self._children_views[path] = MappingProxyType(children)
+            self._children_by_name[path] = MappingProxyType(
+                {name: key for key, name in children.items()}
+            )
+
+    @classmethod
+    def from_nested_dict(cls, data: dict) -> "DriverCatalog":
+        catalog = cls()
+        for path, node in iter_catalog_nodes(data):
+            catalog._add_node(path, node.get("verbose_name", ""))
+            if len(path) == len(CATALOG_LEVELS):
+                catalog._add_record(
+                    CatalogRecord(
+                        *path, download_url=node.get("download_url", NOT_FOUND_URL)
+                    )
+                )
+        catalog._freeze()
+        logger.debug(f"Compiled catalog with {len(catalog)} driver selections")
+        return catalog
+
+    @classmethod
+    def from_leaves(
+        cls, leaves: Iterable[tuple[tuple[str, ...], tuple[str, ...], str]]
+    ) -> "DriverCatalog":
+        """
+        Build the catalog from a stream of ``(path, names, download_url)`` leaves,
+        ``names`` holding the verbose_name of every node along ``path``.
+        """
+        catalog = cls()
+        for path, names, download_url in leaves:
+            for depth in range(1, len(path) + 1):
+                if path[:depth] not in catalog._names:
+                    catalog._add_node(path[:depth], names[depth - 1])
+            catalog._add_record(CatalogRecord(*path, download_url=download_url))
+        catalog._freeze()
+        logger.debug(f"Compiled catalog with {len(catalog)} driver selections")
+        return catalog
+
+    def has_path(self, path: tuple[str, ...]) -> bool:
+        return path == () or path in self._names
+
+    def name(self, path: tuple[str, ...]) -> str:
+        return self._names.get(path, "")
+
+    def children(self, path: tuple[str, ...] = ()) -> Mapping[str, str]:
+        """Ordered ``{id: verbose_name}`` view of the children of ``path``."""
+        return self._children_views.get(path, _EMPTY_VIEW)
+
+    def children_by_name(self, path: tuple[str, ...] = ()) -> Mapping[str, str]:
+        """Ordered ``{verbose_name: id}`` view of the children of ``path``."""
+        return self._children_by_name.get(path, _EMPTY_VIEW)
+
+    def download_url(self, path: tuple[str, ...]) -> str | None:
+        return self._urls.get(path)
+
+
+def load_catalog_from_pickle(pickle_path: str) -> DriverCatalog:
+    """Convert the nested ``nvidia-dropdown-values.pkl`` into a compiled catalog."""
+    if not os.path.exists(pickle_path):
+        raise FileNotFoundError(f"Path {pickle_path} does not exist.")
+    with open(pickle_path, "rb") as f:
+        data: dict = pickle.load(f)
+    if not data:
+        logger.warning(f"File {pickle_path} does not contain any data")
+        return DriverCatalog.from_nested_dict({})
+    return DriverCatalog.from_nested_dict(data)
@@ -0,0 +1,273 @@
+"""
+Binary catalog format (all integers little-endian uint32):
+
+header:        magic, version, string_count, node_count, record_count,
+               root_first, root_count, string_index_offset, string_data_offset,
+               node_offset, key_index_offset
+string index:  string_count + 1 offsets into the string data blob
+string data:   utf-8 encoded strings, each stored exactly once
+nodes:         fixed width records (id, name, first_child, child_count, url)
+key index:     one (key_start, key_end, node) record per node, file offsets of the
+               node's id string and its node index
+
+Nodes are stored level by level, so the children of every node are one contiguous
+slice of the node table, in catalog order. The key index has the same slices, sorted
+by the utf-8 bytes of the ids, so a child is found by binary search. Leaf nodes
+(language level) reference their download url, all other nodes use NO_REF.
+"""
+
+import logging
+import mmap
+import os
+import struct
+from collections.abc import Iterator, Mapping
+from functools import lru_cache
+from types import MappingProxyType
+
+from pyvidia_update.source.catalog import (
+    CATALOG_LEVELS,
+    NOT_FOUND_URL,
+    CatalogRecord,
+    DriverCatalog,
+)
+
+logger = logging.getLogger(__name__)
+
+
+CATALOG_MAGIC = b"PVCATLG\x00"
+CATALOG_VERSION = 2
+NO_REF = 0xFFFFFFFF
+
+_HEADER = struct.Struct("<8s10I")
+_OFFSET = struct.Struct("<I")
+_NODE = struct.Struct("<5I")
+_KEY = struct.Struct("<3I")
+
+
+def write_catalog(catalog: DriverCatalog, catalog_path: str):
+    strings: dict[str, int] = {}
+
+    def intern(value: str) -> int:
+        if value not in strings:
+            strings[value] = len(strings)
+        return strings[value]
+
+    nodes: list[tuple[int, int, int, int, int]] = []
+    level: list[tuple[str, ...]] = [(key,) for key in catalog.children(())]
+    root_count = len(level)
+    while level:
+        next_level: list[tuple[str, ...]] = []
+        first_child = len(nodes) + len(level)
+        for path in level:
+            children = catalog.children(path)
+            url = (
+                catalog.download_url(path) if len(path) == len(CATALOG_LEVELS) else None
+            )
+            nodes.append(
+                (
+                    intern(path[-1]),
+                    intern(catalog.name(path)),
+                    first_child + len(next_level) if children else NO_REF,
+                    len(children),
+                    intern(url) if url is not None else NO_REF,
+                )
+            )
+            next_level.extend(path + (key,) for key in children)
+        level = next_level
+
+    encoded = [value.encode("utf-8") for value in strings]
+    string_index = bytearray()
+    string_starts = []
+    position = 0
+    for value in encoded:
+        string_index += _OFFSET.pack(position)
+        string_starts.append(position)
+        position += len(value)
+    string_index += _OFFSET.pack(position)
+    string_data = b"".join(encoded)
+
+    string_index_offset = _HEADER.size
+    string_data_offset = string_index_offset + len(string_index)
+    node_offset = string_data_offset + len(string_data)
+    # Keep the node table 4 byte aligned
+    padding = b"\x00" * (-node_offset % 4)
+    node_offset += len(padding)
+    key_index_offset = node_offset + len(nodes) * _NODE.size
+
+    ranges = [(0, root_count)] + [
+        (node[2], node[3]) for node in nodes if node[2] != NO_REF
+    ]
+    key_index = [(0, 0, 0)] * len(nodes)
+    for first, count in ranges:
+        siblings = sorted(
+            range(first, first + count), key=lambda index: encoded[nodes[index][0]]
+        )
+        for position, index in enumerate(siblings, first):
+            id_ref = nodes[index][0]
+            start = string_data_offset + string_starts[id_ref]
+            key_index[position] = (start, start + len(encoded[id_ref]), index)
+
+    header = _HEADER.pack(
+        CATALOG_MAGIC,
+        CATALOG_VERSION,
+        len(encoded),
+        len(nodes),
+        len(catalog),
+        0,
+        root_count,
+        string_index_offset,
+        string_data_offset,
+        node_offset,
+        key_index_offset,
+    )
+
+    tmp_path = f"{catalog_path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(string_index)
+        f.write(string_data)
+        f.write(padding)
+        f.writelines(_NODE.pack(*node) for node in nodes)
+        f.writelines(_KEY.pack(*key) for key in key_index)
+    os.replace(tmp_path, catalog_path)
+    logger.debug(
+        f"Wrote catalog with {len(nodes)} nodes and {len(encoded)} strings to {catalog_path}"
+    )
+
+
+class MappedCatalog:
+    """
+    Read-only catalog backed by a memory mapped catalog file.
+
+    Nothing is decoded up front: lookups binary search the key index inside the
+    mapping and only decode the strings they return, so opening the file costs the
+    same no matter how many driver selections it contains.
+    """
+
+    def __init__(self, catalog_path: str):
+        self.catalog_path = catalog_path
+        with open(catalog_path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (
+            magic,
+            version,
+            self._string_count,
+            self._node_count,
+            self._record_count,
+            self._root_first,
+            self._root_count,
+            self._string_index_offset,
+            self._string_data_offset,
+            self._node_offset,
+            self._key_index_offset,
+        ) = _HEADER.unpack_from(self._mm, 0)
+        if magic != CATALOG_MAGIC or version != CATALOG_VERSION:
+            self._mm.close()
+            raise ValueError(f"File {catalog_path} is not a supported catalog file")
+        self._find = lru_cache(maxsize=1024)(self._find_node)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self) -> int:
+        return self._record_count
+
+    def __iter__(self) -> Iterator[CatalogRecord]:
+        return self._iter_nodes((), self._root_first, self._root_count)
+
+    def close(self):
+        self._find.cache_clear()
+        self._mm.close()
+
+    def _string(self, ref: int) -> str:
+        start, end = struct.unpack_from(
+            "<2I", self._mm, self._string_index_offset + ref * _OFFSET.size
+        )
+        offset = self._string_data_offset
+        return self._mm[offset + start : offset + end].decode("utf-8")
+
+    def _node(self, index: int) -> tuple[int, int, int, int, int]:
+        return _NODE.unpack_from(self._mm, self._node_offset + index * _NODE.size)
+
+    def _iter_nodes(
+        self, path: tuple[str, ...], first: int, count: int
+    ) -> Iterator[CatalogRecord]:
+        for index in range(first, first + count):
+            id_ref, _, child_first, child_count, url_ref = self._node(index)
+            node_path = path + (self._string(id_ref),)
+            if len(node_path) == len(CATALOG_LEVELS):
+                yield CatalogRecord(
+                    *node_path,
+                    download_url=self._string(url_ref)
+                    if url_ref != NO_REF
+                    else NOT_FOUND_URL,
+                )
+            elif child_count:
+                yield from self._iter_nodes(node_path, child_first, child_count)
+
+    def _find_child(self, first: int, count: int, key: bytes) -> int | None:
+        """Node index of the child ``key`` of the sibling slice, by binary search."""
+        low, high = first, first + count
+        while low < high:
+            middle = (low + high) // 2
+            start, end, index = _KEY.unpack_from(
+                self._mm, self._key_index_offset + middle * _KEY.size
+            )
+            candidate = self._mm[start:end]
+            if candidate == key:
+                return index
+            if candidate < key:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def _find_node(self, path: tuple[str, ...]) -> int | None:
+        if len(path) == 1:
+            first, count = self._root_first, self._root_count
+        else:
+            # Through the cache, siblings share the lookup of their parent
+            parent = self._find(path[:-1])
+            if parent is None:
+                return None
+            _, _, first, count, _ = self._node(parent)
+        return self._find_child(first, count, path[-1].encode("utf-8"))
+
+    def _children_items(self, path: tuple[str, ...]) -> Iterator[tuple[str, str]]:
+        if path == ():
+            first, count = self._root_first, self._root_count
+        else:
+            index = self._find(path)
+            if index is None:
+                return
+            _, _, first, count, _ = self._node(index)
+        for child in range(first, first + count):
+            id_ref, name_ref, _, _, _ = self._node(child)
+            yield self._string(id_ref), self._string(name_ref)
+
+    def has_path(self, path: tuple[str, ...]) -> bool:
+        return path == () or self._find(path) is not None
+
+    def name(self, path: tuple[str, ...]) -> str:
+        index = self._find(path) if path else None
+        if index is None:
+            return ""
+        return self._string(self._node(index)[1])
+
+    def children(self, path: tuple[str, ...] = ()) -> Mapping[str, str]:
+        return MappingProxyType(dict(self._children_items(path)))
+
+    def children_by_name(self, path: tuple[str, ...] = ()) -> Mapping[str, str]:
+        return MappingProxyType({name: key for key, name in self._children_items(path)})
+
+    def download_url(self, path: tuple[str, ...]) -> str | None:
+        if len(path) != len(CATALOG_LEVELS):
+            return None
+        index = self._find(path)
+        if index is None:
+            return None
+        url_ref = self._node(index)[4]
+        return self._string(url_ref) if url_ref != NO_REF else None
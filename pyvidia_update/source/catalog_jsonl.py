@@ -0,0 +1,129 @@
+"""
+Streaming JSON Lines export and import of the driver catalog.
+
+Every line holds one driver selection:
+
+{"download_url": <str|null>, "names": [<6 verbose names>], "path": [<6 ids>]}
+
+Files ending in ``.gz`` are gzip compressed, files ending in ``.zst`` zstd compressed
+(requires the optional ``zstandard`` package). Lines are written and read one at a
+time, so neither direction holds the file and the catalog in memory at once.
+"""
+
+import gzip
+import io
+import json
+import logging
+import os
+from collections.abc import Iterable, Iterator
+from typing import IO
+
+from pyvidia_update.source.catalog import (
+    CATALOG_LEVELS,
+    NOT_FOUND_URL,
+    DriverCatalog,
+    iter_catalog_nodes,
+)
+
+logger = logging.getLogger(__name__)
+
+
+# (path, names, download_url) of one driver selection
+Leaf = tuple[tuple[str, ...], tuple[str, ...], str | None]
+
+
+def _open(path: str, mode: str) -> IO[str]:
+    if path.endswith(".gz"):
+        return gzip.open(path, f"{mode}t", encoding="utf-8")
+    if path.endswith(".zst"):
+        try:
+            import zstandard
+        except ImportError as e:
+            raise RuntimeError(
+                "Reading or writing .zst catalogs requires the zstandard package"
+            ) from e
+        # Closed by the zstandard stream wrapping it (closefd=True)
+        raw = open(path, f"{mode}b")  # noqa: SIM115
+        if mode == "w":
+            stream = zstandard.ZstdCompressor().stream_writer(raw, closefd=True)
+        else:
+            stream = zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+        return io.TextIOWrapper(stream, encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def leaves_from_nested_dict(data: dict) -> Iterator[Leaf]:
+    """Stream the driver selections of the nested dropdown dict."""
+    names: list[str] = []
+    for path, node in iter_catalog_nodes(data):
+        del names[len(path) - 1 :]
+        names.append(node.get("verbose_name", ""))
+        if len(path) == len(CATALOG_LEVELS):
+            yield path, tuple(names), node.get("download_url")
+
+
+def leaves_from_catalog(catalog) -> Iterator[Leaf]:
+    """Stream the driver selections of a ``DriverCatalog`` or ``MappedCatalog``."""
+    for record in catalog:
+        path = record.path
+        names = tuple(catalog.name(path[:depth]) for depth in range(1, len(path) + 1))
+        yield path, names, record.download_url
+
+
+def write_catalog_jsonl(leaves: Iterable[Leaf], path: str) -> int:
+    """Write ``leaves`` to ``path`` atomically, return the number of lines."""
+    tmp_path = f"{path}.tmp{os.path.splitext(path)[1]}"
+    count = 0
+    try:
+        with _open(tmp_path, "w") as f:
+            for leaf_path, names, download_url in leaves:
+                record = {
+                    "download_url": download_url,
+                    "names": list(names),
+                    "path": list(leaf_path),
+                }
+                f.write(json.dumps(record, ensure_ascii=False, sort_keys=True) + "\n")
+                count += 1
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    logger.debug(f"Wrote {count} catalog lines to {path}")
+    return count
+
+
+def read_catalog_jsonl(path: str) -> Iterator[Leaf]:
+    with _open(path, "r") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                leaf_path = tuple(record["path"])
+                names = tuple(record["names"])
+            except (ValueError, KeyError, TypeError) as e:
+                raise ValueError(f"Invalid line {line_number} in {path}: {e}") from e
+            if len(leaf_path) != len(CATALOG_LEVELS) or len(names) != len(leaf_path):
+                raise ValueError(f"Invalid path in line {line_number} of {path}")
+            yield leaf_path, names, record.get("download_url")
+
+
+def load_catalog_from_jsonl(path: str) -> DriverCatalog:
+    """Build the catalog indexes while streaming the export."""
+    return DriverCatalog.from_leaves(
+        (leaf_path, names, download_url or NOT_FOUND_URL)
+        for leaf_path, names, download_url in read_catalog_jsonl(path)
+    )
+
+
+def nested_dict_from_leaves(leaves: Iterable[Leaf]) -> dict:
+    """Rebuild the nested dropdown dict the scraper works with."""
+    data: dict = {}
+    for leaf_path, names, download_url in leaves:
+        node = data
+        for key, name in zip(leaf_path, names):
+            node = node.setdefault(key, {"verbose_name": name})
+        if download_url is not None:
+            node["download_url"] = download_url
+    return data
@@ -0,0 +1,140 @@
+import logging
+import threading
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+from pyvidia_update.source.get_current_driver_version import (
+    CurrentDriverInfo,
+    get_current_driver_version,
+)
+from pyvidia_update.source.get_system_info import get_current_nvidia_driver_version
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CheckJob:
+    dl_link: str | None
+    generation: int
+    # Passed to get_current_driver_version, 0 skips the driver info cache
+    max_age: float | None = None
+    cancel_event: threading.Event = field(
+        default_factory=threading.Event, compare=False, repr=False
+    )
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+
+@dataclass(frozen=True)
+class CheckResult:
+    job: CheckJob
+    system_version: str
+    driver_info: CurrentDriverInfo
+
+
+def run_check(job: CheckJob) -> CheckResult:
+    system_version = get_current_nvidia_driver_version()
+    return CheckResult(
+        job=job,
+        system_version=system_version,
+        driver_info=get_current_driver_version(
+            job.dl_link, cancel_event=job.cancel_event, max_age=job.max_age
+        ),
+    )
+
+
+class CheckEngine:
+    """
+    Runs update checks on a background worker thread.
+
+    Only the latest submitted job is ever run: jobs submitted within ``debounce``
+    seconds of each other are coalesced, and submitting a new job cancels the one
+    in flight. Results of superseded jobs are dropped, all other results are handed
+    to ``on_result`` through ``dispatch`` (e.g. ``wx.CallAfter``).
+    """
+
+    def __init__(
+        self,
+        on_result: Callable[[CheckResult], None],
+        dispatch: Callable[..., None] | None = None,
+        debounce: float = 0.3,
+        check_func: Callable[[CheckJob], CheckResult] = run_check,
+    ):
+        self.on_result = on_result
+        self.dispatch = dispatch or (lambda func, *args: func(*args))
+        self.debounce = debounce
+        self.check_func = check_func
+
+        self._condition = threading.Condition()
+        self._pending: CheckJob | None = None
+        self._current: CheckJob | None = None
+        self._generation = 0
+        self._stopped = False
+        self._thread: threading.Thread | None = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._run, name="pyvidia-check-engine", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None):
+        with self._condition:
+            self._stopped = True
+            if self._current is not None:
+                self._current.cancel_event.set()
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def submit(self, dl_link: str | None, max_age: float | None = None) -> CheckJob:
+        with self._condition:
+            self._generation += 1
+            job = CheckJob(
+                dl_link=dl_link, generation=self._generation, max_age=max_age
+            )
+            if self._current is not None:
+                self._current.cancel_event.set()
+            self._pending = job
+            self._condition.notify_all()
+        return job
+
+    def _next_job(self) -> CheckJob | None:
+        with self._condition:
+            while self._pending is None and not self._stopped:
+                self._condition.wait()
+            # Wait until no newer job arrived for a whole debounce period
+            while not self._stopped:
+                job = self._pending
+                self._condition.wait(self.debounce)
+                if self._pending is job:
+                    break
+            if self._stopped:
+                return None
+            self._pending = None
+            self._current = job
+            return job
+
+    def _run(self):
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            try:
+                result = self.check_func(job)
+            except Exception:
+                # The worker thread must outlive a broken check
+                logger.exception(f"Check {job} failed")
+                result = None
+            with self._condition:
+                self._current = None
+                superseded = job.cancelled or job.generation != self._generation
+            if result is None or superseded:
+                logger.debug(f"Dropping result of superseded check {job}")
+                continue
+            self.dispatch(self.on_result, result)
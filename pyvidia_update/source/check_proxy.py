@@ -0,0 +1,247 @@
+"""
+Caching check proxy for fleets of machines.
+
+Serves the latest driver version of a download url from a shared cache, so many
+installations tracking the same driver cause one upstream fetch per TTL:
+
+GET /latest?dl_link=<driver page url>
+GET /latest?dtcid=..&psid=..&pfid=..&osid=..&dtid=..&lid=..
+GET /healthz
+GET /metrics[?format=json]
+
+Point clients at it with ``PYVIDIA_CHECK_PROXY=http://<host>:<port>``.
+"""
+
+import json
+import logging
+import threading
+import time
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+from pyvidia_update.source.catalog import CATALOG_LEVELS, NOT_FOUND_URL
+from pyvidia_update.source.driver_cache import DriverInfoCache
+from pyvidia_update.source.get_current_driver_version import (
+    CurrentDriverInfo,
+    DriverInfoStatus,
+    get_current_driver_version,
+)
+from pyvidia_update.source.metrics import metrics
+from pyvidia_update.source.user_saved_data import user_dir
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_PORT = 8765
+DEFAULT_PROXY_TTL = 15 * 60
+DEFAULT_ERROR_TTL = 60
+DEFAULT_ALLOWED_HOSTS = ("www.nvidia.com", "nvidia.com")
+
+
+class SelectionNotFound(LookupError):
+    """The catalog has no driver for the requested selection."""
+
+
+@dataclass
+class _Flight:
+    done: threading.Event = field(default_factory=threading.Event)
+    info: CurrentDriverInfo | None = None
+
+
+@dataclass
+class ProxyStats:
+    hits: int = 0
+    misses: int = 0
+    coalesced: int = 0
+
+
+class SingleFlightCache:
+    """
+    TTL cache of driver infos that runs at most one ``fetch`` per url at a time.
+
+    Requests for a url that is being fetched wait for that fetch instead of starting
+    their own. Failed fetches are cached for ``error_ttl`` seconds only.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[str], CurrentDriverInfo],
+        ttl: float = DEFAULT_PROXY_TTL,
+        error_ttl: float = DEFAULT_ERROR_TTL,
+        max_entries: int = 4096,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.fetch = fetch
+        self.ttl = ttl
+        self.error_ttl = error_ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self.stats = ProxyStats()
+        self._entries: dict[str, tuple[CurrentDriverInfo, float]] = {}
+        self._flights: dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+
+    def get(self, url: str) -> tuple[CurrentDriverInfo, bool]:
+        """Return the driver info of ``url`` and whether it came from the cache."""
+        with self._lock:
+            cached = self._entries.get(url)
+            if cached is not None and self.clock() < cached[1]:
+                self.stats.hits += 1
+                metrics.count("check_proxy_requests_total", result="hit")
+                return cached[0], True
+            flight = self._flights.get(url)
+            leader = flight is None
+            if leader:
+                flight = self._flights[url] = _Flight()
+                self.stats.misses += 1
+                metrics.count("check_proxy_requests_total", result="miss")
+            else:
+                self.stats.coalesced += 1
+                metrics.count("check_proxy_requests_total", result="coalesced")
+
+        if not leader:
+            flight.done.wait()
+            return flight.info, True
+
+        try:
+            flight.info = self.fetch(url)
+        except Exception:
+            # Waiting requests get the failure instead of the exception
+            logger.exception(f"Fetching {url} failed")
+            flight.info = CurrentDriverInfo.failed(DriverInfoStatus.NETWORK_ERROR)
+        finally:
+            with self._lock:
+                ttl = self.ttl if flight.info and flight.info.ok else self.error_ttl
+                if flight.info is not None:
+                    self._entries[url] = (flight.info, self.clock() + ttl)
+                    self._evict()
+                del self._flights[url]
+            flight.done.set()
+        return flight.info, False
+
+    def _evict(self):
+        if len(self._entries) <= self.max_entries:
+            return
+        now = self.clock()
+        for url in [
+            url for url, (_, expires) in self._entries.items() if expires <= now
+        ]:
+            del self._entries[url]
+        while len(self._entries) > self.max_entries:
+            del self._entries[next(iter(self._entries))]
+
+
+class UpstreamFetcher:
+    """Fetches driver pages for the proxy, revalidating with the stored ETag."""
+
+    def __init__(self, cache: DriverInfoCache | None = None):
+        self.cache = cache or DriverInfoCache(
+            cache_file=Path(user_dir).joinpath("check_proxy_cache.pkl"),
+            ttl=0,
+            max_entries=4096,
+        )
+
+    def __call__(self, url: str) -> CurrentDriverInfo:
+        # Never ask another proxy, even if PYVIDIA_CHECK_PROXY is set for the server
+        return get_current_driver_version(url, cache=self.cache, proxy="")
+
+
+class _CheckProxyHandler(BaseHTTPRequestHandler):
+    server: "CheckProxyServer"
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} {format % args}")
+
+    def _send_json(self, status: int, data: dict, max_age: int | None = None):
+        self._send(status, "application/json", json.dumps(data), max_age)
+
+    def _send(
+        self, status: int, content_type: str, text: str, max_age: int | None = None
+    ):
+        body = text.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if max_age is not None:
+            self.send_header("Cache-Control", f"max-age={max_age}")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        query = {key: values[0] for key, values in parse_qs(parts.query).items()}
+        if parts.path == "/healthz":
+            self._send_json(200, {"status": "ok", **vars(self.server.cache.stats)})
+            return
+        if parts.path == "/metrics":
+            if query.get("format") == "json":
+                self._send_json(200, metrics.snapshot())
+            else:
+                self._send(200, "text/plain; version=0.0.4", metrics.to_prometheus())
+            return
+        if parts.path != "/latest":
+            self._send_json(404, {"error": f"Unknown path {parts.path}"})
+            return
+        try:
+            url = self.server.resolve_url(query)
+        except SelectionNotFound as e:
+            self._send_json(404, {"error": str(e)})
+            return
+        except ValueError as e:
+            self._send_json(400, {"error": str(e)})
+            return
+        info, cached = self.server.cache.get(url)
+        self._send_json(
+            200,
+            {**info.to_dict(), "dl_link": url, "cached": cached},
+            max_age=int(self.server.cache.ttl) if info.ok else None,
+        )
+
+
+class CheckProxyServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        cache: SingleFlightCache | None = None,
+        allowed_hosts: Sequence[str] = DEFAULT_ALLOWED_HOSTS,
+    ):
+        super().__init__(address, _CheckProxyHandler)
+        self.cache = cache or SingleFlightCache(UpstreamFetcher())
+        self.allowed_hosts = tuple(allowed_hosts)
+        self._dropdown_data = None
+        self._dropdown_lock = threading.Lock()
+
+    def _download_link(self, path: tuple[str, ...]) -> str:
+        with self._dropdown_lock:
+            if self._dropdown_data is None:
+                from pyvidia_update.source.get_data import DropdownData
+
+                self._dropdown_data = DropdownData()
+        return self._dropdown_data.get_download_link(*path)
+
+    def resolve_url(self, query: dict[str, str]) -> str:
+        """The driver page url of a request, only on allowed hosts."""
+        url = query.get("dl_link")
+        if url is None:
+            path = tuple(query.get(level, "") for level in CATALOG_LEVELS)
+            if not all(path):
+                raise ValueError(
+                    f"Either dl_link or all of {', '.join(CATALOG_LEVELS)} required"
+                )
+            url = self._download_link(path)
+            if not url:
+                raise ValueError(f"Unknown selection {', '.join(path)}")
+        if url == NOT_FOUND_URL:
+            raise SelectionNotFound("No driver for this selection")
+        parts = urlsplit(url)
+        if (
+            parts.scheme not in ("http", "https")
+            or parts.netloc not in self.allowed_hosts
+        ):
+            raise ValueError(f"Host of {url} is not allowed")
+        return url
@@ -0,0 +1,78 @@
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
+from dataclasses import dataclass
+from types import MappingProxyType
+
+from pyvidia_update.source.catalog import DriverCatalog
+from pyvidia_update.source.catalog_file import MappedCatalog
+
+
+@dataclass(frozen=True, slots=True)
+class ChoiceList:
+    labels: tuple[str, ...]
+    ids: tuple[str, ...]
+    id_by_label: Mapping[str, str]
+    index_by_id: Mapping[str, int]
+
+    @classmethod
+    def from_children(cls, children: Mapping[str, str]) -> "ChoiceList":
+        ids = tuple(children.keys())
+        return cls(
+            labels=tuple(children.values()),
+            ids=ids,
+            id_by_label=MappingProxyType(
+                {label: key for key, label in children.items()}
+            ),
+            index_by_id=MappingProxyType({key: i for i, key in enumerate(ids)}),
+        )
+
+    def index_of(self, key: str | None, default: int = 0) -> int:
+        return self.index_by_id.get(key, default)
+
+    def id_at(self, index: int) -> str | None:
+        if 0 <= index < len(self.ids):
+            return self.ids[index]
+        return None
+
+
+EMPTY_CHOICES = ChoiceList.from_children({})
+
+
+class ChoiceListCache:
+    """
+    Memoized dropdown choice lists keyed by the path of selected parent ids.
+
+    Only the most recently used ``maxsize`` paths are kept, so browsing through the
+    whole catalog does not grow the cache without bound.
+    """
+
+    def __init__(self, catalog: DriverCatalog | MappedCatalog, maxsize: int = 256):
+        self.catalog = catalog
+        self.maxsize = maxsize
+        self._cache: OrderedDict[tuple[str, ...], ChoiceList] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path: tuple[str, ...] = ()) -> ChoiceList:
+        with self._lock:
+            choices = self._cache.get(path)
+            if choices is not None:
+                self._cache.move_to_end(path)
+                return choices
+
+        if not self.catalog.has_path(path):
+            raise ValueError(
+                f"Key combination {', '.join(map(str, path))} does not exist in data!"
+            )
+        choices = ChoiceList.from_children(self.catalog.children(path))
+
+        with self._lock:
+            self._cache[path] = choices
+            self._cache.move_to_end(path)
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+        return choices
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
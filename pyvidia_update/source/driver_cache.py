@@ -0,0 +1,151 @@
+import logging
+import os
+import pickle
+import threading
+import time
+from dataclasses import asdict, dataclass, replace
+from pathlib import Path
+
+from pyvidia_update.source.user_saved_data import user_dir
+
+logger = logging.getLogger(__name__)
+
+
+# Well below the scheduler's check interval, scheduled and manual checks pass
+# max_age=0 and revalidate the cached page anyway
+DEFAULT_TTL = 10 * 60
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_CACHE_FILE = Path(user_dir).joinpath("driver_info_cache.pkl")
+
+
+@dataclass(frozen=True)
+class CacheEntry:
+    version: str
+    release_date: str
+    fetched_at: float
+    etag: str | None = None
+    last_modified: str | None = None
+
+
+class DriverInfoCache:
+    """
+    Persistent cache of parsed driver pages keyed by download url.
+
+    Entries younger than ``ttl`` seconds are served without touching the network,
+    older ones still provide their validators for a conditional request. The file
+    is rewritten atomically and holds at most ``max_entries`` entries, dropping the
+    least recently fetched ones first.
+    """
+
+    def __init__(
+        self,
+        cache_file: str | Path = DEFAULT_CACHE_FILE,
+        ttl: float = DEFAULT_TTL,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        self.cache_file = Path(cache_file)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: dict[str, CacheEntry] | None = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> dict[str, CacheEntry]:
+        if self._entries is not None:
+            return self._entries
+        self._entries = {}
+        if not os.path.exists(self.cache_file):
+            return self._entries
+        try:
+            with open(self.cache_file, "rb") as f:
+                data: dict = pickle.load(f)
+            self._entries = {url: CacheEntry(**entry) for url, entry in data.items()}
+        except (
+            OSError,
+            pickle.UnpicklingError,
+            EOFError,
+            AttributeError,
+            TypeError,
+        ) as e:
+            logger.warning(f"Ignoring unreadable cache file {self.cache_file}: {e}")
+        return self._entries
+
+    def _save(self, entries: dict[str, CacheEntry]):
+        try:
+            os.makedirs(self.cache_file.parent, exist_ok=True)
+            tmp_file = self.cache_file.with_name(f"{self.cache_file.name}.tmp")
+            with open(tmp_file, "wb") as f:
+                pickle.dump({url: asdict(entry) for url, entry in entries.items()}, f)
+            os.replace(tmp_file, self.cache_file)
+        except OSError as e:
+            logger.error(e)
+
+    def is_fresh(
+        self, entry: CacheEntry, now: float | None = None, max_age: float | None = None
+    ) -> bool:
+        """Whether ``entry`` is younger than ``max_age`` seconds, default ``ttl``."""
+        now = time.time() if now is None else now
+        return now - entry.fetched_at < (self.ttl if max_age is None else max_age)
+
+    def get(self, url: str) -> CacheEntry | None:
+        with self._lock:
+            return self._load().get(url)
+
+    def put(
+        self,
+        url: str,
+        version: str,
+        release_date: str,
+        etag: str | None = None,
+        last_modified: str | None = None,
+    ) -> CacheEntry:
+        entry = CacheEntry(
+            version=version,
+            release_date=release_date,
+            fetched_at=time.time(),
+            etag=etag,
+            last_modified=last_modified,
+        )
+        with self._lock:
+            entries = self._load()
+            entries[url] = entry
+            if len(entries) > self.max_entries:
+                for old_url, _ in sorted(
+                    entries.items(), key=lambda item: item[1].fetched_at
+                )[: len(entries) - self.max_entries]:
+                    del entries[old_url]
+            self._save(entries)
+        return entry
+
+    def touch(self, url: str) -> CacheEntry | None:
+        """Mark an entry as revalidated now, e.g. after a 304 response."""
+        with self._lock:
+            entries = self._load()
+            entry = entries.get(url)
+            if entry is None:
+                return None
+            entries[url] = replace(entry, fetched_at=time.time())
+            self._save(entries)
+            return entries[url]
+
+    def clear(self):
+        with self._lock:
+            self._entries = {}
+            self._save(self._entries)
+
+
+_cache: DriverInfoCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_driver_info_cache() -> DriverInfoCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = DriverInfoCache()
+        return _cache
+
+
+def set_driver_info_cache(cache: DriverInfoCache | None):
+    global _cache
+    with _cache_lock:
+        _cache = cache
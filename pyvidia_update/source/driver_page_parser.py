@@ -0,0 +1,89 @@
+import codecs
+from collections.abc import Iterable
+from html.parser import HTMLParser
+
+VERSION_ID = "tdVersion"
+RELEASE_DATE_ID = "tdReleaseDate"
+
+# Elements without an end tag must not be counted when tracking nesting depth
+_VOID_ELEMENTS = {
+    "area",
+    "base",
+    "br",
+    "col",
+    "embed",
+    "hr",
+    "img",
+    "input",
+    "link",
+    "meta",
+    "source",
+    "track",
+    "wbr",
+}
+
+
+class DriverPageParser(HTMLParser):
+    """
+    Incremental tokenizer collecting the text of the ``tdVersion`` and
+    ``tdReleaseDate`` elements of a driver page.
+
+    Feed it chunks as they arrive and stop as soon as ``done`` is true.
+    """
+
+    def __init__(self, field_ids: tuple[str, ...] = (VERSION_ID, RELEASE_DATE_ID)):
+        super().__init__(convert_charrefs=True)
+        self.field_ids = set(field_ids)
+        self.fields: dict[str, str] = {}
+        self._current: str | None = None
+        self._depth = 0
+        self._text: list[str] = []
+
+    @property
+    def done(self) -> bool:
+        return self.field_ids.issubset(self.fields.keys())
+
+    def handle_starttag(self, tag, attrs):
+        if self._current is not None:
+            if tag not in _VOID_ELEMENTS:
+                self._depth += 1
+            return
+        element_id = dict(attrs).get("id")
+        if element_id in self.field_ids and element_id not in self.fields:
+            self._current = element_id
+            self._depth = 0
+            self._text = []
+
+    def handle_endtag(self, tag):
+        if self._current is None:
+            return
+        if self._depth > 0:
+            self._depth -= 1
+            return
+        self.fields[self._current] = "".join(self._text)
+        self._current = None
+
+    def handle_data(self, data):
+        if self._current is not None:
+            self._text.append(data)
+
+
+def extract_driver_fields(
+    chunks: Iterable[bytes], encoding: str = "utf-8"
+) -> dict[str, str]:
+    """
+    Extract the driver fields from a stream of page chunks.
+
+    Stops consuming ``chunks`` as soon as all fields were found, so a streamed
+    response does not need to be read to the end.
+    """
+    parser = DriverPageParser()
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    for chunk in chunks:
+        parser.feed(decoder.decode(chunk))
+        if parser.done:
+            break
+    else:
+        parser.feed(decoder.decode(b"", final=True))
+        parser.close()
+    return parser.fields
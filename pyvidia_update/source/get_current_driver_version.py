@@ -1,51 +1,292 @@
+import codecs
 import logging
-import requests
-
+import os
+import threading
+import time
 from dataclasses import dataclass
-from bs4 import BeautifulSoup as Bs
+from enum import Enum
+from typing import TYPE_CHECKING
+
+from pyvidia_update.source.catalog import NOT_FOUND_URL
+from pyvidia_update.source.driver_cache import (
+    CacheEntry,
+    DriverInfoCache,
+    get_driver_info_cache,
+)
+from pyvidia_update.source.driver_page_parser import (
+    RELEASE_DATE_ID,
+    VERSION_ID,
+    extract_driver_fields,
+)
+from pyvidia_update.source.http_session import (
+    DEFAULT_TIMEOUT,
+    get_session,
+    rebase_nvidia_url,
+)
+from pyvidia_update.source.metrics import metrics
+
+if TYPE_CHECKING:
+    import requests
 
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
-class CurrentDriverInfo:
-    version: str
-    release_date: str
+NOT_FOUND_VERSION = "Could not fetch current version for selected driver!"
+NOT_FOUND_RELEASE_DATE = "Not Found!"
+# Base url of a check proxy (python -m pyvidia_update serve) to ask instead of nvidia.com
+CHECK_PROXY_ENV = "PYVIDIA_CHECK_PROXY"
+
+
+class DriverInfoStatus(Enum):
+    OK = "ok"
+    NOT_FOUND = "not_found"
+    PARSE_ERROR = "parse_error"
+    NETWORK_ERROR = "network_error"
 
 
-driver_info = CurrentDriverInfo(
-    version="Could not fetch current version for selected driver!",
-    release_date="Not Found!",
+# Failures a later check may not run into, NOT_FOUND stays until the selection changes
+RETRYABLE_STATUSES = frozenset(
+    {DriverInfoStatus.PARSE_ERROR, DriverInfoStatus.NETWORK_ERROR}
 )
 
 
-def get_current_driver_version(url: str | None) -> CurrentDriverInfo:
-    if url is None:
-        return driver_info
+@dataclass(frozen=True, slots=True)
+class CurrentDriverInfo:
+    version: str = NOT_FOUND_VERSION
+    release_date: str = NOT_FOUND_RELEASE_DATE
+    status: DriverInfoStatus = DriverInfoStatus.OK
+
+    @property
+    def ok(self) -> bool:
+        return self.status is DriverInfoStatus.OK
+
+    @property
+    def retryable(self) -> bool:
+        return self.status in RETRYABLE_STATUSES
+
+    @classmethod
+    def failed(cls, status: DriverInfoStatus) -> "CurrentDriverInfo":
+        return cls(status=status)
+
+    def to_dict(self) -> dict:
+        return {
+            "version": self.version,
+            "release_date": self.release_date,
+            "status": self.status.value,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "CurrentDriverInfo":
+        return cls(
+            version=data["version"],
+            release_date=data["release_date"],
+            status=DriverInfoStatus(data["status"]),
+        )
+
+
+def _conditional_headers(entry: CacheEntry | None) -> dict[str, str]:
+    headers = {}
+    if entry is None:
+        return headers
+    if entry.etag:
+        headers["If-None-Match"] = entry.etag
+    if entry.last_modified:
+        headers["If-Modified-Since"] = entry.last_modified
+    return headers
+
+
+def _info_from_entry(entry: CacheEntry) -> CurrentDriverInfo:
+    return CurrentDriverInfo(version=entry.version, release_date=entry.release_date)
+
+
+class _FetchCancelled(Exception):
+    pass
+
+
+def _iter_chunks(
+    response: "requests.Response",
+    cancel_event: threading.Event | None,
+    received: list[bytes],
+):
+    for chunk in response.iter_content(chunk_size=16 * 1024):
+        if cancel_event is not None and cancel_event.is_set():
+            raise _FetchCancelled(f"Fetching of {response.url} cancelled")
+        received.append(chunk)
+        yield chunk
+
+
+def _normalize_version(version: str) -> str:
+    return version.strip().replace("WHQL", "").strip()
+
+
+def _info_from_fields(fields: dict[str, str]) -> CurrentDriverInfo | None:
+    version = _normalize_version(fields.get(VERSION_ID, ""))
+    if not version:
+        return None
+    release_date = fields.get(RELEASE_DATE_ID, "").strip()
+    return CurrentDriverInfo(
+        version=version, release_date=release_date or NOT_FOUND_RELEASE_DATE
+    )
+
+
+@metrics.timed("driver_page_soup_parse_seconds")
+def _parse_driver_info(page: str) -> CurrentDriverInfo | None:
+    """Full BeautifulSoup parse, used when the streaming extraction fails."""
+    from bs4 import BeautifulSoup as Bs
+    from bs4.builder import ParserRejectedMarkup
+
+    try:
+        soup = Bs(page, features="html.parser")
+    except ParserRejectedMarkup as e:
+        logger.warning(f"Could not parse driver page: {e}")
+        return None
+    fields = {}
+    for field_id in (VERSION_ID, RELEASE_DATE_ID):
+        tag = soup.find(id=field_id)
+        if tag and tag.text:
+            fields[field_id] = tag.text
+    return _info_from_fields(fields)
+
+
+def _read_driver_info(
+    response: "requests.Response", cancel_event: threading.Event | None
+) -> CurrentDriverInfo | None:
+    encoding = response.encoding or "utf-8"
+    try:
+        codecs.lookup(encoding)
+    except LookupError:
+        logger.debug(f"Unknown charset {encoding} of {response.url}, using utf-8")
+        encoding = "utf-8"
+    received: list[bytes] = []
+    fields = extract_driver_fields(
+        _iter_chunks(response, cancel_event, received), encoding
+    )
+    info = _info_from_fields(fields)
+    if info is not None and RELEASE_DATE_ID in fields:
+        return info
+    # The streaming parser read the whole page without finding both fields
+    logger.debug(f"Falling back to full parse of {response.url}")
+    page = b"".join(received).decode(encoding, errors="replace")
+    return _parse_driver_info(page) or info
+
+
+def _fetch_from_proxy(
+    proxy: str, url: str, session: "requests.Session"
+) -> CurrentDriverInfo | None:
+    """Ask a check proxy for the driver info, None if the proxy is unusable."""
+    import requests
+
     try:
-        response = requests.get(url)
-        soup = Bs(response.text, features="html.parser")
+        response = session.get(
+            f"{proxy.rstrip('/')}/latest",
+            params={"dl_link": url},
+            timeout=DEFAULT_TIMEOUT,
+        )
+        response.raise_for_status()
+        return CurrentDriverInfo.from_dict(response.json())
+    except (requests.RequestException, ValueError, KeyError, TypeError) as e:
+        logger.warning(f"Check proxy {proxy} failed, fetching directly: {e}")
+        return None
+
+
+def get_current_driver_version(
+    url: str | None,
+    cancel_event: threading.Event | None = None,
+    session: "requests.Session | None" = None,
+    cache: DriverInfoCache | None = None,
+    proxy: str | None = None,
+    max_age: float | None = None,
+) -> CurrentDriverInfo:
+    """
+    Fetch the version and release date of the driver page ``url``.
 
-        version_tag = soup.find(id="tdVersion")
-        if not version_tag:
-            return driver_info
+    Cached driver info younger than ``max_age`` seconds (default the cache's ttl) is
+    returned without a request. ``max_age=0`` always asks the server, a cached page
+    is then revalidated with a conditional request.
 
-        current_version = version_tag.text
-        if not current_version:
-            return driver_info
-        driver_info.version = current_version.strip().replace("WHQL", "").strip()
+    With a ``proxy`` (or the ``PYVIDIA_CHECK_PROXY`` environment variable) the check
+    proxy is asked first, the driver page is only fetched if the proxy is unusable.
+    The page is fetched from ``PYVIDIA_NVIDIA_BASE_URL`` instead of nvidia.com if set.
+    """
+    with metrics.span("driver_check_seconds"):
+        info = _check_driver_version(url, cancel_event, session, cache, proxy, max_age)
+    metrics.count("driver_checks_total", status=info.status.value)
+    return info
 
-        release_date_tag = soup.find(id="tdReleaseDate")
-        if not release_date_tag:
-            return driver_info
 
-        release_date = release_date_tag.text
-        if not release_date:
-            return driver_info
-        driver_info.release_date = release_date.strip()
+def _check_driver_version(
+    url: str | None,
+    cancel_event: threading.Event | None,
+    session: "requests.Session | None",
+    cache: DriverInfoCache | None,
+    proxy: str | None,
+    max_age: float | None,
+) -> CurrentDriverInfo:
+    if not url or url == NOT_FOUND_URL:
+        return CurrentDriverInfo.failed(DriverInfoStatus.NOT_FOUND)
+    # Imported lazily to keep it off the GUI startup path
+    import requests
 
-        return driver_info
-    except Exception as e:
+    session = session or get_session()
+    cache = cache or get_driver_info_cache()
+    proxy = proxy if proxy is not None else os.environ.get(CHECK_PROXY_ENV)
+    # The proxy gets the nvidia.com url, the cache and the direct fetch the rebased one
+    page_url = rebase_nvidia_url(url)
+
+    entry = cache.get(page_url)
+    if entry is not None and cache.is_fresh(entry, max_age=max_age):
+        logger.debug(f"Serving driver info for {page_url} from cache")
+        metrics.count("driver_check_sources_total", source="cache")
+        return _info_from_entry(entry)
+    if proxy:
+        with metrics.span("driver_proxy_request_seconds"):
+            info = _fetch_from_proxy(proxy, url, session)
+        if info is not None:
+            metrics.count("driver_check_sources_total", source="proxy")
+            if info.ok:
+                cache.put(
+                    page_url, version=info.version, release_date=info.release_date
+                )
+            return info
+    # Time to the response headers: DNS, connection and TLS setup, server time
+    request_start = time.perf_counter()
+    try:
+        with session.get(
+            page_url,
+            headers=_conditional_headers(entry),
+            timeout=DEFAULT_TIMEOUT,
+            stream=True,
+        ) as response:
+            metrics.observe(
+                "driver_page_response_seconds", time.perf_counter() - request_start
+            )
+            if response.status_code == 304 and entry is not None:
+                # Consume the empty body so the connection goes back to the pool
+                _ = response.content
+                logger.debug(f"{page_url} not modified, using cached driver info")
+                metrics.count("driver_check_sources_total", source="not_modified")
+                return _info_from_entry(cache.touch(page_url) or entry)
+            if response.status_code == 404:
+                return CurrentDriverInfo.failed(DriverInfoStatus.NOT_FOUND)
+            response.raise_for_status()
+            metrics.count("driver_check_sources_total", source="download")
+            # Download and streaming parse, they overlap chunk by chunk
+            with metrics.span("driver_page_read_seconds"):
+                info = _read_driver_info(response, cancel_event)
+            if info is None:
+                return CurrentDriverInfo.failed(DriverInfoStatus.PARSE_ERROR)
+            cache.put(
+                page_url,
+                version=info.version,
+                release_date=info.release_date,
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+            )
+            return info
+    except _FetchCancelled as e:
+        logger.debug(e)
+        return CurrentDriverInfo.failed(DriverInfoStatus.NETWORK_ERROR)
+    except requests.RequestException as e:
         logger.error(e)
-        return driver_info
+        return CurrentDriverInfo.failed(DriverInfoStatus.NETWORK_ERROR)
@@ -1,8 +1,13 @@
 import logging
 import os
-import pickle
+import time
+from collections.abc import Mapping
 
+from pyvidia_update.source.catalog import DriverCatalog, load_catalog_from_pickle
+from pyvidia_update.source.catalog_file import MappedCatalog
+from pyvidia_update.source.catalog_jsonl import load_catalog_from_jsonl
 from pyvidia_update.source.get_files import get_packaged_files_path
+from pyvidia_update.source.metrics import metrics
 
 logger = logging.getLogger(__name__)
 
@@ -11,15 +16,39 @@ filepath = get_packaged_files_path()
 
 
 class DropdownData:
+    catalog_data_path: str = f"{filepath}/data/nvidia-driver-catalog.bin"
+    jsonl_data_path: str = f"{filepath}/data/nvidia-driver-catalog.jsonl.gz"
     pickle_data_path: str = f"{filepath}/data/nvidia-dropdown-values.pkl"
-    data: dict = {}
+    catalog: DriverCatalog | MappedCatalog
     switch_kv: bool = False
 
     def __init__(self, switch_kv: bool = False):
-        self.data = self._load_data()
+        start = time.perf_counter()
+        self.catalog = self._load_data()
+        metrics.observe(
+            "catalog_load_seconds",
+            time.perf_counter() - start,
+            backend=type(self.catalog).__name__,
+        )
         self.switch_kv = switch_kv
-
-    def _load_data(self):
+        if metrics.enabled:
+            # Bound per instance, so lookups cost nothing extra without metrics
+            self._get_children = self._timed_get_children
+            self.get_download_link = self._timed_get_download_link
+
+    def _load_data(self) -> DriverCatalog | MappedCatalog:
+        if os.path.exists(self.catalog_data_path):
+            try:
+                logger.debug(f"Mapping catalog file {self.catalog_data_path}")
+                return MappedCatalog(self.catalog_data_path)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Falling back to exported catalog data: {e}")
+        if os.path.exists(self.jsonl_data_path):
+            try:
+                logger.debug(f"Streaming catalog export {self.jsonl_data_path}")
+                return load_catalog_from_jsonl(self.jsonl_data_path)
+            except (OSError, EOFError, ValueError, RuntimeError) as e:
+                logger.warning(f"Falling back to pickle data: {e}")
         if not os.path.exists(self.pickle_data_path):
             logger.error(f"Path {self.pickle_data_path} does not exist")
             raise FileNotFoundError(
@@ -27,96 +56,38 @@ class DropdownData:
                 f"\nCurrent Path: {os.curdir} \n"
                 f"|_ {'\n|_ '.join(os.listdir('.'))}"
             )
-        with open(self.pickle_data_path, "rb") as f:
-            data: dict = pickle.load(f)
-            logger.debug(f"Loading data from file {self.pickle_data_path}")
-            if not data:
-                logger.warning(
-                    f"File {self.pickle_data_path} does not contain any data"
-                )
-                return {}
-        return data
-
-    def _switch_key_values(self, data: dict):
-        if self.switch_kv is False:
-            return data
-        return {v: k for k, v in data.items()}
-
-    def get_product_type_data(self):
-        return self._switch_key_values(
-            {k: v.get("verbose_name", "") for k, v in self.data.items()}
-        )
-
-    def get_product_series_data(self, product_type_id: str):
-        if product_type_id not in self.data.keys():
-            raise ValueError(f"Key {product_type_id} does not exist in data!")
-        return self._switch_key_values(
-            {
-                k: v.get("verbose_name", "")
-                for k, v in self.data[product_type_id].items()
-                if k != "verbose_name"
-            }
-        )
+        logger.debug(f"Loading data from file {self.pickle_data_path}")
+        return load_catalog_from_pickle(self.pickle_data_path)
 
-    def get_product_data(self, product_type_id: str, product_series_id: str):
-        if (
-            product_type_id not in self.data.keys()
-            or product_series_id not in self.data[product_type_id].keys()
-        ):
+    def _get_children(self, *path: str) -> Mapping[str, str]:
+        if not self.catalog.has_path(path):
             raise ValueError(
-                f"Key combination {product_type_id}, {product_series_id} does not exist in data!"
+                f"Key combination {', '.join(map(str, path))} does not exist in data!"
             )
-        return self._switch_key_values(
-            {
-                k: v.get("verbose_name", "")
-                for k, v in self.data[product_type_id][product_series_id].items()
-                if k != "verbose_name"
-            }
-        )
+        if self.switch_kv:
+            return self.catalog.children_by_name(path)
+        return self.catalog.children(path)
+
+    def get_product_type_data(self) -> Mapping[str, str]:
+        return self._get_children()
+
+    def get_product_series_data(self, product_type_id: str) -> Mapping[str, str]:
+        return self._get_children(product_type_id)
+
+    def get_product_data(
+        self, product_type_id: str, product_series_id: str
+    ) -> Mapping[str, str]:
+        return self._get_children(product_type_id, product_series_id)
 
     def get_os_data(
         self, product_type_id: str, product_series_id: str, product_id: str
-    ):
-        if (
-            product_type_id not in self.data.keys()
-            or product_series_id not in self.data[product_type_id].keys()
-            or product_id not in self.data[product_type_id][product_series_id].keys()
-        ):
-            raise ValueError(
-                f"Key combination {product_type_id}, {product_series_id}, {product_id} does not exist in data!"
-            )
-        return self._switch_key_values(
-            {
-                k: v.get("verbose_name", "")
-                for k, v in self.data[product_type_id][product_series_id][
-                    product_id
-                ].items()
-                if k != "verbose_name"
-            }
-        )
+    ) -> Mapping[str, str]:
+        return self._get_children(product_type_id, product_series_id, product_id)
 
     def get_dt_data(
         self, product_type_id: str, product_series_id: str, product_id: str, os_id: str
-    ):
-        if (
-            product_type_id not in self.data.keys()
-            or product_series_id not in self.data[product_type_id].keys()
-            or product_id not in self.data[product_type_id][product_series_id].keys()
-            or os_id
-            not in self.data[product_type_id][product_series_id][product_id].keys()
-        ):
-            raise ValueError(
-                f"Key combination {product_type_id}, {product_series_id}, {product_id}, {os_id} does not exist in data!"
-            )
-        return self._switch_key_values(
-            {
-                k: v.get("verbose_name", "")
-                for k, v in self.data[product_type_id][product_series_id][product_id][
-                    os_id
-                ].items()
-                if k != "verbose_name"
-            }
-        )
+    ) -> Mapping[str, str]:
+        return self._get_children(product_type_id, product_series_id, product_id, os_id)
 
     def get_language_data(
         self,
@@ -125,29 +96,9 @@ class DropdownData:
         product_id: str,
         os_id: str,
         dt_id: str,
-    ):
-        if (
-            product_type_id not in self.data.keys()
-            or product_series_id not in self.data[product_type_id].keys()
-            or product_id not in self.data[product_type_id][product_series_id].keys()
-            or os_id
-            not in self.data[product_type_id][product_series_id][product_id].keys()
-            or dt_id
-            not in self.data[product_type_id][product_series_id][product_id][
-                os_id
-            ].keys()
-        ):
-            raise ValueError(
-                f"Key combination {product_type_id}, {product_series_id}, {product_id}, {os_id}, {dt_id} does not exist in data!"
-            )
-        return self._switch_key_values(
-            {
-                k: v.get("verbose_name", "")
-                for k, v in self.data[product_type_id][product_series_id][product_id][
-                    os_id
-                ][dt_id].items()
-                if k != "verbose_name"
-            }
+    ) -> Mapping[str, str]:
+        return self._get_children(
+            product_type_id, product_series_id, product_id, os_id, dt_id
         )
 
     def get_download_link(
@@ -159,25 +110,20 @@ class DropdownData:
         dt_id: str,
         language_id: str,
     ) -> str:
-        if (
-            product_type_id not in self.data.keys()
-            or product_series_id not in self.data[product_type_id].keys()
-            or product_id not in self.data[product_type_id][product_series_id].keys()
-            or os_id
-            not in self.data[product_type_id][product_series_id][product_id].keys()
-            or dt_id
-            not in self.data[product_type_id][product_series_id][product_id][
-                os_id
-            ].keys()
-            or language_id
-            not in self.data[product_type_id][product_series_id][product_id][os_id][
-                language_id
-            ].keys()
-        ):
+        download_url = self.catalog.download_url(
+            (product_type_id, product_series_id, product_id, os_id, dt_id, language_id)
+        )
+        if download_url is None:
             logger.error(
                 f"Key combination {product_type_id}, {product_series_id}, {product_id}, {os_id}, {dt_id}, {language_id} does not exist in data!"
             )
             return ""
-        return self.data[product_type_id][product_series_id][product_id][os_id][dt_id][
-            language_id
-        ].get("download_url", "not_found")
+        return download_url
+
+    def _timed_get_children(self, *path: str) -> Mapping[str, str]:
+        with metrics.span("catalog_lookup_seconds", depth=len(path)):
+            return type(self)._get_children(self, *path)
+
+    def _timed_get_download_link(self, *path: str) -> str:
+        with metrics.span("catalog_lookup_seconds", depth=len(path)):
+            return type(self).get_download_link(self, *path)
@@ -1,17 +1,161 @@
+import csv
 import logging
+import os
+import shutil
 import subprocess
+import threading
+import time
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
 
+from pyvidia_update.source.metrics import metrics
 
 logger = logging.getLogger(__name__)
 
 
-def get_current_nvidia_driver_version():
-    try:
-        output = subprocess.check_output(
-            "nvidia-smi --query-gpu=driver_version --format=csv,noheader --id=0"
+NOT_FOUND_SYSTEM_VERSION = "Current system driver version not found!"
+DEFAULT_TTL = 5 * 60
+QUERY_FIELDS = ("index", "name", "driver_version", "pci.bus_id")
+
+
+@dataclass(frozen=True)
+class GpuInfo:
+    index: int
+    name: str
+    driver_version: str
+    pci_bus_id: str
+
+
+@dataclass(frozen=True)
+class SystemInfo:
+    gpus: tuple[GpuInfo, ...]
+    probed_at: float
+
+    @property
+    def driver_version(self) -> str | None:
+        return self.gpus[0].driver_version if self.gpus else None
+
+
+def _parse_gpus(output: str) -> tuple[GpuInfo, ...]:
+    gpus = []
+    for row in csv.reader(output.splitlines(), skipinitialspace=True):
+        if len(row) != len(QUERY_FIELDS):
+            continue
+        index, name, driver_version, pci_bus_id = (value.strip() for value in row)
+        gpus.append(
+            GpuInfo(
+                index=int(index),
+                name=name,
+                driver_version=driver_version,
+                pci_bus_id=pci_bus_id,
+            )
         )
-        version = output.decode("utf-8")
-        return version.strip()
-    except Exception as e:
-        logger.error(e)
-        return "Current system driver version not found!"
+    return tuple(sorted(gpus, key=lambda gpu: gpu.index))
+
+
+class SystemInfoProvider:
+    """
+    Queries all GPU fields with one ``nvidia-smi`` call and caches the result.
+
+    The cached result is reused until ``ttl`` seconds passed or the modification
+    time of one of the ``watch_paths`` changed. By default the resolved
+    ``nvidia-smi`` executable is watched, which is replaced by every driver install.
+    ``command`` can point to any executable with the same output, e.g. a fake
+    ``nvidia-smi`` in tests.
+    """
+
+    def __init__(
+        self,
+        command: Sequence[str] | None = None,
+        ttl: float = DEFAULT_TTL,
+        watch_paths: Sequence[str] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if command is None:
+            command = (os.environ.get("PYVIDIA_NVIDIA_SMI", "nvidia-smi"),)
+        self.command = tuple(command)
+        self.ttl = ttl
+        self.clock = clock
+        if watch_paths is None:
+            executable = shutil.which(self.command[0])
+            watch_paths = (executable,) if executable else ()
+        self.watch_paths = tuple(watch_paths)
+
+        self._info: SystemInfo | None = None
+        self._signature: tuple[float | None, ...] = ()
+        self._lock = threading.Lock()
+
+    def _current_signature(self) -> tuple[float | None, ...]:
+        signature = []
+        for path in self.watch_paths:
+            try:
+                signature.append(os.stat(path).st_mtime)
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+
+    @metrics.timed("nvidia_smi_seconds")
+    def _probe(self) -> SystemInfo:
+        try:
+            output = subprocess.check_output(
+                [
+                    *self.command,
+                    f"--query-gpu={','.join(QUERY_FIELDS)}",
+                    "--format=csv,noheader",
+                ],
+                timeout=10,
+            )
+            gpus = _parse_gpus(output.decode("utf-8"))
+        except Exception as e:
+            logger.error(e)
+            gpus = ()
+        return SystemInfo(gpus=gpus, probed_at=self.clock())
+
+    def is_stale(self) -> bool:
+        if self._info is None:
+            return True
+        if self.clock() - self._info.probed_at >= self.ttl:
+            return True
+        return self._current_signature() != self._signature
+
+    def query(self, force: bool = False) -> SystemInfo:
+        with self._lock:
+            if force or self.is_stale():
+                metrics.count("system_info_queries_total", cached="false")
+                self._signature = self._current_signature()
+                self._info = self._probe()
+            else:
+                metrics.count("system_info_queries_total", cached="true")
+            return self._info
+
+    def invalidate(self):
+        with self._lock:
+            self._info = None
+
+
+_provider: SystemInfoProvider | None = None
+_provider_lock = threading.Lock()
+
+
+def get_system_info_provider() -> SystemInfoProvider:
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            _provider = SystemInfoProvider()
+        return _provider
+
+
+def set_system_info_provider(provider: SystemInfoProvider | None):
+    global _provider
+    with _provider_lock:
+        _provider = provider
+
+
+@metrics.timed("system_driver_version_seconds")
+def get_current_nvidia_driver_version():
+    return get_system_info_provider().query().driver_version or NOT_FOUND_SYSTEM_VERSION
+
+
+def get_nvidia_gpus() -> list[GpuInfo]:
+    """All local GPUs, from a single (cached) ``nvidia-smi`` call."""
+    return list(get_system_info_provider().query().gpus)
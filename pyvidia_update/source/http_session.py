@@ -0,0 +1,74 @@
+import os
+import threading
+from typing import TYPE_CHECKING
+from urllib.parse import urlsplit, urlunsplit
+
+if TYPE_CHECKING:
+    import requests
+
+DEFAULT_TIMEOUT = (5, 15)
+USER_AGENT = "pyvidia-update"
+NVIDIA_BASE_URL = "https://www.nvidia.com"
+NVIDIA_HOSTS = ("www.nvidia.com", "nvidia.com")
+# Replaces NVIDIA_BASE_URL, e.g. http://127.0.0.1:8080 for a replay server
+# (python -m scraper.replay serve)
+NVIDIA_BASE_URL_ENV = "PYVIDIA_NVIDIA_BASE_URL"
+
+_session: "requests.Session | None" = None
+_session_lock = threading.Lock()
+
+
+def create_session(
+    retries: int = 3, backoff_factor: float = 0.5, pool_maxsize: int = 10
+) -> "requests.Session":
+    # Imported lazily to keep it off the GUI startup path
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    session = requests.Session()
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=("GET", "HEAD"),
+        respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(max_retries=retry, pool_maxsize=pool_maxsize)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["User-Agent"] = USER_AGENT
+    return session
+
+
+def get_session() -> "requests.Session":
+    """Shared keep-alive session, so repeated checks reuse pooled connections."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = create_session()
+        return _session
+
+
+def set_session(session: "requests.Session | None"):
+    """Replace the shared session, e.g. to point it at a local stand-in server."""
+    global _session
+    with _session_lock:
+        if _session is not None and _session is not session:
+            _session.close()
+        _session = session
+
+
+def nvidia_base_url() -> str:
+    """Scheme and host to send nvidia.com requests to."""
+    return os.environ.get(NVIDIA_BASE_URL_ENV, "").rstrip("/") or NVIDIA_BASE_URL
+
+
+def rebase_nvidia_url(url: str) -> str:
+    """Point an nvidia.com url at the ``PYVIDIA_NVIDIA_BASE_URL`` override, if set."""
+    base = os.environ.get(NVIDIA_BASE_URL_ENV)
+    parts = urlsplit(url)
+    if not base or parts.hostname not in NVIDIA_HOSTS:
+        return url
+    base_parts = urlsplit(base)
+    return urlunsplit((base_parts.scheme, base_parts.netloc, *parts[2:]))
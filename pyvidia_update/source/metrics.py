@@ -0,0 +1,237 @@
+"""
+Timing spans, counters and latency histograms of the check pipeline.
+
+Disabled by default, then every call returns after a single attribute check. Enabled
+by setting ``PYVIDIA_METRICS=1``, passing ``--metrics`` to the command line interface
+or calling ``metrics.enable()``:
+
+    with metrics.span("driver_page_read_seconds"):
+        ...
+    metrics.count("driver_checks_total", status="ok")
+
+``snapshot()`` returns all values as JSON compatible dict, ``to_prometheus()`` in the
+Prometheus text format. The check proxy serves both on /metrics.
+"""
+
+import bisect
+import functools
+import os
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+METRICS_ENV = "PYVIDIA_METRICS"
+PROMETHEUS_PREFIX = "pyvidia_"
+# Upper bounds in seconds, from catalog lookups up to slow driver page downloads
+DEFAULT_BUCKETS = (
+    0.0001,
+    0.0005,
+    0.001,
+    0.005,
+    0.01,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+Labels = tuple[tuple[str, str], ...]
+
+
+@dataclass
+class Histogram:
+    buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    # One count per bucket plus the +Inf bucket, not cumulative
+    counts: list[int] = field(init=False)
+    total: float = 0.0
+    count: int = 0
+
+    def __post_init__(self):
+        self.counts = [0] * (len(self.buckets) + 1)
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float | None:
+        """Upper bound of the bucket holding the ``q`` quantile, None if empty."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def cumulative(self) -> list[tuple[str, int]]:
+        bounds = [*(str(bound) for bound in self.buckets), "+Inf"]
+        seen = 0
+        result = []
+        for bound, count in zip(bounds, self.counts):
+            seen += count
+            result.append((bound, seen))
+        return result
+
+
+class _Span:
+    __slots__ = ("_labels", "_name", "_registry", "_start")
+
+    def __init__(self, registry: "MetricsRegistry", name: str, labels: Labels):
+        self._registry = registry
+        self._name = name
+        self._labels = labels
+        self._start = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._registry._observe(
+            self._name, time.perf_counter() - self._start, self._labels
+        )
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def _labels(labels: dict) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _prometheus_labels(labels: Labels, extra: tuple[str, str] | None = None) -> str:
+    pairs = [*labels, extra] if extra else labels
+    if not pairs:
+        return ""
+    escaped = (
+        f'{key}="{value.replace("\\", "\\\\").replace('"', '\\"')}"'
+        for key, value in pairs
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+class MetricsRegistry:
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._counters: dict[tuple[str, Labels], float] = {}
+        self._histograms: dict[tuple[str, Labels], Histogram] = {}
+        self._lock = threading.Lock()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def count(self, name: str, value: float = 1, **labels):
+        if not self.enabled:
+            return
+        key = (name, _labels(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, **labels):
+        if self.enabled:
+            self._observe(name, seconds, _labels(labels))
+
+    def _observe(self, name: str, seconds: float, labels: Labels):
+        key = (name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(seconds)
+
+    def span(self, name: str, **labels) -> _Span | _NullSpan:
+        """Context manager recording its duration in the histogram ``name``."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, _labels(labels))
+
+    def timed(self, name: str, **labels) -> Callable:
+        """Decorator recording the duration of every call in the histogram ``name``."""
+
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with self.span(name, **labels):
+                    return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counters = [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in sorted(self._counters.items())
+            ]
+            histograms = [
+                {
+                    "name": name,
+                    "labels": dict(labels),
+                    "count": histogram.count,
+                    "sum": histogram.total,
+                    "p50": histogram.quantile(0.5),
+                    "p95": histogram.quantile(0.95),
+                    "buckets": dict(histogram.cumulative()),
+                }
+                for (name, labels), histogram in sorted(self._histograms.items())
+            ]
+        return {"enabled": self.enabled, "counters": counters, "histograms": histograms}
+
+    def to_prometheus(self) -> str:
+        lines = []
+        typed = set()
+        with self._lock:
+            for (name, labels), value in sorted(self._counters.items()):
+                metric = PROMETHEUS_PREFIX + name
+                if metric not in typed:
+                    typed.add(metric)
+                    lines.append(f"# TYPE {metric} counter")
+                lines.append(f"{metric}{_prometheus_labels(labels)} {value:g}")
+            for (name, labels), histogram in sorted(self._histograms.items()):
+                metric = PROMETHEUS_PREFIX + name
+                if metric not in typed:
+                    typed.add(metric)
+                    lines.append(f"# TYPE {metric} histogram")
+                for bound, count in histogram.cumulative():
+                    bucket_labels = _prometheus_labels(labels, ("le", bound))
+                    lines.append(f"{metric}_bucket{bucket_labels} {count}")
+                lines.append(
+                    f"{metric}_sum{_prometheus_labels(labels)} {histogram.total:.9g}"
+                )
+                lines.append(
+                    f"{metric}_count{_prometheus_labels(labels)} {histogram.count}"
+                )
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry(enabled=bool(os.environ.get(METRICS_ENV)))
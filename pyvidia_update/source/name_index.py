@@ -0,0 +1,221 @@
+"""
+Find the catalog product of a local GPU by its ``nvidia-smi`` name.
+
+The product names of the catalog are normalized into tokens and token bigrams, which
+are kept in an inverted index. A GPU name is ranked against the products sharing its
+model number tokens by the IDF weighted overlap of their features:
+
+    index = ProductNameIndex.from_catalog(dd.catalog)
+    index.match("NVIDIA GeForce RTX 4070 Ti SUPER")  # ("1", "127", "...")
+"""
+
+import logging
+import math
+import re
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from pyvidia_update.source.catalog import DriverCatalog
+from pyvidia_update.source.catalog_file import MappedCatalog
+from pyvidia_update.source.get_system_info import GpuInfo
+from pyvidia_update.source.user_saved_data import SelectedDrivers
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_MIN_SCORE = 0.6
+# Score factor of a product in a notebook series for a desktop GPU and vice versa
+FORM_FACTOR_PENALTY = 0.8
+# The "Show all Product Series" entry repeats products of the other series
+SKIPPED_SERIES = ("All",)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_MEMORY_RE = re.compile(r"\d+gb")
+# Words of nvidia-smi and catalog names that say nothing about the model
+_NOISE_TOKENS = frozenset({"nvidia", "gpu", "graphics", "with", "design"})
+_MOBILE_TOKENS = frozenset({"laptop", "notebook", "notebooks", "mobile", "max", "q"})
+# Suffixes naming a model of their own, a 4070 Ti is no 4070
+_VARIANT_TOKENS = frozenset({"ti", "super", "d"})
+
+
+@dataclass(frozen=True)
+class NormalizedName:
+    tokens: tuple[str, ...]
+    mobile: bool
+
+    @property
+    def features(self) -> frozenset[str]:
+        bigrams = (f"{a} {b}" for a, b in zip(self.tokens, self.tokens[1:]))
+        return frozenset((*self.tokens, *bigrams))
+
+    @property
+    def model_tokens(self) -> frozenset[str]:
+        """Tokens with digits, e.g. 4070 or p5000, and variant suffixes like Ti."""
+        return frozenset(
+            token
+            for token in self.tokens
+            if token in _VARIANT_TOKENS or any(c.isdigit() for c in token)
+        )
+
+
+def normalize_name(name: str) -> NormalizedName:
+    """
+    Lower case model tokens of a GPU name without vendor, memory size and notebook
+    markers like "Laptop GPU" or "with Max-Q Design", which set ``mobile`` instead.
+    """
+    tokens = []
+    mobile = False
+    for token in _TOKEN_RE.findall(name.lower()):
+        if token in _MOBILE_TOKENS:
+            mobile = True
+        elif token not in _NOISE_TOKENS and not _MEMORY_RE.fullmatch(token):
+            tokens.append(token)
+    return NormalizedName(tuple(tokens), mobile)
+
+
+@dataclass(frozen=True)
+class ProductMatch:
+    path: tuple[str, str, str]
+    name: str
+    score: float
+
+
+class ProductNameIndex:
+    def __init__(self, products: Iterable[tuple[tuple[str, str, str], str, bool]]):
+        """``products`` are (dtcid, psid, pfid) paths, names and notebook flags."""
+        self._paths: list[tuple[str, str, str]] = []
+        self._names: list[str] = []
+        self._features: list[frozenset[str]] = []
+        self._model_tokens: list[frozenset[str]] = []
+        self._mobile: list[bool] = []
+        self._postings: dict[str, list[int]] = {}
+        for path, name, in_notebook_series in products:
+            normalized = normalize_name(name)
+            if not normalized.tokens:
+                continue
+            index = len(self._paths)
+            self._paths.append(path)
+            self._names.append(name)
+            self._features.append(normalized.features)
+            self._model_tokens.append(normalized.model_tokens)
+            self._mobile.append(normalized.mobile or in_notebook_series)
+            for feature in normalized.features:
+                self._postings.setdefault(feature, []).append(index)
+
+        count = len(self._paths)
+        self._idf = {
+            feature: math.log(1 + count / len(postings))
+            for feature, postings in self._postings.items()
+        }
+        # Weight of features the catalog does not know
+        self._unknown_idf = math.log(1 + max(count, 1))
+        self._weights = [self._weight(features) for features in self._features]
+
+    @classmethod
+    def from_catalog(cls, catalog: DriverCatalog | MappedCatalog) -> "ProductNameIndex":
+        def products():
+            for dtcid in catalog.children(()):
+                for psid, series_name in catalog.children((dtcid,)).items():
+                    if psid in SKIPPED_SERIES:
+                        continue
+                    notebook = normalize_name(series_name).mobile
+                    for pfid, name in catalog.children((dtcid, psid)).items():
+                        yield (dtcid, psid, pfid), name, notebook
+
+        return cls(products())
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    def _weight(self, features: Iterable[str]) -> float:
+        return sum(self._idf.get(feature, self._unknown_idf) for feature in features)
+
+    def search(self, gpu_name: str, limit: int = 5) -> list[ProductMatch]:
+        """Best matching products of ``gpu_name``, best first."""
+        query = normalize_name(gpu_name)
+        features = query.features
+        if not features:
+            return []
+        model_tokens = query.model_tokens
+        if model_tokens:
+            postings = [self._postings.get(token, ()) for token in model_tokens]
+            candidates = set(postings[0]).intersection(*postings[1:])
+        else:
+            candidates = set().union(*(self._postings.get(f, ()) for f in features))
+        query_weight = self._weight(features)
+
+        ranked = []
+        for index in candidates:
+            # Model numbers have to match exactly, 4080 is no 4080 SUPER or 4070
+            if self._model_tokens[index] != model_tokens:
+                continue
+            common = self._weight(features & self._features[index])
+            score = 2 * common / (query_weight + self._weights[index])
+            if self._mobile[index] != query.mobile:
+                score *= FORM_FACTOR_PENALTY
+            ranked.append((-score, index))
+        # Equal scores go to the product listed first in the catalog
+        ranked.sort()
+        return [
+            ProductMatch(self._paths[index], self._names[index], -negative_score)
+            for negative_score, index in ranked[:limit]
+        ]
+
+    def match(
+        self, gpu_name: str, min_score: float = DEFAULT_MIN_SCORE
+    ) -> ProductMatch | None:
+        """The best product of ``gpu_name``, None if no product is close enough."""
+        matches = self.search(gpu_name, limit=1)
+        if not matches or matches[0].score < min_score:
+            return None
+        return matches[0]
+
+
+def selection_for_product(
+    catalog: DriverCatalog | MappedCatalog, path: tuple[str, ...]
+) -> SelectedDrivers | None:
+    """
+    Complete a (dtcid, psid, pfid) path with the first OS, download type and
+    language, the same defaults the config window preselects.
+    """
+    path = tuple(path)
+    while len(path) < 6:
+        children = catalog.children(path)
+        if not children:
+            return None
+        path = (*path, next(iter(children)))
+    return SelectedDrivers.from_dict(
+        {
+            "product_type": path[0],
+            "product_series": path[1],
+            "product": path[2],
+            "os": path[3],
+            "dt": path[4],
+            "language": path[5],
+            "dl_link": catalog.download_url(path),
+        }
+    )
+
+
+def detect_selections(
+    catalog: DriverCatalog | MappedCatalog,
+    gpus: Iterable[GpuInfo],
+    index: ProductNameIndex | None = None,
+) -> list[SelectedDrivers]:
+    """One driver selection per distinct local GPU model found in the catalog."""
+    index = index or ProductNameIndex.from_catalog(catalog)
+    selections = []
+    seen = set()
+    for gpu in gpus:
+        match = index.match(gpu.name)
+        if match is None:
+            logger.info(f"No catalog product found for {gpu.name}")
+            continue
+        if match.path in seen:
+            continue
+        seen.add(match.path)
+        logger.info(f"Detected {match.name} for {gpu.name} ({match.score:.2f})")
+        selection = selection_for_product(catalog, match.path)
+        if selection is not None:
+            selections.append(selection)
+    return selections
@@ -0,0 +1,239 @@
+import logging
+import random
+import socket
+import threading
+import time
+from collections.abc import Callable
+
+from pyvidia_update.source.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_INTERVAL = 60 * 60
+DEFAULT_NOTIFY_INTERVAL = 6 * 60 * 60
+DEFAULT_NETWORK_POLL_INTERVAL = 30
+# TEST-NET-1 address, only used to pick the route, nothing is sent to it
+_ROUTE_PROBE_ADDRESS = ("192.0.2.1", 9)
+
+
+class Clock:
+    """Time source of the scheduler. Tests can substitute a fake implementation."""
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    def time(self) -> float:
+        return time.time()
+
+    def wait(self, event: threading.Event, timeout: float) -> bool:
+        return event.wait(timeout)
+
+
+class NotificationThrottle:
+    """
+    Decides whether an update notification should be shown.
+
+    A new version is announced right away, the same version again only after
+    ``min_interval`` seconds since the last notification.
+    """
+
+    def __init__(
+        self, min_interval: float = DEFAULT_NOTIFY_INTERVAL, clock: Clock | None = None
+    ):
+        self.min_interval = min_interval
+        self.clock = clock or Clock()
+        self._last_version: str | None = None
+        self._last_notified: float | None = None
+
+    def should_notify(self, version: str) -> bool:
+        now = self.clock.monotonic()
+        if (
+            version == self._last_version
+            and self._last_notified is not None
+            and now - self._last_notified < self.min_interval
+        ):
+            return False
+        self._last_version = version
+        self._last_notified = now
+        return True
+
+    def reset(self):
+        self._last_version = None
+        self._last_notified = None
+
+
+class UpdateScheduler:
+    """
+    Runs ``check`` periodically on a background thread.
+
+    The next check is due after ``interval`` seconds, spread by up to ``jitter``
+    (a fraction of the interval) so a fleet of machines does not check in lockstep.
+    A failed check (returning False or raising) is retried with exponential backoff
+    starting at ``initial_backoff`` and capped at ``max_backoff``. A check with nothing
+    to do, e.g. without a selected driver, has to return True, it would not succeed
+    any sooner when retried. ``wake`` triggers
+    an immediate check, e.g. when the network comes up, and a jump of the wall clock
+    against the monotonic clock is treated as a wake-up from system sleep.
+    """
+
+    def __init__(
+        self,
+        check: Callable[[], bool],
+        interval: float = DEFAULT_INTERVAL,
+        jitter: float = 0.1,
+        initial_backoff: float = 60,
+        max_backoff: float = DEFAULT_INTERVAL,
+        run_immediately: bool = False,
+        clock: Clock | None = None,
+        rng: random.Random | None = None,
+        poll_interval: float = 60,
+        sleep_threshold: float = 120,
+    ):
+        self.check = check
+        self.interval = interval
+        self.jitter = jitter
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.run_immediately = run_immediately
+        self.clock = clock or Clock()
+        self.rng = rng or random.Random()
+        self.poll_interval = poll_interval
+        self.sleep_threshold = sleep_threshold
+
+        self.failures = 0
+        self._wake_event = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="pyvidia-update-scheduler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None):
+        self._stopped.set()
+        self._wake_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def wake(self):
+        """Run the next check immediately."""
+        self._wake_event.set()
+
+    def next_delay(self) -> float:
+        if self.failures > 0:
+            backoff = self.initial_backoff * 2 ** (self.failures - 1)
+            return min(self.max_backoff, backoff)
+        spread = self.interval * self.jitter
+        return max(0.0, self.interval + self.rng.uniform(-spread, spread))
+
+    def _wait(self, delay: float):
+        """Wait for ``delay`` seconds, a wake-up, a system resume or ``stop``."""
+        deadline = self.clock.monotonic() + delay
+        while not self._stopped.is_set():
+            remaining = deadline - self.clock.monotonic()
+            if remaining <= 0:
+                return
+            wall_start, mono_start = self.clock.time(), self.clock.monotonic()
+            if self.clock.wait(self._wake_event, min(remaining, self.poll_interval)):
+                self._wake_event.clear()
+                return
+            drift = (self.clock.time() - wall_start) - (
+                self.clock.monotonic() - mono_start
+            )
+            if drift > self.sleep_threshold:
+                logger.info("System resumed from sleep, checking for updates")
+                return
+
+    def run_once(self) -> bool:
+        with metrics.span("autocheck_cycle_seconds"):
+            try:
+                success = bool(self.check())
+            except Exception:
+                # A broken check counts as failure, it must not end the scheduler
+                logger.exception("Scheduled check failed")
+                success = False
+        metrics.count("autocheck_cycles_total", result="ok" if success else "failed")
+        self.failures = 0 if success else self.failures + 1
+        return success
+
+    def _run(self):
+        if not self.run_immediately:
+            self._wait(self.next_delay())
+        while not self._stopped.is_set():
+            self.run_once()
+            self._wait(self.next_delay())
+
+
+def default_route_address() -> str | None:
+    """
+    Local address of the default route, None without network. Connecting a UDP
+    socket only selects the route, no packet is sent.
+    """
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            sock.connect(_ROUTE_PROBE_ADDRESS)
+            return sock.getsockname()[0]
+    except OSError:
+        return None
+
+
+class NetworkMonitor:
+    """
+    Calls ``on_change`` from a background thread when the network comes up or the
+    machine moves to another network, e.g. to wake the ``UpdateScheduler`` after a
+    check failed offline. Polls the address of the default route every
+    ``poll_interval`` seconds.
+    """
+
+    def __init__(
+        self,
+        on_change: Callable[[], None],
+        poll_interval: float = DEFAULT_NETWORK_POLL_INTERVAL,
+        resolve: Callable[[], str | None] = default_route_address,
+        clock: Clock | None = None,
+    ):
+        self.on_change = on_change
+        self.poll_interval = poll_interval
+        self.resolve = resolve
+        self.clock = clock or Clock()
+        self.address: str | None = None
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stopped.clear()
+        self.address = self.resolve()
+        self._thread = threading.Thread(
+            target=self._run, name="pyvidia-network-monitor", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def poll(self) -> bool:
+        """Resolve the address once, call ``on_change`` if it changed to a new one."""
+        address = self.resolve()
+        changed = address != self.address
+        self.address = address
+        if not changed or address is None:
+            return False
+        logger.info(f"Network changed to {address}, checking for updates")
+        self.on_change()
+        return True
+
+    def _run(self):
+        while not self.clock.wait(self._stopped, self.poll_interval):
+            self.poll()
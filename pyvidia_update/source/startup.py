@@ -0,0 +1,105 @@
+"""
+Optional startup timing report.
+
+Enabled by passing ``--startup-report`` or setting ``PYVIDIA_STARTUP_REPORT=1``.
+Import this module before any other module of the app, so the import timer sees
+every import that follows. The report lists the marked startup phases and the
+slowest imports in the format of ``python -X importtime``.
+"""
+
+import importlib.abc
+import os
+import sys
+import time
+
+_START = time.perf_counter()
+
+
+class _TimedLoader(importlib.abc.Loader):
+    def __init__(self, loader, timer: "_ImportTimer"):
+        self._loader = loader
+        self._timer = timer
+
+    def __getattr__(self, item):
+        return getattr(self._loader, item)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        self._timer.enter(module.__name__)
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._timer.leave()
+
+
+class _ImportTimer(importlib.abc.MetaPathFinder):
+    def __init__(self):
+        self.records: list[tuple[str, float, float, int]] = []
+        self._stack: list[list] = []
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+        if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+            spec.loader = _TimedLoader(spec.loader, self)
+        return spec
+
+    def enter(self, name: str):
+        self._stack.append([name, time.perf_counter(), 0.0])
+
+    def leave(self):
+        name, start, children = self._stack.pop()
+        cumulative = time.perf_counter() - start
+        if self._stack:
+            self._stack[-1][2] += cumulative
+        self.records.append((name, cumulative - children, cumulative, len(self._stack)))
+
+
+class StartupReport:
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self.phases: list[tuple[str, float]] = []
+        self._import_timer: _ImportTimer | None = None
+        if enabled:
+            self._import_timer = _ImportTimer()
+            sys.meta_path.insert(0, self._import_timer)
+
+    def mark(self, phase: str):
+        if self.enabled:
+            self.phases.append((phase, time.perf_counter() - _START))
+
+    def report(self, top: int = 20, stream=None):
+        if not self.enabled:
+            return
+        stream = stream or sys.stderr
+        stream.write("Startup phases [ms since startup module import]:\n")
+        for phase, elapsed in self.phases:
+            stream.write(f"  {elapsed * 1000:10.1f}  {phase}\n")
+        if self._import_timer is None:
+            return
+        records = sorted(self._import_timer.records, key=lambda r: r[2], reverse=True)
+        stream.write("import time: self [us] | cumulative | imported package\n")
+        for name, self_time, cumulative, depth in records[:top]:
+            stream.write(
+                f"import time: {self_time * 1e6:9.0f} | {cumulative * 1e6:10.0f} | "
+                f"{'  ' * depth}{name}\n"
+            )
+        stream.flush()
+
+    def stop_import_timer(self):
+        if self._import_timer is not None and self._import_timer in sys.meta_path:
+            sys.meta_path.remove(self._import_timer)
+
+
+startup_report = StartupReport(
+    enabled=bool(os.environ.get("PYVIDIA_STARTUP_REPORT"))
+    or "--startup-report" in sys.argv
+)
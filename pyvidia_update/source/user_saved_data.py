@@ -38,6 +38,13 @@ class SelectedDrivers:
             "dl_link": self.dl_link,
         }
 
+    @classmethod
+    def from_dict(cls, data: dict) -> "SelectedDrivers":
+        """Selection of a ``to_dict`` result, missing fields are None."""
+        selection = cls()
+        selection._load_from_dict(data)
+        return selection
+
     def _load_from_dict(self, data: dict):
         self.product_type = data.get("product_type", None)
         self.product_series = data.get("product_series", None)
@@ -67,3 +74,24 @@ class SelectedDrivers:
             with open(self._pickle_file, "rb") as f:
                 data = pickle.load(f)
         self._load_from_dict(data)
+
+
+_profiles_file = Path(user_dir).joinpath("saved_profiles.pkl")
+
+
+def save_profiles(selections: list[SelectedDrivers]):
+    """Store several tracked driver selections, e.g. one per GPU."""
+    SelectedDrivers._check_if_dir_exists()
+    with open(_profiles_file, "wb+") as f:
+        pickle.dump([selection.to_dict() for selection in selections], f)
+
+
+def load_profiles() -> list[SelectedDrivers]:
+    """Saved profiles, falling back to the single selection of the config window."""
+    if not os.path.exists(_profiles_file):
+        selection = SelectedDrivers()
+        selection.load_from_pkl()
+        return [selection]
+    with open(_profiles_file, "rb") as f:
+        data: list[dict] = pickle.load(f)
+    return [SelectedDrivers.from_dict(entry) for entry in data]
@@ -1,61 +1,91 @@
+import json
 import logging
-import threading
-import time
-import datetime as dt
+import os
+
+# Imported first, so the optional startup report can time all following imports
+from pyvidia_update.source.startup import startup_report  # isort: skip
 
 import wx
 
 from pyvidia_update.source.get_current_driver_version import get_current_driver_version
 from pyvidia_update.source.get_system_info import get_current_nvidia_driver_version
+from pyvidia_update.source.metrics import metrics
+from pyvidia_update.source.scheduler import (
+    NetworkMonitor,
+    NotificationThrottle,
+    UpdateScheduler,
+)
+from pyvidia_update.source.user_saved_data import user_dir
 from pyvidia_update.ui.config import ConfigFrame
 from pyvidia_update.ui.notifications import notify_new_update
 
 logger = logging.getLogger(__name__)
 
+startup_report.mark("modules imported")
+
 
 class PyvidiaApp(wx.App):
     def OnInit(self):
-        thread = threading.Thread(target=self.autocheck_for_updates)
-        thread.daemon = True
-        thread.start()
+        startup_report.mark("OnInit")
+        self.notification_throttle = NotificationThrottle()
+        self.scheduler = UpdateScheduler(self.autocheck_for_updates)
+        self.network_monitor = NetworkMonitor(self.scheduler.wake)
 
         self.frm = ConfigFrame(None, title="Pyvidia update check - Settings")
         self.frm.Show()
+        startup_report.mark("window shown")
 
         self.SetTopWindow(self.frm)
+
+        # Only available on Windows
+        if hasattr(wx, "EVT_POWER_RESUME"):
+            self.Bind(wx.EVT_POWER_RESUME, self.on_power_resume)
+        self.scheduler.start()
+        self.network_monitor.start()
         return True
 
-    def autocheck_for_updates(self):
-        start_time = dt.datetime.now()
-        cycle_time = dt.datetime.now()
-        notification_sent = False
-
-        while True:
-            time.sleep(60 * 60)
-
-            # Check every Hour
-            if (dt.datetime.now() - cycle_time).total_seconds() < 60 * 60:
-                continue
-
-            logger.info("Checking for update")
-            current_system_version = get_current_nvidia_driver_version()
-            current_version = get_current_driver_version(self.frm.dl_link)
-            if current_system_version == current_version.version:
-                cycle_time = dt.datetime.now()
-                continue
-            if notification_sent is not True:
-                notify_new_update(
-                    current_system_version,
-                    current_version.version,
-                    current_version.release_date,
-                )
-                logger.info("Disable Notification")
-                notification_sent = True
-
-            # Enable Notification after 6 hours
-            if (dt.datetime.now() - start_time).total_seconds() > 60 * 60 * 6:
-                logger.info("Enable Notification")
-                notification_sent = False
+    def OnExit(self):
+        self.network_monitor.stop(timeout=1)
+        self.scheduler.stop(timeout=1)
+        if metrics.enabled:
+            self.write_metrics()
+        return super().OnExit()
+
+    def write_metrics(self):
+        """Store the metrics of this session, enabled with PYVIDIA_METRICS=1."""
+        path = os.path.join(user_dir, "metrics.json")
+        try:
+            os.makedirs(user_dir, exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(metrics.snapshot(), f, indent=2)
+            logger.info(f"Wrote metrics to {path}")
+        except OSError as e:
+            logger.error(e)
+
+    def on_power_resume(self, event):
+        self.scheduler.wake()
+        event.Skip()
+
+    def autocheck_for_updates(self) -> bool:
+        logger.info("Checking for update")
+        current_system_version = get_current_nvidia_driver_version()
+        current_version = get_current_driver_version(self.frm.dl_link, max_age=0)
+        if not current_version.ok:
+            logger.info(f"Update check failed: {current_version.status.value}")
+            # Nothing selected or no driver for the selection is no reason to retry
+            return not current_version.retryable
+        if current_system_version == current_version.version:
+            return True
+        if self.notification_throttle.should_notify(current_version.version):
+            wx.CallAfter(
+                notify_new_update,
+                current_system_version,
+                current_version.version,
+                current_version.release_date,
+            )
+        else:
+            logger.info("Update notification throttled")
+        return True
 
     def show_frame(self):
         if not self.frm.IsShown():
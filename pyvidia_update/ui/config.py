@@ -1,20 +1,29 @@
 import datetime as dt
-import time
+import logging
+import threading
 from enum import Enum
 
 import wx
 import wx.adv
 
-from pyvidia_update.source.get_current_driver_version import get_current_driver_version
+from pyvidia_update.source.check_engine import CheckEngine, CheckResult
 from pyvidia_update.ui.notifications import (
     notify_running_in_background,
     notify_new_update,
 )
 from pyvidia_update.ui.tray import PyvidiaTaskBarIcon
+from pyvidia_update.source.choices import EMPTY_CHOICES, ChoiceList, ChoiceListCache
 from pyvidia_update.source.get_data import DropdownData
-from pyvidia_update.source.get_system_info import get_current_nvidia_driver_version
 from pyvidia_update.source.user_saved_data import SelectedDrivers
 from pyvidia_update.source.get_files import get_packaged_files_path
+from pyvidia_update.source.get_system_info import (
+    get_nvidia_gpus,
+    get_system_info_provider,
+)
+from pyvidia_update.source.name_index import detect_selections
+from pyvidia_update.source.startup import startup_report
+
+logger = logging.getLogger(__name__)
 
 get_packaged_files_path = get_packaged_files_path()
 
@@ -41,13 +50,23 @@ class ConfigFrame(wx.Frame):
 
     dl_link = ""
 
-    dd = DropdownData(switch_kv=True)
+    # Loaded in the background, see _load_catalog
+    dd: DropdownData | None = None
+    choices: ChoiceListCache | None = None
+    # (dropdown attribute, selected id attribute) per hierarchy level
     _dropdown_mapping = {
-        DropDownHierarchy.PRODUCT_TYPE: {
-            "data_func": dd.get_product_series_data,
-            "dropdown_name": "product_series_dropdown",
-            "next": {},
-        }
+        DropDownHierarchy.PRODUCT_TYPE: (
+            "product_type_dropdown",
+            "selected_product_type",
+        ),
+        DropDownHierarchy.PRODUCT_SERIES: (
+            "product_series_dropdown",
+            "selected_product_series",
+        ),
+        DropDownHierarchy.PRODUCT: ("product_dropdown", "selected_product"),
+        DropDownHierarchy.OS: ("os_dropdown", "selected_os"),
+        DropDownHierarchy.DOWNLOAD_TYPE: ("dt_dropdown", "selected_dt"),
+        DropDownHierarchy.LANGUAGE: ("lan_dropdown", "selected_language"),
     }
 
     def __init__(self, *args, **kwargs):
@@ -71,6 +90,11 @@ class ConfigFrame(wx.Frame):
 
         panel = wx.Panel(self)
 
+        self.check_engine = CheckEngine(
+            on_result=self._on_check_result, dispatch=wx.CallAfter
+        )
+        self.check_engine.start()
+
         # Initialize saved user settings
         self.selected_conf.load_from_pkl()
         self.selected_product_type = self.selected_conf.product_type
@@ -79,136 +103,38 @@ class ConfigFrame(wx.Frame):
         self.selected_os = self.selected_conf.os
         self.selected_dt = self.selected_conf.dt
         self.selected_language = self.selected_conf.language
-        self.dl_link = self.dd.get_download_link(
-            self.selected_product_type,
-            self.selected_product_series,
-            self.selected_product,
-            self.selected_os,
-            self.selected_dt,
-            self.selected_language,
-        )
 
         # DROPDOWN FIELDS
         # ========================================================================================
-        product_type_data = self.dd.get_product_type_data()
         self.product_type_dropdown_label = wx.StaticText(panel, label="Product Type")
-        self.product_type_dropdown = wx.Choice(
-            panel, choices=list(product_type_data.keys())
-        )
-        selected_product_type_index = (
-            list(product_type_data.values()).index(self.selected_product_type)
-            if self.selected_product_type is not None
-            and self.selected_product_type in list(product_type_data.values())
-            else 0
-        )
-        self.product_type_dropdown.SetSelection(selected_product_type_index)
-        self.selected_product_type = product_type_data[
-            list(product_type_data.keys())[selected_product_type_index]
-        ]
+        self.product_type_dropdown = wx.Choice(panel)
         self.product_type_dropdown.Bind(wx.EVT_CHOICE, self.on_product_type_change)
 
-        # ---------------------------------------------------------------------------------------
-
-        product_series_data = self.dd.get_product_series_data(
-            self.selected_product_type
-        )
         self.product_series_dropdown_label = wx.StaticText(
             panel, label="Product Series"
         )
-        self.product_series_dropdown = wx.Choice(
-            panel, choices=list(product_series_data.keys())
-        )
-        selected_product_series_index = (
-            list(product_series_data.values()).index(self.selected_product_series)
-            if self.selected_product_series is not None
-            and self.selected_product_series in list(product_series_data.values())
-            else 0
-        )
-        self.product_series_dropdown.SetSelection(selected_product_series_index)
-        self.selected_product_series = product_series_data[
-            list(product_series_data.keys())[selected_product_series_index]
-        ]
+        self.product_series_dropdown = wx.Choice(panel)
         self.product_series_dropdown.Bind(wx.EVT_CHOICE, self.on_product_series_change)
 
-        # ---------------------------------------------------------------------------------------
-
-        product_data = self.dd.get_product_data(
-            self.selected_product_type, self.selected_product_series
-        )
         self.product_dropdown_label = wx.StaticText(panel, label="Product")
-        self.product_dropdown = wx.Choice(panel, choices=list(product_data.keys()))
-        selected_product_index = (
-            list(product_data.values()).index(self.selected_product)
-            if self.selected_product is not None
-            and self.selected_product in list(product_data.values())
-            else 0
-        )
-        self.product_dropdown.SetSelection(selected_product_index)
-        self.selected_product = product_data[
-            list(product_data.keys())[selected_product_index]
-        ]
+        self.product_dropdown = wx.Choice(panel)
         self.product_dropdown.Bind(wx.EVT_CHOICE, self.on_product_change)
 
-        # ---------------------------------------------------------------------------------------
-
-        os_data = self.dd.get_os_data(
-            self.selected_product_type,
-            self.selected_product_series,
-            self.selected_product,
-        )
         self.os_dropdown_label = wx.StaticText(panel, label="Operating System")
-        self.os_dropdown = wx.Choice(panel, choices=list(os_data.keys()))
-        selected_os_index = (
-            list(os_data.values()).index(self.selected_os)
-            if self.selected_os is not None
-            and self.selected_os in list(os_data.values())
-            else 0
-        )
-        self.os_dropdown.SetSelection(selected_os_index)
-        self.selected_os = os_data[list(os_data.keys())[selected_os_index]]
+        self.os_dropdown = wx.Choice(panel)
         self.os_dropdown.Bind(wx.EVT_CHOICE, self.on_os_change)
 
-        # ---------------------------------------------------------------------------------------
-
-        dt_data = self.dd.get_dt_data(
-            self.selected_product_type,
-            self.selected_product_series,
-            self.selected_product,
-            self.selected_os,
-        )
         self.dt_dropdown_label = wx.StaticText(panel, label="Download Type")
-        self.dt_dropdown = wx.Choice(panel, choices=list(dt_data.keys()))
-        selected_dt_index = (
-            list(dt_data.values()).index(self.selected_dt)
-            if self.selected_dt is not None
-            and self.selected_dt in list(dt_data.values())
-            else 0
-        )
-        self.dt_dropdown.SetSelection(selected_dt_index)
-        self.selected_dt = dt_data[list(dt_data.keys())[selected_dt_index]]
+        self.dt_dropdown = wx.Choice(panel)
         self.dt_dropdown.Bind(wx.EVT_CHOICE, self.on_dt_change)
 
-        # ---------------------------------------------------------------------------------------
-
-        lan_data = self.dd.get_language_data(
-            self.selected_product_type,
-            self.selected_product_series,
-            self.selected_product,
-            self.selected_os,
-            self.selected_dt,
-        )
         self.lan_dropdown_label = wx.StaticText(panel, label="Language")
-        self.lan_dropdown = wx.Choice(panel, choices=list(lan_data.keys()))
-        selected_lan_index = (
-            list(lan_data.values()).index(self.selected_language)
-            if self.selected_language is not None
-            and self.selected_language in list(lan_data.values())
-            else 0
-        )
-        self.lan_dropdown.SetSelection(selected_lan_index)
-        self.selected_language = lan_data[list(lan_data.keys())[selected_lan_index]]
+        self.lan_dropdown = wx.Choice(panel)
         self.lan_dropdown.Bind(wx.EVT_CHOICE, self.on_lan_change)
 
+        for level in DropDownHierarchy:
+            getattr(self, self._dropdown_mapping[level][0]).Enable(False)
+
         # ========================================================================================
 
         self.system_version = wx.StaticText(
@@ -221,7 +147,11 @@ class ConfigFrame(wx.Frame):
             panel, label="Current driver version not found!"
         )
         self.link = wx.adv.HyperlinkCtrl(panel, -1)
-        self.set_download_link()
+        # Check the saved selection right away, the catalog is not needed for that
+        self.dl_link = self.selected_conf.dl_link or ""
+        self._show_download_link()
+        if self.dl_link:
+            self.check_engine.submit(self.dl_link)
         self.update_button = wx.Button(panel, label="Check for updates")
         self.update_button.Bind(wx.EVT_BUTTON, self.on_update_button_click)
         self.update_message_text = wx.StaticText(
@@ -280,212 +210,162 @@ class ConfigFrame(wx.Frame):
 
         panel.SetSizer(main_sizer)
 
-    def on_product_type_change(self, event):
-        selected_option = self.product_type_dropdown.GetStringSelection()
-        data = self.dd.get_product_type_data()
+        threading.Thread(
+            target=self._load_catalog, name="pyvidia-catalog-loader", daemon=True
+        ).start()
+
+    def _load_catalog(self):
+        try:
+            dd = DropdownData()
+        except Exception:
+            logger.exception("Loading the driver catalog failed")
+            return
+        detected = None
+        if self.selected_product_type is None:
+            # Nothing saved yet, preselect the product of the local GPU
+            try:
+                detected = next(
+                    iter(detect_selections(dd.catalog, get_nvidia_gpus())), None
+                )
+            except Exception:
+                # Detection is optional, the catalog is shown without it
+                logger.exception("Detecting the local GPU failed")
+        wx.CallAfter(self._on_catalog_loaded, dd, detected)
+
+    def _on_catalog_loaded(
+        self, dd: DropdownData, detected: SelectedDrivers | None = None
+    ):
+        if not self:
+            return
+        self.dd = dd
+        if detected is not None and self.selected_product_type is None:
+            self.selected_product_type = detected.product_type
+            self.selected_product_series = detected.product_series
+            self.selected_product = detected.product
+            self.selected_os = detected.os
+            self.selected_dt = detected.dt
+            self.selected_language = detected.language
+        self.choices = ChoiceListCache(dd.catalog)
+        for level in DropDownHierarchy:
+            self._fill_dropdown(level, keep_selection=True)
+            getattr(self, self._dropdown_mapping[level][0]).Enable(True)
+        self.set_download_link()
 
-        if selected_option not in list(data.keys()):
-            raise ValueError(
-                f"Selected option {selected_option} is not in Product type data list."
-            )
-        self.selected_product_type = data[selected_option]
-        self._fill_dropdowns(DropDownHierarchy.PRODUCT_TYPE)
+        startup_report.mark("catalog loaded")
+        startup_report.stop_import_timer()
+        startup_report.report()
 
-    def on_product_series_change(self, event):
-        selected_option = self.product_series_dropdown.GetStringSelection()
-        data = self.dd.get_product_series_data(self.selected_product_type)
+    def on_product_type_change(self, event):
+        self._on_dropdown_change(DropDownHierarchy.PRODUCT_TYPE)
 
-        if selected_option not in list(data.keys()):
-            raise ValueError(
-                f"Selected option {selected_option} is not in Product series data list."
-            )
-        self.selected_product_series = data[selected_option]
-        self._fill_dropdowns(DropDownHierarchy.PRODUCT_SERIES)
+    def on_product_series_change(self, event):
+        self._on_dropdown_change(DropDownHierarchy.PRODUCT_SERIES)
 
     def on_product_change(self, event):
-        selected_option = self.product_dropdown.GetStringSelection()
-        data = self.dd.get_product_data(
-            self.selected_product_type, self.selected_product_series
-        )
-
-        if selected_option not in list(data.keys()):
-            raise ValueError(
-                f"Selected option {selected_option} is not in Product data list"
-            )
-        self.selected_product = data[selected_option]
-        self._fill_dropdowns(DropDownHierarchy.PRODUCT)
+        self._on_dropdown_change(DropDownHierarchy.PRODUCT)
 
     def on_os_change(self, event):
-        selected_option = self.os_dropdown.GetStringSelection()
-        data = self.dd.get_os_data(
-            self.selected_product_type,
-            self.selected_product_series,
-            self.selected_product,
-        )
-
-        if selected_option not in list(data.keys()):
-            raise ValueError(
-                f"Selected option {selected_option} is not in OS data list"
-            )
-        self.selected_os = data[selected_option]
-        self._fill_dropdowns(DropDownHierarchy.OS)
+        self._on_dropdown_change(DropDownHierarchy.OS)
 
     def on_dt_change(self, event):
-        selected_option = self.dt_dropdown.GetStringSelection()
-        data = self.dd.get_dt_data(
-            self.selected_product_type,
-            self.selected_product_series,
-            self.selected_product,
-            self.selected_os,
-        )
-
-        if selected_option not in list(data.keys()):
-            raise ValueError(
-                f"Selected option {selected_option} is not in Download Type data list"
-            )
-        self.selected_dt = data[selected_option]
-        self._fill_dropdowns(DropDownHierarchy.DOWNLOAD_TYPE)
+        self._on_dropdown_change(DropDownHierarchy.DOWNLOAD_TYPE)
 
     def on_lan_change(self, event):
-        selected_option = self.lan_dropdown.GetStringSelection()
-        data = self.dd.get_language_data(
-            self.selected_product_type,
-            self.selected_product_series,
-            self.selected_product,
-            self.selected_os,
-            self.selected_dt,
-        )
-
-        if selected_option not in list(data.keys()):
-            raise ValueError(
-                f"Selected option {selected_option} is not in Language data list"
-            )
-        self.selected_language = data[selected_option]
+        self._on_dropdown_change(DropDownHierarchy.LANGUAGE)
 
     def on_update_button_click(self, event):
-        self.set_download_link()
-        self.update_message_text.SetForegroundColour(wx.Colour(0, 128, 0))
-        self.update_message_text.SetLabel("Update check completed!")
-        time.sleep(2)
+        get_system_info_provider().invalidate()
+        self.set_download_link(force_check=True)
+
+    def _reset_update_message(self):
+        if not self:
+            return
         self.update_message_text.SetLabel(
             f"Last check: {dt.datetime.now().strftime('%d.%m.%Y %H:%M:%S')}"
         )
         self.update_message_text.SetForegroundColour(wx.Colour(0, 0, 0))
 
-    def _fill_dropdowns(self, level: DropDownHierarchy):
-        match level:
-            case DropDownHierarchy.PRODUCT_TYPE:
-                self._fill_product_series_dropdown()
-            case DropDownHierarchy.PRODUCT_SERIES:
-                self._fill_product_dropdown()
-            case DropDownHierarchy.PRODUCT:
-                self._fill_os_dropdown()
-            case DropDownHierarchy.OS:
-                self._fill_dt_dropdown()
-            case DropDownHierarchy.DOWNLOAD_TYPE:
-                self._fill_language_data()
-
-    def _fill_product_series_dropdown(self):
-        self.product_series_dropdown.Clear()
-        product_series_data = self.dd.get_product_series_data(
-            self.selected_product_type
-        )
-        for option in list(product_series_data.keys()):
-            self.product_series_dropdown.Append(option)
-        selected_product_series_index = 0
-        self.product_series_dropdown.SetSelection(selected_product_series_index)
-        self.selected_product_series = product_series_data[
-            list(product_series_data.keys())[selected_product_series_index]
-        ]
-        self._fill_product_dropdown()
-
-    def _fill_product_dropdown(self):
-        self.product_dropdown.Clear()
-        product_data = self.dd.get_product_data(
-            self.selected_product_type, self.selected_product_series
+    def _get_choices(self, level: DropDownHierarchy) -> ChoiceList:
+        path = tuple(
+            getattr(self, self._dropdown_mapping[parent][1])
+            for parent in list(DropDownHierarchy)[: level.value]
         )
-        for option in list(product_data.keys()):
-            self.product_dropdown.Append(option)
-        selected_product_index = 0
-        self.product_dropdown.SetSelection(selected_product_index)
-        self.selected_product = product_data[
-            list(product_data.keys())[selected_product_index]
-        ]
-        self._fill_os_dropdown()
-
-    def _fill_os_dropdown(self):
-        self.os_dropdown.Clear()
-        os_data = self.dd.get_os_data(
-            self.selected_product_type,
-            self.selected_product_series,
-            self.selected_product,
-        )
-        for option in list(os_data.keys()):
-            self.os_dropdown.Append(option)
-        selected_os_index = 0
-        self.os_dropdown.SetSelection(selected_os_index)
-        self.selected_os = os_data[list(os_data.keys())[selected_os_index]]
-        self._fill_dt_dropdown()
-
-    def _fill_dt_dropdown(self):
-        self.dt_dropdown.Clear()
-        dt_data = self.dd.get_dt_data(
-            self.selected_product_type,
-            self.selected_product_series,
-            self.selected_product,
-            self.selected_os,
-        )
-        for option in list(dt_data.keys()):
-            self.dt_dropdown.Append(option)
-        selected_dt_index = 0
-        self.dt_dropdown.SetSelection(selected_dt_index)
-        self.selected_dt = dt_data[list(dt_data.keys())[selected_dt_index]]
-        self._fill_language_data()
-
-    def _fill_language_data(self):
-        self.lan_dropdown.Clear()
-        lan_data = self.dd.get_language_data(
-            self.selected_product_type,
-            self.selected_product_series,
-            self.selected_product,
-            self.selected_os,
-            self.selected_dt,
-        )
-        for option in list(lan_data.keys()):
-            self.lan_dropdown.Append(option)
-        selected_lan_index = 0
-        self.lan_dropdown.SetSelection(selected_lan_index)
-        self.selected_language = lan_data[list(lan_data.keys())[selected_lan_index]]
+        if self.choices is None or None in path:
+            return EMPTY_CHOICES
+        return self.choices.get(path)
+
+    def _fill_dropdown(self, level: DropDownHierarchy, keep_selection: bool = False):
+        dropdown_name, selected_name = self._dropdown_mapping[level]
+        dropdown: wx.Choice = getattr(self, dropdown_name)
+        choices = self._get_choices(level)
+
+        dropdown.Set(list(choices.labels))
+        index = choices.index_of(getattr(self, selected_name)) if keep_selection else 0
+        if choices.ids:
+            dropdown.SetSelection(index)
+        setattr(self, selected_name, choices.id_at(index))
+
+    def _fill_dropdowns(self, level: DropDownHierarchy):
+        """Refill every dropdown below ``level`` and update the download link."""
+        for child_level in list(DropDownHierarchy)[level.value + 1 :]:
+            self._fill_dropdown(child_level)
         self.set_download_link()
 
-    def set_download_link(self):
-        self.save_user_conf()
-        self.dl_link = self.dd.get_download_link(
-            self.selected_product_type,
-            self.selected_product_series,
-            self.selected_product,
-            self.selected_os,
-            self.selected_dt,
-            self.selected_language,
-        )
-        current_system_version = get_current_nvidia_driver_version()
-        self.system_version.SetLabel(f"Installed version: {current_system_version}")
-        if self.dl_link == "not_found":
+    def _on_dropdown_change(self, level: DropDownHierarchy):
+        dropdown_name, selected_name = self._dropdown_mapping[level]
+        index = getattr(self, dropdown_name).GetSelection()
+        if index == wx.NOT_FOUND:
+            return
+        setattr(self, selected_name, self._get_choices(level).id_at(index))
+        self._fill_dropdowns(level)
+
+    def set_download_link(self, force_check: bool = False):
+        previous_link = self.dl_link
+        if self.dd is not None:
+            self.dl_link = self.dd.get_download_link(
+                self.selected_product_type,
+                self.selected_product_series,
+                self.selected_product,
+                self.selected_os,
+                self.selected_dt,
+                self.selected_language,
+            )
+            self.save_user_conf()
+        self._show_download_link()
+        if force_check:
+            # A check the user asked for must not be answered from the cache
+            self.check_engine.submit(self.dl_link, max_age=0)
+        elif self.dl_link != previous_link:
+            self.check_engine.submit(self.dl_link)
+
+    def _show_download_link(self):
+        if not self.dl_link or self.dl_link == "not_found":
             self.link.SetURL("https://www.nvidia.com/Download/index.aspx")
             self.link.SetLabel("No Download Link found, find on nvidia.com")
             self.current_version.Show(False)
             self.current_version_date.Show(False)
         else:
             self.link.SetURL(self.dl_link)
+            self.link.SetLabel("Checking for updates...")
+
+    def _on_check_result(self, result: CheckResult):
+        # The frame may have been destroyed while the check was running
+        if not self or result.job.dl_link != self.dl_link:
+            return
+        current_system_version = result.system_version
+        self.system_version.SetLabel(f"Installed version: {current_system_version}")
 
-            current_version = get_current_driver_version(self.dl_link)
+        current_version = result.driver_info
+        if self.dl_link and self.dl_link != "not_found":
             self.current_version.Show(True)
             self.current_version.SetLabel(f"Current version: {current_version.version}")
             self.current_version_date.Show(True)
             self.current_version_date.SetLabel(
                 f"Release Date: {current_version.release_date}"
             )
-            if current_system_version == current_version.version:
+            if not current_version.ok:
+                self.link.SetLabel("Could not check for updates: Download URL")
+            elif current_system_version == current_version.version:
                 self.link.SetLabel("Your drivers are up to Date!")
             else:
                 self.link.SetLabel("New drivers available: Download URL")
@@ -495,6 +375,10 @@ class ConfigFrame(wx.Frame):
                     current_version.release_date,
                 )
 
+        self.update_message_text.SetForegroundColour(wx.Colour(0, 128, 0))
+        self.update_message_text.SetLabel("Update check completed!")
+        wx.CallLater(2000, self._reset_update_message)
+
     def save_user_conf(self):
         self.selected_conf.product_type = self.selected_product_type
         self.selected_conf.product_series = self.selected_product_series
@@ -508,3 +392,7 @@ class ConfigFrame(wx.Frame):
     def on_close(self, event):
         notify_running_in_background()
         self.Hide()
+
+    def Destroy(self):
+        self.check_engine.stop(timeout=1)
+        return super().Destroy()
@@ -0,0 +1,121 @@
+"""
+Skips download url lookups that are bound to return the same url as another one.
+
+Selections that only differ in the OS or the language often share one download url.
+The lookups are grouped into classes that only differ in those levels. Every OS and
+every language of a class is probed at least once, a url is never copied to an OS or
+language that was not looked up. If all probes return the same url, it is taken for
+the remaining members of the class, otherwise every member is looked up.
+"""
+
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from typing import Generic, Protocol, TypeVar
+
+from pyvidia_update.source.catalog import CATALOG_LEVELS
+
+DEDUPE_LEVELS = ("osid", "lid")
+# Results that say nothing about the other members of a class
+UNSHARED_URLS = ("access_denied", "not_found")
+
+
+class Lookup(Protocol):
+    def key(self) -> tuple[str, ...]: ...
+
+
+L = TypeVar("L", bound=Lookup)
+
+
+@dataclass
+class LookupGroup(Generic[L]):
+    members: list[L]
+    probes: list[L] = field(default_factory=list)
+
+    @property
+    def rest(self) -> list[L]:
+        probes = {id(probe) for probe in self.probes}
+        return [member for member in self.members if id(member) not in probes]
+
+    def shared_url(self, urls: dict[tuple[str, ...], str | None]) -> str | None:
+        """The url of all members if the probes agree on one."""
+        probe_urls = {urls.get(probe.key()) for probe in self.probes}
+        if len(probe_urls) != 1:
+            return None
+        url = probe_urls.pop()
+        if url is None or url in UNSHARED_URLS:
+            return None
+        return url
+
+
+def _pick_probes(members: list[L], varied: Sequence[int]) -> list[L]:
+    """
+    The first member and, for every value of a varied level, one member with that
+    value, preferably one that only differs from the first member in that level.
+    """
+    rep_key = members[0].key()
+    probes = [members[0]]
+    for index in varied:
+        candidates: dict[str, tuple[int, L]] = {rep_key[index]: (0, members[0])}
+        for member in members[1:]:
+            key = member.key()
+            differs = sum(a != b for a, b in zip(rep_key, key))
+            best = candidates.get(key[index])
+            if best is None or differs < best[0]:
+                candidates[key[index]] = (differs, member)
+        for _, member in candidates.values():
+            if all(member is not probe for probe in probes):
+                probes.append(member)
+    return probes
+
+
+def group_lookups(
+    lookups: Sequence[L], levels: Sequence[str] = DEDUPE_LEVELS
+) -> list[LookupGroup[L]]:
+    """Group ``lookups`` into classes that only differ in ``levels``."""
+    dropped = [CATALOG_LEVELS.index(level) for level in levels]
+    classes: dict[tuple[str, ...], list[L]] = {}
+    for lookup in lookups:
+        key = lookup.key()
+        class_key = tuple(v for i, v in enumerate(key) if i not in dropped)
+        classes.setdefault(class_key, []).append(lookup)
+
+    groups = []
+    for members in classes.values():
+        keys = [member.key() for member in members]
+        varied = [i for i in dropped if len({key[i] for key in keys}) > 1]
+        groups.append(LookupGroup(members, _pick_probes(members, varied)))
+    return groups
+
+
+def infer_urls(
+    groups: Sequence[LookupGroup[L]], urls: dict[tuple[str, ...], str | None]
+) -> tuple[list[tuple[L, str]], list[L]]:
+    """
+    Split the members left after probing into those whose url follows from the
+    probe ``urls`` and those of classes with differing probes, to be looked up.
+    """
+    inferred: list[tuple[L, str]] = []
+    remaining: list[L] = []
+    for group in groups:
+        shared_url = group.shared_url(urls)
+        if shared_url is None:
+            remaining.extend(group.rest)
+        else:
+            inferred.extend((member, shared_url) for member in group.rest)
+    return inferred, remaining
+
+
+class UrlPool:
+    """
+    Hands out one shared string object per distinct url, so a pickled tree stores
+    every url once and refers to it from all entries.
+    """
+
+    def __init__(self):
+        self._urls: dict[str, str] = {}
+
+    def __call__(self, url: str) -> str:
+        return self._urls.setdefault(url, url)
+
+    def __len__(self):
+        return len(self._urls)
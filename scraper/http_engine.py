@@ -0,0 +1,220 @@
+"""
+Builds the dropdown tree from the lookup endpoint the driver page's JavaScript uses
+instead of clicking through the dropdowns with Selenium.
+
+https://www.nvidia.com/Download/API/lookupValueSearch.aspx?TypeID=2&ParentID=1
+
+answers with the options of one dropdown as XML:
+
+<LookupValueSearch>
+    <LookupValues>
+        <LookupValue ParentID="1">
+            <Name>GeForce RTX 40 Series</Name>
+            <Value>127</Value>
+        </LookupValue>
+        ...
+    </LookupValues>
+</LookupValueSearch>
+
+The result has the same nested format as ``NvidiaDriverScraper.json_output``.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+
+import aiohttp
+
+from pyvidia_update.source.catalog import CATALOG_LEVELS
+from scraper.rate_limit import TokenBucket, retry_delay
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LOOKUP_URL = "https://www.nvidia.com/Download/API/lookupValueSearch.aspx"
+ENGLISH_LANGUAGE = "English (US)"
+
+
+@dataclass(frozen=True)
+class LookupLevel:
+    """
+    One dropdown of the driver page.
+
+    ``parent`` names the catalog level whose id is sent as ``ParentID``, levels
+    without a parent have the same options everywhere and are fetched only once.
+    """
+
+    level: str
+    type_id: int
+    parent: str | None = None
+
+
+# Dropdown (catalog level) -> lookup TypeID of the driver page. Like in the Selenium
+# walk, the OS, download type and language options depend on the selected product.
+LOOKUP_LEVELS: dict[str, LookupLevel] = {
+    "dtcid": LookupLevel("dtcid", 1),
+    "psid": LookupLevel("psid", 2, parent="dtcid"),
+    "pfid": LookupLevel("pfid", 3, parent="psid"),
+    "osid": LookupLevel("osid", 4, parent="pfid"),
+    "dtid": LookupLevel("dtid", 6, parent="pfid"),
+    "lid": LookupLevel("lid", 5, parent="pfid"),
+}
+
+
+@dataclass
+class ScrapeFilter:
+    """The same limits ``NvidiaDriverScraper`` applies to the Selenium walk."""
+
+    product_types: tuple[str, ...] = ("geforce", "titan", "quadro")
+    os_limit: str = "windows"
+    skip_languages: bool = True
+
+    def accepts(self, level: str, name: str) -> bool:
+        name = name.lower()
+        if level == "dtcid" and self.product_types:
+            return any(s in name for s in self.product_types)
+        if level == "osid" and self.os_limit == "windows":
+            return "windows" in name
+        if level == "lid" and self.skip_languages:
+            return name == ENGLISH_LANGUAGE.lower()
+        return True
+
+
+class LookupRequestError(Exception):
+    pass
+
+
+def fingerprint(value) -> str:
+    """Short stable hash of any JSON serializable value."""
+    data = json.dumps(value, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()[:16]
+
+
+def lookup_key(type_id: int, parent_id: str | None) -> str:
+    return f"{type_id}:{parent_id or ''}"
+
+
+def parse_lookup_values(body: str) -> dict[str, str]:
+    """Map option value to option name of one lookup response."""
+    try:
+        root = ET.fromstring(body)
+    except ET.ParseError as e:
+        raise LookupRequestError(f"Invalid lookup response: {e}") from e
+    options: dict[str, str] = {}
+    for value in root.iter("LookupValue"):
+        option_id = (value.findtext("Value") or "").strip()
+        name = (value.findtext("Name") or "").strip()
+        if option_id:
+            options[option_id] = name
+    return options
+
+
+@dataclass
+class HttpDropdownEngine:
+    """
+    Fetches all dropdown levels concurrently.
+
+    At most ``max_concurrency`` requests are in flight and requests are started no
+    faster than ``requests_per_second`` on average. Every (TypeID, ParentID) pair is
+    requested once, failed requests are retried ``retries`` times with jittered
+    exponential backoff.
+
+    After ``build``, ``option_fingerprints`` holds a fingerprint of every fetched
+    option list and ``failed_lookups`` the lookups that failed for good.
+    """
+
+    lookup_url: str = DEFAULT_LOOKUP_URL
+    scrape_filter: ScrapeFilter = field(default_factory=ScrapeFilter)
+    max_concurrency: int = 10
+    requests_per_second: float = 5.0
+    retries: int = 3
+    timeout: float = 10
+    levels: dict[str, LookupLevel] = field(default_factory=lambda: dict(LOOKUP_LEVELS))
+
+    requests_sent: int = field(default=0, init=False)
+    option_fingerprints: dict[str, str] = field(default_factory=dict, init=False)
+    failed_lookups: list[str] = field(default_factory=list, init=False)
+    _lookups: dict = field(default_factory=dict, init=False, repr=False)
+
+    async def _request(self, session: aiohttp.ClientSession, params: dict) -> str:
+        for attempt in range(self.retries + 1):
+            try:
+                async with self._semaphore:
+                    await self._bucket.acquire()
+                    self.requests_sent += 1
+                    async with session.get(
+                        self.lookup_url, params=params, timeout=self.timeout
+                    ) as response:
+                        response.raise_for_status()
+                        return await response.text()
+            except (TimeoutError, aiohttp.ClientError) as e:
+                if attempt == self.retries:
+                    raise LookupRequestError(f"Lookup {params} failed: {e}") from e
+                await asyncio.sleep(retry_delay(attempt, base=0.5))
+
+    async def lookup(
+        self, session: aiohttp.ClientSession, level: LookupLevel, parent_id: str | None
+    ) -> dict[str, str]:
+        params = {"TypeID": str(level.type_id)}
+        if parent_id is not None:
+            params["ParentID"] = parent_id
+        key = (level.type_id, parent_id)
+        if key not in self._lookups:
+            self._lookups[key] = asyncio.ensure_future(self._request(session, params))
+        try:
+            options = parse_lookup_values(await self._lookups[key])
+        except LookupRequestError:
+            self.failed_lookups.append(lookup_key(*key))
+            raise
+        self.option_fingerprints[lookup_key(*key)] = fingerprint(options)
+        return options
+
+    async def _fill(
+        self,
+        session: aiohttp.ClientSession,
+        node: dict,
+        path: dict[str, str],
+        depth: int,
+    ):
+        level = self.levels[CATALOG_LEVELS[depth]]
+        parent_id = path[level.parent] if level.parent else None
+        try:
+            options = await self.lookup(session, level, parent_id)
+        except LookupRequestError as e:
+            logger.warning(e)
+            return
+
+        children = []
+        for option_id, name in options.items():
+            if not self.scrape_filter.accepts(level.level, name):
+                continue
+            node[option_id] = {"verbose_name": name}
+            if depth + 1 == len(CATALOG_LEVELS):
+                continue
+            child_path = {**path, level.level: option_id}
+            children.append(self._fill(session, node[option_id], child_path, depth + 1))
+        await asyncio.gather(*children)
+
+    async def build(self, session: aiohttp.ClientSession | None = None) -> dict:
+        """
+        Return the nested dropdown tree.
+
+        Download urls are not part of the tree, they are fetched afterwards like for
+        the Selenium walk.
+        """
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._bucket = TokenBucket(self.requests_per_second)
+        self._lookups = {}
+        self.option_fingerprints = {}
+        self.failed_lookups = []
+
+        tree: dict = {}
+        if session is not None:
+            await self._fill(session, tree, {}, 0)
+        else:
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency)
+            async with aiohttp.ClientSession(connector=connector) as own_session:
+                await self._fill(own_session, tree, {}, 0)
+        return tree
@@ -0,0 +1,134 @@
+"""
+Append-only journal of scraping progress.
+
+Every line is one JSON record, written and flushed as soon as a piece of work is done:
+
+{"kind": "download_url", "key": [dtcid, psid, pfid, osid, dtid, lid], "download_url": <str>}
+{"kind": "series", "key": [dtcid, psid], "tree": <finished product series subtree>}
+
+A scrape that dies partway resumes from the journal on restart, which compacts it to
+the latest record of every key. Once the results are stored in the final pickle and
+catalog files, the journal is discarded.
+"""
+
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+
+logger = logging.getLogger(__name__)
+
+JournalKey = tuple[str, ...]
+
+
+@dataclass
+class JournalState:
+    download_urls: dict[JournalKey, str] = field(default_factory=dict)
+    series: dict[JournalKey, dict] = field(default_factory=dict)
+
+    def __len__(self):
+        return len(self.download_urls) + len(self.series)
+
+
+def _key(key) -> JournalKey:
+    return tuple(str(k) for k in key)
+
+
+class ScrapeJournal:
+    def __init__(self, path: str, fsync: bool = False):
+        self.path = path
+        self.fsync = fsync
+        self._file = None
+
+    def load(self) -> JournalState:
+        """
+        Read all complete records. A last line cut off by a crash is ignored, as its
+        work is simply done again.
+        """
+        state = JournalState()
+        if not os.path.exists(self.path):
+            return state
+        with open(self.path, encoding="utf-8") as f:
+            for line_number, line in enumerate(f, 1):
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(
+                        f"Ignoring broken journal line {line_number} of {self.path}"
+                    )
+                    continue
+                kind = record.get("kind")
+                if kind == "download_url":
+                    state.download_urls[_key(record["key"])] = record["download_url"]
+                elif kind == "series":
+                    state.series[_key(record["key"])] = record["tree"]
+        return state
+
+    def _append(self, record: dict):
+        if self._file is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # Kept open for all records until close(), not one open per record
+            self._file = open(self.path, "a+", encoding="utf-8")  # noqa: SIM115
+            # Start on a fresh line if the last record was cut off by a crash
+            if self._file.tell() > 0:
+                self._file.seek(self._file.tell() - 1)
+                if self._file.read(1) != "\n":
+                    self._file.write("\n")
+        self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def record_download_url(self, key, download_url: str):
+        self._append(
+            {"kind": "download_url", "key": _key(key), "download_url": download_url}
+        )
+
+    def record_series(self, key, tree: dict):
+        self._append({"kind": "series", "key": _key(key), "tree": tree})
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def compact(self) -> JournalState:
+        """
+        Rewrite the journal with the latest record of every key, without broken lines,
+        and return its state. The old file is only replaced once the new one is written.
+        """
+        self.close()
+        state = self.load()
+        if not os.path.exists(self.path):
+            return state
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            for key, download_url in state.download_urls.items():
+                record = {
+                    "kind": "download_url",
+                    "key": key,
+                    "download_url": download_url,
+                }
+                f.write(json.dumps(record, separators=(",", ":")) + "\n")
+            for key, tree in state.series.items():
+                record = {"kind": "series", "key": key, "tree": tree}
+                f.write(json.dumps(record, separators=(",", ":")) + "\n")
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+        return state
+
+    def discard(self):
+        """Drop the journal after its records were stored in the final files."""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
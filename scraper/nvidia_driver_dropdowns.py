@@ -1,13 +1,12 @@
 import asyncio
 import os
-import random
 import pickle
 from dataclasses import dataclass
 
 import cmd
 import json
+import logging
 from enum import Enum
-from itertools import islice
 
 import aiohttp
 
@@ -16,6 +15,35 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.support.ui import Select
 
+from pyvidia_update.source.catalog import (
+    CatalogLeaf,
+    DriverCatalog,
+    iter_catalog_leaves,
+)
+from pyvidia_update.source.catalog_file import write_catalog
+from pyvidia_update.source.catalog_jsonl import (
+    leaves_from_nested_dict,
+    nested_dict_from_leaves,
+    read_catalog_jsonl,
+    write_catalog_jsonl,
+)
+from pyvidia_update.source.http_session import NVIDIA_BASE_URL, nvidia_base_url
+from scraper.http_engine import HttpDropdownEngine, ScrapeFilter
+from scraper.dedupe import LookupGroup, UrlPool, group_lookups, infer_urls
+from scraper.journal import ScrapeJournal
+from scraper.rate_limit import AimdLimiter, Outcome, TokenBucket, retry_delay
+from scraper.refresh import (
+    DEFAULT_REFRESH_TTL,
+    CatalogMeta,
+    apply_plan,
+    build_changelog,
+    full_scrape_meta,
+    plan_refresh,
+    updated_meta,
+)
+
+logger = logging.getLogger(__name__)
+
 """
 json format:
 {
@@ -85,6 +113,17 @@ class NvidiaUrlLookupParameter:
     def to_url_params(self) -> str:
         return f"?dtcid={self.dtcid}&psid={self.psid}&pfid={self.pfid}&osid={self.osid}&dtid={self.dtid}&lid={self.lid}"
 
+    @classmethod
+    def from_path(cls, path: tuple[str, ...]) -> "NvidiaUrlLookupParameter":
+        dtcid, psid, pfid, osid, dtid, lid = path
+        return cls(dtcid=dtcid, psid=psid, pfid=pfid, osid=osid, dtid=dtid, lid=lid)
+
+    def key(self) -> tuple[str, ...]:
+        return tuple(
+            str(v)
+            for v in (self.dtcid, self.psid, self.pfid, self.osid, self.dtid, self.lid)
+        )
+
 
 class WebDriverSelection(Enum):
     CHROME: webdriver.Chrome = webdriver.Chrome
@@ -98,7 +137,9 @@ class NvidiaDriverScraper(cmd.Cmd):
     _selected_driver: WebDriverSelection = WebDriverSelection.CHROME
     driver: webdriver.Chrome | webdriver.Firefox | None = None
 
-    _base_url: str = "https://www.nvidia.com/Download/processDriver.aspx"
+    # Overridden by PYVIDIA_NVIDIA_BASE_URL, e.g. for a replay server (scraper/replay.py)
+    _download_page_url: str = f"{NVIDIA_BASE_URL}/Download/"
+    _base_url: str = f"{_download_page_url}processDriver.aspx"
     json_output: dict = {}
 
     _consumer_types = ["geforce", "titan", "quadro"]
@@ -106,14 +147,43 @@ class NvidiaDriverScraper(cmd.Cmd):
     # TODO: Replace this with a real argument parser
     json_file_path = "./data/nvidia-dropdown-values.json"
     pickle_file_path = ""
+    catalog_file_path = ""
+    jsonl_file_path = ""
+    journal_file_path = ""
+    meta_file_path = ""
+    changelog_file_path = ""
     skip_languages = True
     os_limit = "windows"
     use_json = True
     only_consumer_types = True
 
+    # Download url fetcher: the concurrency adapts between 1 and max_workers
+    max_workers = 20
+    requests_per_second = 5.0
+    max_retries = 4
+    request_timeout = 10
+    # Infer the url of selections that only differ in OS or language, see dedupe.py.
+    # Off by default, it saves requests only when languages are scraped
+    dedupe_lookups = False
+
     def __init__(self):
         super().__init__()
+        self._download_page_url = f"{nvidia_base_url()}/Download/"
+        self._base_url = f"{self._download_page_url}processDriver.aspx"
         self.pickle_file_path = self.json_file_path.replace(".json", ".pkl")
+        self.catalog_file_path = os.path.join(
+            os.path.dirname(self.json_file_path), "nvidia-driver-catalog.bin"
+        )
+        self.jsonl_file_path = os.path.join(
+            os.path.dirname(self.json_file_path), "nvidia-driver-catalog.jsonl.gz"
+        )
+        self.journal_file_path = self.json_file_path.replace(".json", ".journal.jsonl")
+        self.journal = ScrapeJournal(self.journal_file_path)
+        self._url_pool = UrlPool()
+        self.meta_file_path = self.json_file_path.replace(".json", ".meta.json")
+        self.changelog_file_path = self.json_file_path.replace(
+            ".json", ".changelog.json"
+        )
 
     def precmd(self, line):
         return line
@@ -179,12 +249,76 @@ class NvidiaDriverScraper(cmd.Cmd):
         """
         self.scrape_drivers()
 
+    def do_scrape_http(self, arg):
+        """
+        Start the scraping process without a browser, using the lookup endpoint of the
+        driver page. The init options for languages, os and product types apply.
+
+        scrape_http [<download page url>]
+
+        The download page url defaults to https://www.nvidia.com/Download/ (or
+        PYVIDIA_NVIDIA_BASE_URL) and can point to a local replay server, see replay.py.
+        """
+        download_page_url = arg.strip() or self._download_page_url
+        if not download_page_url.endswith("/"):
+            download_page_url += "/"
+        self.scrape_drivers_http(download_page_url)
+
     def do_cleanup(self, arg):
         self.cleanup_json()
 
+    def do_refresh(self, arg):
+        """
+        Refresh the stored data without scraping everything again. All dropdown option
+        lists are fetched, but only the download urls of new entries, entries older
+        than the TTL and entries below a changed option list. The changes are written
+        to the changelog file next to the pickle.
+
+        refresh [<ttl in hours>] [<download page url>]
+
+        The TTL defaults to one week.
+        """
+        args = arg.split()
+        ttl = float(args[0]) * 60 * 60 if args else DEFAULT_REFRESH_TTL
+        download_page_url = args[1] if len(args) > 1 else self._download_page_url
+        if not download_page_url.endswith("/"):
+            download_page_url += "/"
+        self.refresh_drivers(ttl, download_page_url)
+
+    def do_discard_journal(self, arg):
+        """
+        Delete the progress journal, so the next scrape starts from zero instead of
+        resuming an interrupted one.
+        """
+        self.journal.discard()
+        logger.info(f"Removed {self.journal_file_path}")
+
     def do_compress(self, arg):
+        """
+        Store the catalog export (or the JSON file if there is no export) as pickle and
+        as binary catalog file.
+        """
         self.store_compressed()
 
+    def do_export(self, arg):
+        """
+        Export the pickle as JSON Lines, one driver selection per line.
+
+        export [<path>]
+
+        The path defaults to the jsonl_file_path. Paths ending in .gz are gzip
+        compressed, paths ending in .zst zstd compressed (needs zstandard).
+        """
+        self.export_jsonl(arg.strip() or self.jsonl_file_path)
+
+    def do_import(self, arg):
+        """
+        Import a JSON Lines export as pickle and as binary catalog file.
+
+        import [<path>]
+        """
+        self.import_jsonl(arg.strip() or self.jsonl_file_path)
+
     def do_quit(self, line):
         """Exit the program."""
         self._exit_tasks()
@@ -200,6 +334,7 @@ class NvidiaDriverScraper(cmd.Cmd):
         return stop
 
     def _exit_tasks(self):
+        self.journal.close()
         if self.driver is not None and isinstance(
             self.driver, (webdriver.Chrome, webdriver.Firefox)
         ):
@@ -230,125 +365,194 @@ class NvidiaDriverScraper(cmd.Cmd):
         except Exception:
             return False
 
-    @staticmethod
-    async def _random_wait(chunk_num, total_chunks):
-        min_wait = 1  # minimum seconds to wait
-        max_wait = 7  # maximum seconds to wait
-        wait_time = random.randint(min_wait, max_wait)
-        print(
-            f"({chunk_num}/{total_chunks}) Randomly waiting for {wait_time} seconds before sending chunk"
-        )
-        await asyncio.sleep(wait_time)
-
-    @staticmethod
-    def _chunk_iterable(iterable, chunk_size: int = 20):
-        it = iter(iterable)
-        while True:
-            chunk = list(islice(it, chunk_size))
-            if not chunk:
-                break
-            yield chunk
-
-    async def _get_download_urls_of_chunk(
-        self,
-        params_list: list[NvidiaUrlLookupParameter],
-        session: aiohttp.ClientSession,
-    ):
-        tasks = []
-
-        for param in params_list:
-            task = asyncio.ensure_future(self._add_download_url(param, session=session))
-            tasks.append(task)
-
-        return await asyncio.gather(*tasks, return_exceptions=True)
-
-    async def _add_download_url(
+    async def _request_download_url(
         self, param: NvidiaUrlLookupParameter, session: aiohttp.ClientSession
-    ):
-        timeout = 10
+    ) -> tuple[Outcome, str | None]:
         url = f"{self._base_url}{param.to_url_params()}"
         try:
-            async with session.get(url, timeout=timeout) as response:
+            async with session.get(url, timeout=self.request_timeout) as response:
+                # nvidia.com answers throttled clients with 403 Access Denied pages
+                if response.status in (403, 429):
+                    logger.warning(f"Status {response.status}, throttled for {url}")
+                    return Outcome.THROTTLED, "access_denied"
+                if not 200 <= response.status < 300:
+                    logger.warning(f"Status {response.status} for {url}")
+                    return Outcome.FAILED, None
                 result = await response.text()
-                if "No certified downloads" in result or "DOCTYPE html" in result:
-                    print(f"No download found for {url}")
-                    download_url = "not_found"
-                elif "Access Denied" in result:
-                    print(f"Access Denied for {url}")
-                    download_url = "access_denied"
-                elif "nvidia" not in result:
-                    download_url = f"https://www.nvidia.com/Download/{result}"
-                else:
-                    download_url = f"https:{result}"
-                self.json_output[param.dtcid][param.psid][param.pfid][param.osid][
-                    param.dtid
-                ][param.lid]["download_url"] = download_url
-                print(f"Received {download_url}")
+        except TimeoutError:
+            logger.warning(f"Timeout for {url}")
+            return Outcome.THROTTLED, None
         except Exception as e:
-            print(f"Fetching of {url} failed. Error message: {e}")
+            logger.warning(f"Fetching of {url} failed. Error message: {e}")
+            return Outcome.FAILED, None
+
+        if "No certified downloads" in result or "DOCTYPE html" in result:
+            logger.info(f"No download found for {url}")
+            return Outcome.SUCCESS, "not_found"
+        if "Access Denied" in result:
+            logger.warning(f"Access Denied for {url}")
+            return Outcome.THROTTLED, "access_denied"
+        if "nvidia" not in result:
+            return Outcome.SUCCESS, f"https://www.nvidia.com/Download/{result}"
+        return Outcome.SUCCESS, f"https:{result}"
+
+    async def _add_download_url(
+        self,
+        param: NvidiaUrlLookupParameter,
+        session: aiohttp.ClientSession,
+        bucket: TokenBucket,
+        limiter: AimdLimiter,
+    ) -> str | None:
+        download_url = None
+        for attempt in range(self.max_retries + 1):
+            if attempt > 0:
+                await asyncio.sleep(retry_delay(attempt - 1))
+            async with limiter:
+                await bucket.acquire()
+                outcome, download_url = await self._request_download_url(param, session)
+            limiter.record(outcome)
+            if outcome is Outcome.SUCCESS:
+                break
+
+        if download_url is None:
+            return None
+        self._store_download_url(param, download_url)
+        logger.debug(f"Received {download_url}")
+        return download_url
+
+    def _store_download_url(self, param: NvidiaUrlLookupParameter, download_url: str):
+        self._set_download_url(param, download_url)
+        if download_url != "access_denied":
+            self.journal.record_download_url(param.key(), download_url)
+
+    def _set_download_url(self, param: NvidiaUrlLookupParameter, download_url: str):
+        self.json_output[param.dtcid][param.psid][param.pfid][param.osid][param.dtid][
+            param.lid
+        ]["download_url"] = self._url_pool(download_url)
+
+    def _restore_download_urls(
+        self, url_lookup: list[NvidiaUrlLookupParameter]
+    ) -> list[NvidiaUrlLookupParameter]:
+        """Apply the download urls found by an interrupted run, return the missing."""
+        journaled = self.journal.compact().download_urls
+        pending = []
+        for param in url_lookup:
+            download_url = journaled.get(param.key())
+            if download_url is None:
+                pending.append(param)
+            else:
+                self._set_download_url(param, download_url)
+        if len(pending) < len(url_lookup):
+            logger.info(
+                f"Resuming: {len(url_lookup) - len(pending)} download urls restored "
+                f"from {self.journal_file_path}"
+            )
+        return pending
+
+    async def _fetch_download_urls(
+        self,
+        url_lookup: list[NvidiaUrlLookupParameter],
+        session: aiohttp.ClientSession,
+        bucket: TokenBucket,
+        limiter: AimdLimiter,
+    ) -> dict[tuple[str, ...], str | None]:
+        """Fetch ``url_lookup`` with a sliding pool of workers."""
+        queue: asyncio.Queue[NvidiaUrlLookupParameter] = asyncio.Queue()
+        for param in url_lookup:
+            queue.put_nowait(param)
+        urls: dict[tuple[str, ...], str | None] = {}
+
+        async def worker():
+            while not queue.empty():
+                param = queue.get_nowait()
+                urls[param.key()] = await self._add_download_url(
+                    param, session, bucket, limiter
+                )
+                if len(urls) % 100 == 0 or len(urls) == len(url_lookup):
+                    logger.info(
+                        f"({len(urls)}/{len(url_lookup)}) "
+                        f"concurrency limit {limiter.limit:.1f}"
+                    )
+
+        await asyncio.gather(*(worker() for _ in range(self.max_workers)))
+        return urls
 
     async def _fetch_urls(self, url_lookup: list[NvidiaUrlLookupParameter]):
-        print(f"Fetched {len(url_lookup)} driver selections, running URL fetcher now")
+        logger.info(
+            f"Fetched {len(url_lookup)} driver selections, running URL fetcher now"
+        )
         self._exit_tasks()
+        url_lookup = self._restore_download_urls(url_lookup)
 
-        max_workers = 20
+        if self.dedupe_lookups:
+            groups = group_lookups(url_lookup)
+        else:
+            groups = [LookupGroup([param], [param]) for param in url_lookup]
+        probes = [probe for group in groups for probe in group.probes]
+        logger.info(
+            f"{len(url_lookup)} download urls in {len(groups)} classes of equivalent "
+            f"selections, probing {len(probes)}"
+        )
 
-        tcp_conn = aiohttp.TCPConnector(limit=max_workers)
+        bucket = TokenBucket(self.requests_per_second)
+        limiter = AimdLimiter(initial=4, maximum=self.max_workers)
+        tcp_conn = aiohttp.TCPConnector(limit=self.max_workers)
         async with aiohttp.ClientSession(connector=tcp_conn) as session:
-            for i, url_lookup_chunk in enumerate(
-                self._chunk_iterable(url_lookup, max_workers)
-            ):
-                await self._random_wait(i, (len(url_lookup) // max_workers))
-                await self._get_download_urls_of_chunk(url_lookup_chunk, session)
+            urls = await self._fetch_download_urls(probes, session, bucket, limiter)
 
-        await tcp_conn.close()
+            inferred, remaining = infer_urls(groups, urls)
+            for param, shared_url in inferred:
+                self._store_download_url(param, shared_url)
+            logger.info(
+                f"Inferred {len(inferred)} download urls, fetching {len(remaining)} "
+                f"of classes with differing urls"
+            )
+            await self._fetch_download_urls(remaining, session, bucket, limiter)
 
         with open(self.pickle_file_path, "wb+") as f:
-            print(f"Dumping JSON with download URLs to {self.json_file_path}")
+            logger.info(f"Dumping JSON with download URLs to {self.json_file_path}")
             pickle.dump(self.json_output, f)
+        self._dump_catalog(self.json_output)
+        self.journal.discard()
 
-    def scrape_drivers(self):
-        if self.use_json and os.path.exists(self.json_file_path):
-            with open(self.pickle_file_path, "rb") as f:
-                self.pickle_file_path: dict = pickle.load(f)
-            url_lookup: list[NvidiaUrlLookupParameter] = []
+    def _dump_catalog(self, data: dict):
+        logger.info(f"Writing binary catalog to {self.catalog_file_path}")
+        write_catalog(DriverCatalog.from_nested_dict(data), self.catalog_file_path)
+        logger.info(f"Writing catalog export to {self.jsonl_file_path}")
+        write_catalog_jsonl(leaves_from_nested_dict(data), self.jsonl_file_path)
 
-            for ptk, ptv in self.json_output.items():
-                for psk, psv in ptv.items():
-                    if psk == "verbose_name":
-                        continue
-                    for pk, pv in psv.items():
-                        if pk == "verbose_name":
-                            continue
-                        for osk, osv in pv.items():
-                            if osk == "verbose_name":
-                                continue
-                            for dtk, dtv in osv.items():
-                                if dtk == "verbose_name":
-                                    continue
-                                for lgk in dtv.keys():
-                                    if lgk == "verbose_name":
-                                        continue
-                                    url_lookup.append(
-                                        NvidiaUrlLookupParameter(
-                                            dtcid=ptk,
-                                            psid=psk,
-                                            pfid=pk,
-                                            osid=osk,
-                                            dtid=dtk,
-                                            lid=lgk,
-                                        )
-                                    )
+    @staticmethod
+    def _needs_refetch(leaf: CatalogLeaf) -> bool:
+        download_url = leaf.download_url or ""
+        return (
+            download_url == "access_denied"
+            or "Access Denied" in download_url
+            or "DOCTYPE html" in download_url
+        )
 
+    def scrape_drivers(self):
+        if self.use_json and os.path.exists(self.pickle_file_path):
+            with open(self.pickle_file_path, "rb") as f:
+                self.json_output = pickle.load(f)
+            url_lookup = [
+                NvidiaUrlLookupParameter.from_path(leaf.path)
+                for leaf in iter_catalog_leaves(self.json_output)
+            ]
             asyncio.run(self._fetch_urls(url_lookup))
             return
 
         self._init_driver()
-        self.driver.get("https://www.nvidia.com/Download/index.aspx")
+        self.driver.get(f"{self._download_page_url}index.aspx")
 
         product_type = self._get_option_dict("selProductSeriesType")
 
         url_lookup: list[NvidiaUrlLookupParameter] = []
+        finished_series = self.journal.compact().series
+        if finished_series:
+            logger.info(
+                f"Resuming: {len(finished_series)} product series restored "
+                f"from {self.journal_file_path}"
+            )
 
         for pt_value, pt_name in product_type.data.items():
             if not any([s in pt_name.lower() for s in self._consumer_types]):
@@ -360,6 +564,17 @@ class NvidiaDriverScraper(cmd.Cmd):
             product_series = self._get_option_dict("selProductSeries")
 
             for ps_value, ps_name in product_series.data.items():
+                series_tree = finished_series.get((pt_value, ps_value))
+                if series_tree is not None:
+                    self.json_output[pt_value][ps_value] = series_tree
+                    url_lookup.extend(
+                        NvidiaUrlLookupParameter.from_path(leaf.path)
+                        for leaf in iter_catalog_leaves(
+                            series_tree, path=(pt_value, ps_value)
+                        )
+                    )
+                    continue
+                series_lookup_start = len(url_lookup)
                 check = self._select_option(product_series.element, ps_value)
                 if not check:
                     continue
@@ -446,6 +661,10 @@ class NvidiaDriverScraper(cmd.Cmd):
                                         lid=lg_value,
                                     )
                                 )
+                if len(url_lookup) > series_lookup_start:
+                    self.journal.record_series(
+                        (pt_value, ps_value), self.json_output[pt_value][ps_value]
+                    )
             #                     break  # Language
             #                 break  # Download Type
             #             break  # OS
@@ -459,6 +678,82 @@ class NvidiaDriverScraper(cmd.Cmd):
 
         asyncio.run(self._fetch_urls(url_lookup))
 
+    def _http_engine(self, download_page_url: str | None = None) -> HttpDropdownEngine:
+        download_page_url = download_page_url or self._download_page_url
+        self._base_url = f"{download_page_url}processDriver.aspx"
+        return HttpDropdownEngine(
+            lookup_url=f"{download_page_url}API/lookupValueSearch.aspx",
+            scrape_filter=ScrapeFilter(
+                product_types=tuple(self._consumer_types)
+                if self.only_consumer_types
+                else (),
+                os_limit=self.os_limit,
+                skip_languages=self.skip_languages,
+            ),
+        )
+
+    def scrape_drivers_http(self, download_page_url: str | None = None):
+        engine = self._http_engine(download_page_url)
+        self.json_output = asyncio.run(engine.build())
+        logger.info(f"Sent {engine.requests_sent} lookup requests")
+
+        with open(self.pickle_file_path, "wb+") as f:
+            logger.info(f"Dumping JSON to {self.pickle_file_path}")
+            pickle.dump(self.json_output, f)
+
+        url_lookup = [
+            NvidiaUrlLookupParameter.from_path(leaf.path)
+            for leaf in iter_catalog_leaves(self.json_output)
+        ]
+        asyncio.run(self._fetch_urls(url_lookup))
+        full_scrape_meta(self.json_output, engine.option_fingerprints).save(
+            self.meta_file_path
+        )
+
+    def refresh_drivers(
+        self, ttl: float = DEFAULT_REFRESH_TTL, download_page_url: str | None = None
+    ):
+        if not os.path.exists(self.pickle_file_path):
+            logger.info(f"File {self.pickle_file_path} not found, scraping everything")
+            self.scrape_drivers_http(download_page_url)
+            return
+        with open(self.pickle_file_path, "rb") as f:
+            old_tree: dict = pickle.load(f)
+        meta = CatalogMeta.load(self.meta_file_path)
+
+        engine = self._http_engine(download_page_url)
+        new_tree = asyncio.run(engine.build())
+        logger.info(f"Sent {engine.requests_sent} lookup requests")
+        if engine.failed_lookups:
+            logger.warning(
+                f"{len(engine.failed_lookups)} lookups failed, keeping "
+                f"{self.pickle_file_path} unchanged"
+            )
+            return
+
+        plan = plan_refresh(
+            old_tree, new_tree, meta, engine.option_fingerprints, engine.levels, ttl
+        )
+        logger.info(
+            f"{len(plan.changed_lookups)} option lists changed, reusing "
+            f"{len(plan.reuse)} and fetching {len(plan.fetch)} download urls"
+        )
+        self.json_output = new_tree
+        apply_plan(self.json_output, plan)
+        asyncio.run(
+            self._fetch_urls(
+                [NvidiaUrlLookupParameter.from_path(path) for path in plan.fetch]
+            )
+        )
+        updated_meta(self.json_output, meta, plan, engine.option_fingerprints).save(
+            self.meta_file_path
+        )
+
+        changelog = build_changelog(old_tree, self.json_output)
+        with open(self.changelog_file_path, "w", encoding="utf-8") as f:
+            json.dump(changelog.to_dict(), f, indent=2)
+        logger.info(f"{changelog.summary()}, see {self.changelog_file_path}")
+
     def cleanup_json(self):
         if not os.path.exists(self.pickle_file_path):
             print(f"File {self.pickle_file_path} not found!")
@@ -468,42 +763,11 @@ class NvidiaDriverScraper(cmd.Cmd):
             self.json_output: dict = pickle.load(f)
 
         url_lookup: list[NvidiaUrlLookupParameter] = []
-
-        for ptk, ptv in self.json_output.items():
-            for psk, psv in ptv.items():
-                if psk == "verbose_name":
-                    continue
-                for pk, pv in psv.items():
-                    if pk == "verbose_name":
-                        continue
-                    for osk, osv in pv.items():
-                        if osk == "verbose_name":
-                            continue
-                        for dtk, dtv in osv.items():
-                            if dtk == "verbose_name":
-                                continue
-                            for lgk, lgv in dtv.items():
-                                if lgk == "verbose_name":
-                                    continue
-                                lookup = NvidiaUrlLookupParameter(
-                                    dtcid=ptk,
-                                    psid=psk,
-                                    pfid=pk,
-                                    osid=osk,
-                                    dtid=dtk,
-                                    lid=lgk,
-                                )
-                                download_url = lgv.get("download_url", "")
-                                if "No certified downloads" in download_url:
-                                    self.json_output[ptk][psk][pk][osk][dtk][lgk][
-                                        "download_url"
-                                    ] = "not_found"
-                                elif (
-                                    download_url == "access_denied"
-                                    or "Access Denied" in download_url
-                                    or "DOCTYPE html" in download_url
-                                ):
-                                    url_lookup.append(lookup)
+        for leaf in iter_catalog_leaves(self.json_output):
+            if "No certified downloads" in (leaf.download_url or ""):
+                leaf.node["download_url"] = "not_found"
+            elif self._needs_refetch(leaf):
+                url_lookup.append(NvidiaUrlLookupParameter.from_path(leaf.path))
 
         if len(url_lookup) > 0:
             asyncio.run(self._fetch_urls(url_lookup))
@@ -512,7 +776,30 @@ class NvidiaDriverScraper(cmd.Cmd):
             print(f"Dumping JSON to {self.pickle_file_path}")
             pickle.dump(self.json_output, f)
 
+    def export_jsonl(self, path: str):
+        if not os.path.exists(self.pickle_file_path):
+            logger.error(f"File {self.pickle_file_path} not found!")
+            return
+        with open(self.pickle_file_path, "rb") as f:
+            data: dict = pickle.load(f)
+        count = write_catalog_jsonl(leaves_from_nested_dict(data), path)
+        logger.info(f"Exported {count} driver selections to {path}")
+
+    def import_jsonl(self, path: str):
+        if not os.path.exists(path):
+            logger.error(f"File {path} not found!")
+            return
+        data = nested_dict_from_leaves(read_catalog_jsonl(path))
+        with open(self.pickle_file_path, "wb") as f:
+            pickle.dump(data, f)
+            logger.info(f"Stored {path} as {self.pickle_file_path}")
+        write_catalog(DriverCatalog.from_nested_dict(data), self.catalog_file_path)
+        logger.info(f"Stored {path} as {self.catalog_file_path}")
+
     def store_compressed(self):
+        if os.path.exists(self.jsonl_file_path):
+            self.import_jsonl(self.jsonl_file_path)
+            return
         if not os.path.exists(self.json_file_path):
             print(f"File {self.json_file_path} not found!")
             return
@@ -526,7 +813,9 @@ class NvidiaDriverScraper(cmd.Cmd):
         with open(self.pickle_file_path, "wb") as f:
             pickle.dump(data, f)
             print(f"Stored {self.json_file_path} as {self.pickle_file_path}")
+        self._dump_catalog(data)
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     NvidiaDriverScraper().cmdloop()
@@ -0,0 +1,114 @@
+"""
+Request pacing for the scraper: a token bucket limiting the request rate and an
+AIMD controller limiting the number of requests in flight.
+"""
+
+import asyncio
+import random
+import time
+from collections.abc import Callable
+from enum import Enum
+
+
+class Outcome(Enum):
+    SUCCESS = "success"
+    # Access Denied, 429 or timeout: the server wants us to slow down
+    THROTTLED = "throttled"
+    FAILED = "failed"
+
+
+class TokenBucket:
+    """
+    Allows ``rate`` requests per second on average and bursts of up to ``capacity``.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = self.clock()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    async def acquire(self):
+        async with self._lock:
+            self._refill()
+            while self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+
+
+class AimdLimiter:
+    """
+    Concurrency limit with additive increase and multiplicative decrease.
+
+    Every successful request raises the limit by ``increase / limit``, so it grows by
+    about ``increase`` per round of requests. A throttled request multiplies it by
+    ``decrease``, at most once per ``cooldown`` seconds, because the requests in
+    flight at that moment usually get throttled as well.
+    """
+
+    def __init__(
+        self,
+        initial: int = 4,
+        minimum: int = 1,
+        maximum: int = 20,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+        cooldown: float = 2.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.increase = increase
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self.clock = clock
+        self.limit = float(min(maximum, max(minimum, initial)))
+        self.in_flight = 0
+        self._last_decrease = float("-inf")
+        self._condition = asyncio.Condition()
+
+    async def __aenter__(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def record(self, outcome: Outcome):
+        if outcome is Outcome.SUCCESS:
+            self.limit = min(self.maximum, self.limit + self.increase / self.limit)
+        elif outcome is Outcome.THROTTLED:
+            now = self.clock()
+            if now - self._last_decrease >= self.cooldown:
+                self._last_decrease = now
+                self.limit = max(self.minimum, self.limit * self.decrease)
+
+
+def retry_delay(
+    attempt: int,
+    base: float = 1.0,
+    cap: float = 60.0,
+    rng: random.Random | None = None,
+) -> float:
+    """Exponential backoff with full jitter for the ``attempt``-th retry (from 0)."""
+    rng = rng or random
+    return rng.uniform(0, min(cap, base * 2**attempt))
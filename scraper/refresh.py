@@ -0,0 +1,229 @@
+"""
+Incremental refresh of the scraped dropdown tree.
+
+The nested tree has no room for bookkeeping, so it is kept in a sidecar file next to
+the pickle:
+
+{
+    "lookups": {"<TypeID>:<ParentID>": <fingerprint of the option list>, ...},
+    "entries": {"<dtcid>/<psid>/<pfid>/<osid>/<dtid>/<lid>": {
+        "fetched_at": <unix time>, "fingerprint": <fingerprint of the download url>
+    }, ...}
+}
+
+A refresh fetches all option lists again, which takes one request per dropdown, and
+only fetches the download url of entries that are new, older than the TTL or below a
+dropdown whose option list changed.
+"""
+
+import datetime as dt
+import json
+import logging
+import os
+import time
+from collections.abc import Iterator
+from dataclasses import asdict, dataclass, field
+
+from pyvidia_update.source.catalog import CATALOG_LEVELS, iter_catalog_leaves
+from scraper.http_engine import LookupLevel, fingerprint, lookup_key
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REFRESH_TTL = 7 * 24 * 60 * 60
+RETRY_URLS = ("access_denied",)
+
+Path = tuple[str, ...]
+
+
+def _entry_key(path: Path) -> str:
+    return "/".join(path)
+
+
+def _leaves(tree: dict) -> Iterator[tuple[Path, dict]]:
+    for leaf in iter_catalog_leaves(tree):
+        yield leaf.path, leaf.node
+
+
+def _set_url(tree: dict, path: Path, download_url: str):
+    node = tree
+    for key in path:
+        node = node[key]
+    node["download_url"] = download_url
+
+
+@dataclass
+class EntryMeta:
+    fetched_at: float
+    fingerprint: str
+
+
+@dataclass
+class CatalogMeta:
+    lookups: dict[str, str] = field(default_factory=dict)
+    entries: dict[str, EntryMeta] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: str) -> "CatalogMeta":
+        if not os.path.exists(path):
+            return cls()
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            return cls(
+                lookups=data.get("lookups", {}),
+                entries={
+                    key: EntryMeta(**entry)
+                    for key, entry in data.get("entries", {}).items()
+                },
+            )
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable meta file {path}: {e}")
+            return cls()
+
+    def save(self, path: str):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "lookups": self.lookups,
+                    "entries": {
+                        key: asdict(entry) for key, entry in self.entries.items()
+                    },
+                },
+                f,
+            )
+        os.replace(tmp_path, path)
+
+
+@dataclass
+class RefreshPlan:
+    reuse: dict[Path, str] = field(default_factory=dict)
+    fetch: list[Path] = field(default_factory=list)
+    changed_lookups: set[str] = field(default_factory=set)
+
+
+def _lookup_keys(path: Path, levels: dict[str, LookupLevel]) -> list[str]:
+    ids = dict(zip(CATALOG_LEVELS, path))
+    keys = []
+    for level_name in CATALOG_LEVELS:
+        level = levels[level_name]
+        keys.append(
+            lookup_key(level.type_id, ids[level.parent] if level.parent else None)
+        )
+    return keys
+
+
+def plan_refresh(
+    old_tree: dict,
+    new_tree: dict,
+    meta: CatalogMeta,
+    lookups: dict[str, str],
+    levels: dict[str, LookupLevel],
+    ttl: float = DEFAULT_REFRESH_TTL,
+    now: float | None = None,
+) -> RefreshPlan:
+    """
+    Split the entries of ``new_tree`` into download urls that can be taken over from
+    ``old_tree`` and entries that have to be fetched again.
+    """
+    now = time.time() if now is None else now
+    plan = RefreshPlan(
+        changed_lookups={
+            key for key, value in lookups.items() if meta.lookups.get(key) != value
+        }
+    )
+    old_urls = {
+        path: leaf["download_url"]
+        for path, leaf in _leaves(old_tree)
+        if "download_url" in leaf
+    }
+    for path, _ in _leaves(new_tree):
+        old_url = old_urls.get(path)
+        entry = meta.entries.get(_entry_key(path))
+        if (
+            old_url is None
+            or old_url in RETRY_URLS
+            or entry is None
+            or now - entry.fetched_at >= ttl
+            or not plan.changed_lookups.isdisjoint(_lookup_keys(path, levels))
+        ):
+            plan.fetch.append(path)
+        else:
+            plan.reuse[path] = old_url
+    return plan
+
+
+def apply_plan(tree: dict, plan: RefreshPlan):
+    for path, download_url in plan.reuse.items():
+        _set_url(tree, path, download_url)
+
+
+def updated_meta(
+    tree: dict,
+    meta: CatalogMeta,
+    plan: RefreshPlan,
+    lookups: dict[str, str],
+    now: float | None = None,
+) -> CatalogMeta:
+    """Meta data after the entries of ``plan.fetch`` were fetched into ``tree``."""
+    now = time.time() if now is None else now
+    fetched = set(plan.fetch)
+    new_meta = CatalogMeta(lookups=dict(lookups))
+    for path, leaf in _leaves(tree):
+        key = _entry_key(path)
+        download_url = leaf.get("download_url")
+        if path in fetched:
+            if download_url is not None and download_url not in RETRY_URLS:
+                new_meta.entries[key] = EntryMeta(now, fingerprint(download_url))
+        elif key in meta.entries:
+            new_meta.entries[key] = meta.entries[key]
+    return new_meta
+
+
+def full_scrape_meta(
+    tree: dict, lookups: dict[str, str], now: float | None = None
+) -> CatalogMeta:
+    """Meta data of a tree whose download urls were all fetched just now."""
+    plan = RefreshPlan(fetch=[path for path, _ in _leaves(tree)])
+    return updated_meta(tree, CatalogMeta(), plan, lookups, now)
+
+
+@dataclass
+class Changelog:
+    added: list[dict] = field(default_factory=list)
+    removed: list[dict] = field(default_factory=list)
+    changed: list[dict] = field(default_factory=list)
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.changed)
+
+    def summary(self) -> str:
+        return (
+            f"{len(self.added)} added, {len(self.removed)} removed, "
+            f"{len(self.changed)} changed download urls"
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "generated_at": dt.datetime.now(dt.UTC).isoformat(),
+            "added": self.added,
+            "removed": self.removed,
+            "changed": self.changed,
+        }
+
+
+def build_changelog(old_tree: dict, new_tree: dict) -> Changelog:
+    old_urls = {path: leaf.get("download_url") for path, leaf in _leaves(old_tree)}
+    new_urls = {path: leaf.get("download_url") for path, leaf in _leaves(new_tree)}
+    changelog = Changelog()
+    for path, download_url in new_urls.items():
+        if path not in old_urls:
+            changelog.added.append({"path": path, "download_url": download_url})
+        elif old_urls[path] != download_url:
+            changelog.changed.append(
+                {"path": path, "old": old_urls[path], "new": download_url}
+            )
+    for path, download_url in old_urls.items():
+        if path not in new_urls:
+            changelog.removed.append({"path": path, "download_url": download_url})
+    return changelog
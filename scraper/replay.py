@@ -0,0 +1,332 @@
+"""
+Record and replay nvidia.com responses, so the scraper and the app can run offline
+and reproducibly against a local stand-in server.
+
+python -m scraper.replay record [--store PATH] [--port PORT]
+python -m scraper.replay serve [--store PATH] [--port PORT] [--latency MS] [--jitter MS]
+                               [--error-rate RATE] [--access-denied-rate RATE] [--seed N]
+
+Point the scraper and the app at it with PYVIDIA_NVIDIA_BASE_URL=http://127.0.0.1:<port>.
+In record mode requests missing from the store are forwarded to nvidia.com and their
+responses are appended to the store, in serve mode they are answered with 404. Served
+responses can be delayed, and replaced by 503 errors or by the "Access Denied" page
+nvidia.com sends to clients it throttles.
+
+The store is a JSON Lines file with one response per line, keyed by the lower case
+path and the sorted query:
+
+{"key": "/download/processdriver.aspx?lid=1&osid=57&...", "status": 200,
+ "headers": {"Content-Type": "text/html"}, "body": "//www.nvidia.com/..."}
+"""
+
+import argparse
+import base64
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from pyvidia_update.source.http_session import NVIDIA_BASE_URL
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORE = "./data/replay-fixtures.jsonl"
+DEFAULT_PORT = 8080
+RECORDED_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+ACCESS_DENIED_BODY = (
+    b"<HTML><HEAD>\n<TITLE>Access Denied</TITLE>\n</HEAD><BODY>\n<H1>Access Denied</H1>"
+    b"\nYou don't have permission to access this resource on this server.<P>\n"
+    b"</BODY>\n</HTML>\n"
+)
+
+
+def fixture_key(path: str) -> str:
+    """Store key of a request path with query, independent of case and order."""
+    parts = urlsplit(path)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return f"{parts.path.lower()}?{query}" if query else parts.path.lower()
+
+
+@dataclass
+class Fixture:
+    key: str
+    status: int
+    headers: dict[str, str]
+    body: bytes
+
+    def to_dict(self) -> dict:
+        record = {"key": self.key, "status": self.status, "headers": self.headers}
+        try:
+            record["body"] = self.body.decode("utf-8")
+        except UnicodeDecodeError:
+            record["body_base64"] = base64.b64encode(self.body).decode("ascii")
+        return record
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Fixture":
+        if "body_base64" in data:
+            body = base64.b64decode(data["body_base64"])
+        else:
+            body = data["body"].encode("utf-8")
+        return cls(data["key"], data["status"], data["headers"], body)
+
+
+class FixtureStore:
+    """Append-only JSON Lines file of recorded responses, the last one of a key wins."""
+
+    def __init__(self, path: str = DEFAULT_STORE):
+        self.path = path
+        self._fixtures: dict[str, Fixture] = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            self._load()
+
+    def _load(self):
+        with open(self.path, encoding="utf-8") as f:
+            for line_number, line in enumerate(f, 1):
+                try:
+                    fixture = Fixture.from_dict(json.loads(line))
+                except (json.JSONDecodeError, KeyError, ValueError):
+                    logger.warning(f"Ignoring broken line {line_number} of {self.path}")
+                    continue
+                self._fixtures[fixture.key] = fixture
+
+    def __len__(self) -> int:
+        return len(self._fixtures)
+
+    def get(self, key: str) -> Fixture | None:
+        return self._fixtures.get(key)
+
+    def fixtures(self) -> list[Fixture]:
+        return list(self._fixtures.values())
+
+    def add(self, fixture: Fixture):
+        with self._lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a+", encoding="utf-8") as f:
+                # Start on a fresh line if the last record was cut off by a crash
+                if f.tell() > 0:
+                    f.seek(f.tell() - 1)
+                    if f.read(1) != "\n":
+                        f.write("\n")
+                f.write(json.dumps(fixture.to_dict(), separators=(",", ":")) + "\n")
+            self._fixtures[fixture.key] = fixture
+
+
+@dataclass
+class ReplayFaults:
+    """Latency and failures injected into served responses, in seconds and rates."""
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    access_denied_rate: float = 0.0
+    # Same seed, same sequence of delays and failures
+    seed: int | None = None
+    _rng: random.Random = field(init=False, repr=False)
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False
+    )
+
+    def __post_init__(self):
+        self._rng = random.Random(self.seed)
+
+    def draw(self) -> tuple[float, str | None]:
+        """Delay of the next response and its fault: "error", "access_denied" or None."""
+        with self._lock:
+            delay = self.latency + self._rng.uniform(0, self.jitter)
+            roll = self._rng.random()
+        if roll < self.error_rate:
+            return delay, "error"
+        if roll < self.error_rate + self.access_denied_rate:
+            return delay, "access_denied"
+        return delay, None
+
+
+@dataclass
+class ReplayStats:
+    requests: int = 0
+    hits: int = 0
+    misses: int = 0
+    recorded: int = 0
+    errors: int = 0
+    access_denied: int = 0
+
+    def summary(self) -> str:
+        return ", ".join(f"{name} {value}" for name, value in vars(self).items())
+
+
+class _ReplayHandler(BaseHTTPRequestHandler):
+    server: "ReplayServer"
+    # Keep-alive like nvidia.com, every response has a Content-Length
+    protocol_version = "HTTP/1.1"
+    # Headers and body are separate writes, Nagle would hold back the body
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, headers: dict[str, str], body: bytes = b""):
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.server.count("requests")
+        delay, fault = self.server.faults.draw()
+        if delay:
+            time.sleep(delay)
+        if fault == "error":
+            self.server.count("errors")
+            self._send(503, {"Content-Type": "text/plain"}, b"Service Unavailable")
+            return
+        if fault == "access_denied":
+            self.server.count("access_denied")
+            self._send(403, {"Content-Type": "text/html"}, ACCESS_DENIED_BODY)
+            return
+
+        fixture = self.server.respond(self.path)
+        if fixture is None:
+            body = f"No recorded response for {fixture_key(self.path)}".encode()
+            self._send(404, {"Content-Type": "text/plain"}, body)
+            return
+        etag = fixture.headers.get("ETag")
+        if etag and self.headers.get("If-None-Match") == etag:
+            self._send(304, {"ETag": etag})
+            return
+        self._send(fixture.status, fixture.headers, fixture.body)
+
+
+class ReplayServer(ThreadingHTTPServer):
+    """
+    Serves recorded responses. With an ``upstream`` base url responses missing from
+    the store are fetched from there and recorded.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        store: FixtureStore,
+        faults: ReplayFaults | None = None,
+        upstream: str | None = None,
+    ):
+        super().__init__(address, _ReplayHandler)
+        self.store = store
+        self.faults = faults or ReplayFaults()
+        self.upstream = upstream.rstrip("/") if upstream else None
+        self.stats = ReplayStats()
+        self._stats_lock = threading.Lock()
+        self._session = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def handle_error(self, request, client_address):
+        error = sys.exc_info()[1]
+        # Clients drop kept-alive connections whenever they are done with them
+        if isinstance(error, (ConnectionResetError, BrokenPipeError)):
+            logger.debug(f"Client {client_address} closed the connection: {error}")
+            return
+        logger.exception(f"Error while handling a request of {client_address}")
+
+    def count(self, name: str):
+        with self._stats_lock:
+            setattr(self.stats, name, getattr(self.stats, name) + 1)
+
+    def respond(self, path: str) -> Fixture | None:
+        key = fixture_key(path)
+        fixture = self.store.get(key)
+        if fixture is not None:
+            self.count("hits")
+            return fixture
+        self.count("misses")
+        if self.upstream is None:
+            return None
+        return self._record(path, key)
+
+    def _record(self, path: str, key: str) -> Fixture | None:
+        # Imported lazily, serving does not need requests
+        import requests
+
+        if self._session is None:
+            self._session = requests.Session()
+        try:
+            response = self._session.get(f"{self.upstream}{path}", timeout=(5, 30))
+        except requests.RequestException as e:
+            logger.warning(f"Recording of {path} failed. Error message: {e}")
+            return None
+        headers = {
+            name: response.headers[name]
+            for name in RECORDED_HEADERS
+            if name in response.headers
+        }
+        fixture = Fixture(key, response.status_code, headers, response.content)
+        # Throttled and failed responses are passed on, but not replayed later
+        if response.status_code in (403, 429) or response.status_code >= 500:
+            logger.warning(f"Not recording {response.status_code} for {key}")
+            return fixture
+        self.store.add(fixture)
+        self.count("recorded")
+        logger.info(f"Recorded {response.status_code} for {key}")
+        return fixture
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(
+        prog="python -m scraper.replay",
+        description="Record and replay nvidia.com responses.",
+    )
+    parser.add_argument("mode", choices=("record", "serve"))
+    parser.add_argument("--store", default=DEFAULT_STORE)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--upstream", default=NVIDIA_BASE_URL)
+    parser.add_argument("--latency", type=float, default=0, help="Delay in ms")
+    parser.add_argument("--jitter", type=float, default=0, help="Random extra ms")
+    parser.add_argument("--error-rate", type=float, default=0)
+    parser.add_argument("--access-denied-rate", type=float, default=0)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    store = FixtureStore(args.store)
+    server = ReplayServer(
+        (args.host, args.port),
+        store,
+        faults=ReplayFaults(
+            latency=args.latency / 1000,
+            jitter=args.jitter / 1000,
+            error_rate=args.error_rate,
+            access_denied_rate=args.access_denied_rate,
+            seed=args.seed,
+        ),
+        upstream=args.upstream if args.mode == "record" else None,
+    )
+    logger.info(f"Serving {len(store)} recorded responses from {store.path}")
+    logger.info(f"Set PYVIDIA_NVIDIA_BASE_URL={server.base_url} to use it")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        logger.info(server.stats.summary())
+
+
+if __name__ == "__main__":
+    main()
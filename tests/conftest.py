@@ -0,0 +1,28 @@
+import threading
+
+import pytest
+
+from scraper.replay import FixtureStore, ReplayFaults, ReplayServer
+
+
+@pytest.fixture
+def replay_server():
+    """Start a ReplayServer on a free local port, stopped after the test."""
+    servers = []
+
+    def start(
+        store: FixtureStore,
+        faults: ReplayFaults | None = None,
+        upstream: str | None = None,
+    ) -> ReplayServer:
+        server = ReplayServer(("127.0.0.1", 0), store, faults=faults, upstream=upstream)
+        threading.Thread(
+            target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        ).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,112 @@
+import threading
+import time
+
+import pytest
+
+from pyvidia_update.source import batch_check
+from pyvidia_update.source.batch_check import check_selections, fetch_latest_versions
+from pyvidia_update.source.get_current_driver_version import (
+    CurrentDriverInfo,
+    DriverInfoStatus,
+)
+from pyvidia_update.source.get_system_info import GpuInfo
+from pyvidia_update.source.user_saved_data import SelectedDrivers
+
+GPUS = [
+    GpuInfo(0, "NVIDIA GeForce RTX 4070", "550.54", "00000000:01:00.0"),
+    GpuInfo(1, "NVIDIA RTX A4000", "555.85", "00000000:02:00.0"),
+]
+VERSIONS = {"https://example.com/a": "555.85", "https://example.com/b": "552.22"}
+
+
+class FakeFetch:
+    """Driver page fetch that records its calls and the peak number of parallel calls."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls: list[str | None] = []
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, url: str | None, max_age: float | None = None):
+        with self._lock:
+            self.calls.append(url)
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        if url not in VERSIONS:
+            return CurrentDriverInfo.failed(DriverInfoStatus.NOT_FOUND)
+        return CurrentDriverInfo(version=VERSIONS[url], release_date="2024.5.21")
+
+
+@pytest.fixture
+def fetch(monkeypatch) -> FakeFetch:
+    fetch = FakeFetch()
+    monkeypatch.setattr(batch_check, "get_current_driver_version", fetch)
+    return fetch
+
+
+def selection(dl_link: str | None) -> SelectedDrivers:
+    return SelectedDrivers.from_dict({"dl_link": dl_link})
+
+
+def test_identical_urls_are_fetched_once(fetch):
+    links = ["https://example.com/a", "https://example.com/b", "https://example.com/a"]
+    latest = fetch_latest_versions(links)
+    assert sorted(fetch.calls) == ["https://example.com/a", "https://example.com/b"]
+    assert latest["https://example.com/a"].version == "555.85"
+    assert latest["https://example.com/b"].version == "552.22"
+    assert fetch_latest_versions([]) == {}
+
+
+def test_fetches_are_bounded_by_max_workers(fetch):
+    fetch.delay = 0.02
+    links = [f"https://example.com/{index}" for index in range(8)]
+    fetch_latest_versions(links, max_workers=3)
+    assert len(fetch.calls) == 8
+    assert 1 < fetch.peak <= 3
+
+
+def test_one_row_per_gpu_and_selection(fetch):
+    selections = [
+        selection("https://example.com/a"),
+        selection("https://example.com/b"),
+        selection("https://example.com/a"),
+        selection(None),
+    ]
+    results = check_selections(selections, gpus=GPUS)
+    assert sorted(fetch.calls, key=str) == [
+        None,
+        "https://example.com/a",
+        "https://example.com/b",
+    ]
+    assert len(results) == len(GPUS) * len(selections)
+    rows = [
+        (result.gpu.index, result.selection.dl_link, result.update_available)
+        for result in results
+    ]
+    assert rows == [
+        (0, "https://example.com/a", True),
+        (0, "https://example.com/b", True),
+        (0, "https://example.com/a", True),
+        (0, None, False),
+        (1, "https://example.com/a", False),
+        (1, "https://example.com/b", False),
+        (1, "https://example.com/a", False),
+        (1, None, False),
+    ]
+    assert results[3].to_dict()["status"] == "not_found"
+
+
+def test_rows_without_gpus(fetch):
+    selections = [
+        selection("https://example.com/a"),
+        selection("https://example.com/b"),
+    ]
+    results = check_selections(selections, gpus=[])
+    assert [result.gpu for result in results] == [None, None]
+    assert [result.latest.version for result in results] == ["555.85", "552.22"]
+    assert not any(result.update_available for result in results)
@@ -0,0 +1,129 @@
+import pickle
+
+import pytest
+
+from pyvidia_update.source.catalog import (
+    CATALOG_LEVELS,
+    NOT_FOUND_URL,
+    DriverCatalog,
+    iter_catalog_leaves,
+    load_catalog_from_pickle,
+)
+from pyvidia_update.source.get_data import DropdownData
+
+GRD_URL = "https://www.nvidia.com/Download/driverResults.aspx/228212/en-us"
+NESTED = {
+    "1": {
+        "verbose_name": "GeForce",
+        "127": {
+            "verbose_name": "GeForce RTX 40 Series",
+            "995": {
+                "verbose_name": "NVIDIA GeForce RTX 4090",
+                "57": {
+                    "verbose_name": "Windows 10 64-bit",
+                    "1": {
+                        "verbose_name": "Game Ready Driver (GRD)",
+                        "1": {"verbose_name": "English (US)", "download_url": GRD_URL},
+                        "9": {"verbose_name": "Deutsch"},
+                    },
+                },
+            },
+            "1041": {"verbose_name": "NVIDIA GeForce RTX 4080 SUPER"},
+        },
+    },
+    "3": {"verbose_name": "NVIDIA RTX / Quadro"},
+}
+
+
+def nested_nodes(data: dict, path: tuple[str, ...] = ()):
+    """Reference walk of the nested dict, independent of iter_catalog_nodes."""
+    for key, node in data.items():
+        if key == "verbose_name":
+            continue
+        yield path + (key,), node
+        if len(path) + 1 < len(CATALOG_LEVELS):
+            yield from nested_nodes(node, path + (key,))
+
+
+def assert_matches_nested(catalog: DriverCatalog, data: dict):
+    leaves = 0
+    assert dict(catalog.children(())) == {
+        key: node["verbose_name"] for key, node in data.items()
+    }
+    for path, node in nested_nodes(data):
+        assert catalog.has_path(path)
+        assert catalog.name(path) == node.get("verbose_name", "")
+        if len(path) < len(CATALOG_LEVELS):
+            children = {
+                key: child.get("verbose_name", "")
+                for key, child in node.items()
+                if key != "verbose_name"
+            }
+            # Same children in the same order as the dropdowns show them
+            assert list(catalog.children(path).items()) == list(children.items())
+            assert dict(catalog.children_by_name(path)) == {
+                name: key for key, name in children.items()
+            }
+            assert catalog.download_url(path) is None
+        else:
+            leaves += 1
+            assert catalog.children(path) == {}
+            assert catalog.download_url(path) == node.get("download_url", NOT_FOUND_URL)
+    assert len(catalog) == leaves
+
+
+def test_matches_nested_dict():
+    assert_matches_nested(DriverCatalog.from_nested_dict(NESTED), NESTED)
+
+
+def test_matches_dropdown_pickle():
+    with open(DropdownData.pickle_data_path, "rb") as f:
+        data = pickle.load(f)
+    catalog = load_catalog_from_pickle(DropdownData.pickle_data_path)
+    assert len(catalog) > 0
+    assert_matches_nested(catalog, data)
+
+
+def test_records_in_walk_order():
+    catalog = DriverCatalog.from_nested_dict(NESTED)
+    assert [record.path for record in catalog] == [
+        leaf.path for leaf in iter_catalog_leaves(NESTED)
+    ]
+
+
+def test_not_found_url():
+    catalog = DriverCatalog.from_nested_dict(NESTED)
+    english, german = catalog
+    assert english.download_url == GRD_URL
+    # Selections the scraper found no driver for
+    assert german.download_url == NOT_FOUND_URL
+    assert catalog.download_url(german.path) == NOT_FOUND_URL
+
+
+@pytest.mark.parametrize(
+    "path",
+    [("2",), ("1", "128"), ("1", "127", "995", "57", "1", "10"), ("1", "127", "x")],
+)
+def test_unknown_paths(path):
+    catalog = DriverCatalog.from_nested_dict(NESTED)
+    assert not catalog.has_path(path)
+    assert catalog.children(path) == {}
+    assert catalog.name(path) == ""
+    assert catalog.download_url(path) is None
+
+
+def test_from_leaves_matches_nested_dict():
+    catalog = DriverCatalog.from_nested_dict(NESTED)
+    names = {path: node["verbose_name"] for path, node in nested_nodes(NESTED)}
+    rebuilt = DriverCatalog.from_leaves(
+        (
+            record.path,
+            tuple(names[record.path[:depth]] for depth in range(1, 7)),
+            record.download_url,
+        )
+        for record in catalog
+    )
+    assert list(rebuilt) == list(catalog)
+    for path in names:
+        if catalog.download_url(path) is not None:
+            assert rebuilt.download_url(path) == catalog.download_url(path)
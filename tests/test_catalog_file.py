@@ -0,0 +1,94 @@
+import pytest
+
+from pyvidia_update.source.catalog import DriverCatalog
+from pyvidia_update.source.catalog_file import MappedCatalog, write_catalog
+
+GRD_URL = "https://www.nvidia.com/Download/driverResults.aspx/228212/en-us"
+# Ids out of byte order, so catalog order and search order differ
+NESTED = {
+    "1": {
+        "verbose_name": "GeForce",
+        "127": {
+            "verbose_name": "GeForce RTX 40 Series",
+            "995": {
+                "verbose_name": "NVIDIA GeForce RTX 4090",
+                "57": {
+                    "verbose_name": "Windows 10 64-bit",
+                    "1": {
+                        "verbose_name": "Game Ready Driver (GRD)",
+                        "1": {"verbose_name": "English (US)", "download_url": GRD_URL},
+                        "9": {"verbose_name": "Deutsch", "download_url": "not_found"},
+                        "10": {"verbose_name": "Español", "download_url": GRD_URL},
+                    },
+                },
+                "135": {
+                    "verbose_name": "Windows 11",
+                    "18": {
+                        "verbose_name": "Studio Driver (SD)",
+                        "1": {"verbose_name": "English (US)"},
+                    },
+                },
+            },
+            "1041": {"verbose_name": "NVIDIA GeForce RTX 4080 SUPER"},
+        },
+        "129": {"verbose_name": "GeForce RTX 40 Series (Notebooks)"},
+        "Ä": {"verbose_name": "Non-ASCII id"},
+    },
+}
+
+
+@pytest.fixture
+def catalogs(tmp_path):
+    catalog = DriverCatalog.from_nested_dict(NESTED)
+    path = str(tmp_path / "catalog.bin")
+    write_catalog(catalog, path)
+    with MappedCatalog(path) as mapped:
+        yield catalog, mapped
+
+
+def node_paths(catalog, path=()):
+    for key in catalog.children(path):
+        yield path + (key,)
+        yield from node_paths(catalog, path + (key,))
+
+
+def test_matches_driver_catalog(catalogs):
+    catalog, mapped = catalogs
+    assert len(mapped) == len(catalog)
+    assert list(mapped) == list(catalog)
+    paths = list(node_paths(catalog))
+    assert paths == list(node_paths(mapped))
+    for path in [(), *paths]:
+        assert mapped.has_path(path)
+        assert mapped.name(path) == catalog.name(path)
+        # Children keep the catalog order
+        assert list(mapped.children(path).items()) == list(
+            catalog.children(path).items()
+        )
+        assert mapped.children_by_name(path) == catalog.children_by_name(path)
+        assert mapped.download_url(path) == catalog.download_url(path)
+
+
+@pytest.mark.parametrize(
+    "path",
+    [
+        ("2",),
+        ("1", "128"),
+        ("1", "127", "995", "57", "1", "2"),
+        ("1", "127", "995", "57", "1", "1", "1"),
+        ("1", "A"),
+    ],
+)
+def test_missing_paths(catalogs, path):
+    _, mapped = catalogs
+    assert not mapped.has_path(path)
+    assert mapped.name(path) == ""
+    assert dict(mapped.children(path)) == {}
+    assert mapped.download_url(path) is None
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "catalog.bin"
+    path.write_bytes(b"PVCATLG\x00" + b"\x00" * 64)
+    with pytest.raises(ValueError):
+        MappedCatalog(str(path))
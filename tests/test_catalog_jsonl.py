@@ -0,0 +1,120 @@
+import gzip
+
+import pytest
+
+from pyvidia_update.source.catalog import DriverCatalog
+from pyvidia_update.source.catalog_jsonl import (
+    leaves_from_catalog,
+    leaves_from_nested_dict,
+    load_catalog_from_jsonl,
+    nested_dict_from_leaves,
+    read_catalog_jsonl,
+    write_catalog_jsonl,
+)
+from pyvidia_update.source.get_data import DropdownData
+
+GRD_URL = "https://www.nvidia.com/Download/driverResults.aspx/228212/en-us"
+NESTED = {
+    "1": {
+        "verbose_name": "GeForce",
+        "127": {
+            "verbose_name": "GeForce RTX 40 Series",
+            "995": {
+                "verbose_name": "NVIDIA GeForce RTX 4090",
+                "57": {
+                    "verbose_name": "Windows 10 64-bit",
+                    "1": {
+                        "verbose_name": "Game Ready Driver (GRD)",
+                        "1": {"verbose_name": "English (US)", "download_url": GRD_URL},
+                        "10": {"verbose_name": "Español"},
+                    },
+                },
+            },
+        },
+    },
+}
+VALID_LINE = (
+    '{"download_url": null, "names": ["a", "b", "c", "d", "e", "f"], '
+    '"path": ["1", "2", "3", "4", "5", "6"]}\n'
+)
+
+
+def node_paths(catalog, path=()):
+    for key in catalog.children(path):
+        yield path + (key,)
+        yield from node_paths(catalog, path + (key,))
+
+
+def test_round_trip_through_dropdown_data(tmp_path):
+    original = DropdownData()
+    path = str(tmp_path / "nvidia-driver-catalog.jsonl.gz")
+    count = write_catalog_jsonl(leaves_from_catalog(original.catalog), path)
+    assert count == len(original.catalog)
+
+    class ExportedDropdownData(DropdownData):
+        catalog_data_path = str(tmp_path / "missing.bin")
+        jsonl_data_path = path
+
+    exported = ExportedDropdownData()
+    assert isinstance(exported.catalog, DriverCatalog)
+    assert list(exported.catalog) == list(original.catalog)
+    paths = list(node_paths(original.catalog))
+    assert paths == list(node_paths(exported.catalog))
+    for node_path in [(), *paths]:
+        assert dict(exported.catalog.children(node_path)) == dict(
+            original.catalog.children(node_path)
+        )
+    for record in original.catalog:
+        assert exported.get_download_link(*record.path) == record.download_url
+
+
+def test_nested_dict_round_trip(tmp_path):
+    path = str(tmp_path / "catalog.jsonl")
+    assert write_catalog_jsonl(leaves_from_nested_dict(NESTED), path) == 2
+    assert nested_dict_from_leaves(read_catalog_jsonl(path)) == NESTED
+    # Selections without download url get the not found url in the catalog
+    catalog = load_catalog_from_jsonl(path)
+    assert [record.download_url for record in catalog] == [GRD_URL, "not_found"]
+
+
+def test_gzip_files(tmp_path):
+    plain = str(tmp_path / "catalog.jsonl")
+    compressed = str(tmp_path / "catalog.jsonl.gz")
+    write_catalog_jsonl(leaves_from_nested_dict(NESTED), plain)
+    write_catalog_jsonl(leaves_from_nested_dict(NESTED), compressed)
+
+    with open(compressed, "rb") as f:
+        assert f.read(2) == b"\x1f\x8b"
+    with open(plain, encoding="utf-8") as f, gzip.open(compressed, "rt") as gz:
+        assert gz.read() == f.read()
+    assert list(read_catalog_jsonl(compressed)) == list(read_catalog_jsonl(plain))
+
+
+@pytest.mark.parametrize(
+    "line, message",
+    [
+        ("{not json\n", "Invalid line 3"),
+        ('{"names": ["a"]}\n', "Invalid line 3"),
+        (VALID_LINE.replace('"6"]', '"6", "7"]'), "Invalid path in line 3"),
+    ],
+)
+def test_invalid_line_is_reported_with_its_number(tmp_path, line, message):
+    path = str(tmp_path / "catalog.jsonl")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(VALID_LINE + "\n" + line + VALID_LINE)
+    with pytest.raises(ValueError, match=message):
+        list(read_catalog_jsonl(path))
+
+
+def test_failed_export_keeps_the_old_file(tmp_path):
+    path = str(tmp_path / "catalog.jsonl.gz")
+    write_catalog_jsonl(leaves_from_nested_dict(NESTED), path)
+
+    def broken_leaves():
+        yield from leaves_from_nested_dict(NESTED)
+        raise RuntimeError("scrape died")
+
+    with pytest.raises(RuntimeError):
+        write_catalog_jsonl(broken_leaves(), path)
+    assert nested_dict_from_leaves(read_catalog_jsonl(path)) == NESTED
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["catalog.jsonl.gz"]
@@ -0,0 +1,134 @@
+import queue
+import threading
+
+import pytest
+
+from pyvidia_update.source.check_engine import CheckEngine, CheckJob, CheckResult
+from pyvidia_update.source.get_current_driver_version import CurrentDriverInfo
+
+TIMEOUT = 5
+
+
+class FakeCheck:
+    """
+    Check function recording its jobs. Links in ``blocking`` wait until their job is
+    cancelled, links in ``stubborn`` until ``release`` is set, ignoring cancellation.
+    """
+
+    def __init__(self, blocking=(), stubborn=(), failing=()):
+        self.blocking = set(blocking)
+        self.stubborn = set(stubborn)
+        self.failing = set(failing)
+        self.jobs: list[CheckJob] = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    @property
+    def calls(self) -> list[str | None]:
+        return [job.dl_link for job in self.jobs]
+
+    def __call__(self, job: CheckJob) -> CheckResult:
+        self.jobs.append(job)
+        self.started.set()
+        if job.dl_link in self.blocking:
+            job.cancel_event.wait(TIMEOUT)
+        if job.dl_link in self.stubborn:
+            self.release.wait(TIMEOUT)
+        if job.dl_link in self.failing:
+            raise RuntimeError(f"Check of {job.dl_link} failed")
+        return CheckResult(
+            job=job,
+            system_version="550.54",
+            driver_info=CurrentDriverInfo(version="555.85", release_date="2024.5.21"),
+        )
+
+
+@pytest.fixture
+def engine():
+    engines = []
+
+    def start(check: FakeCheck, debounce: float = 0.0, dispatch=None):
+        results: queue.Queue[CheckResult] = queue.Queue()
+        engine = CheckEngine(
+            results.put, dispatch=dispatch, debounce=debounce, check_func=check
+        )
+        engine.results = results
+        engine.start()
+        engines.append(engine)
+        return engine
+
+    yield start
+    for engine in engines:
+        engine.stop(timeout=TIMEOUT)
+
+
+def delivered(engine: CheckEngine, count: int) -> list[str | None]:
+    links = [engine.results.get(timeout=TIMEOUT).job.dl_link for _ in range(count)]
+    # Nothing else is delivered afterwards
+    with pytest.raises(queue.Empty):
+        engine.results.get(timeout=0.1)
+    return links
+
+
+def test_rapid_submits_are_coalesced(engine):
+    check = FakeCheck()
+    dispatched = []
+
+    def dispatch(func, *args):
+        dispatched.append(args[0].job.dl_link)
+        func(*args)
+
+    engine = engine(check, debounce=0.2, dispatch=dispatch)
+    for dl_link in ("a", "b", "c"):
+        engine.submit(dl_link)
+    assert delivered(engine, 1) == ["c"]
+    assert check.calls == ["c"]
+    assert dispatched == ["c"]
+
+
+def test_running_check_is_cancelled_and_dropped(engine):
+    check = FakeCheck(blocking={"a"})
+    engine = engine(check)
+    engine.submit("u9")
+    assert delivered(engine, 1) == ["u9"]
+
+    check.started.clear()
+    first = engine.submit("a")
+    assert check.started.wait(TIMEOUT)
+    second = engine.submit("b")
+    assert first.cancelled
+    assert not second.cancelled
+    assert delivered(engine, 1) == ["b"]
+    assert check.calls == ["u9", "a", "b"]
+    assert [job.generation for job in check.jobs] == [1, 2, 3]
+
+
+def test_result_of_superseded_check_is_dropped(engine):
+    check = FakeCheck(stubborn={"a"})
+    engine = engine(check)
+    engine.submit("a")
+    assert check.started.wait(TIMEOUT)
+    engine.submit("b")
+    check.release.set()
+    assert delivered(engine, 1) == ["b"]
+    assert check.calls == ["a", "b"]
+
+
+def test_failed_check_keeps_the_worker_running(engine):
+    check = FakeCheck(failing={"broken"})
+    engine = engine(check)
+    engine.submit("broken")
+    assert check.started.wait(TIMEOUT)
+    engine.submit("ok", max_age=0)
+    assert delivered(engine, 1) == ["ok"]
+    assert check.jobs[-1].max_age == 0
+
+
+def test_stop_cancels_the_running_check(engine):
+    check = FakeCheck(blocking={"a"})
+    engine = engine(check)
+    job = engine.submit("a")
+    assert check.started.wait(TIMEOUT)
+    engine.stop(timeout=TIMEOUT)
+    assert job.cancelled
+    assert engine.results.empty()
@@ -0,0 +1,204 @@
+import threading
+import time
+
+import pytest
+import requests
+
+from pyvidia_update.source.catalog import CATALOG_LEVELS, NOT_FOUND_URL
+from pyvidia_update.source.check_proxy import CheckProxyServer, SingleFlightCache
+from pyvidia_update.source.driver_cache import DriverInfoCache
+from pyvidia_update.source.get_current_driver_version import (
+    CurrentDriverInfo,
+    DriverInfoStatus,
+    get_current_driver_version,
+)
+from pyvidia_update.source.get_data import DropdownData
+
+URL = "https://www.nvidia.com/Download/driverResults.aspx/228212/en-us"
+INFO = CurrentDriverInfo(version="555.85", release_date="2024.5.21")
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class BlockingFetch:
+    """Upstream fetch that counts its calls and blocks until ``release``."""
+
+    def __init__(self, result: CurrentDriverInfo | Exception = INFO):
+        self.result = result
+        self.calls: list[str] = []
+        self._release = threading.Event()
+        self._release.set()
+
+    def block(self):
+        self._release.clear()
+
+    def release(self):
+        self._release.set()
+
+    def __call__(self, url: str) -> CurrentDriverInfo:
+        self.calls.append(url)
+        self._release.wait(5)
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+def wait_for(condition, timeout: float = 5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
+
+
+def concurrent_gets(cache: SingleFlightCache, count: int) -> list:
+    results = [None] * count
+
+    def get(index: int):
+        results[index] = cache.get(URL)
+
+    threads = [threading.Thread(target=get, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    return results, threads
+
+
+@pytest.mark.parametrize("result", [INFO, OSError("connection reset")])
+def test_concurrent_requests_share_one_fetch(result):
+    fetch = BlockingFetch(result)
+    fetch.block()
+    cache = SingleFlightCache(fetch)
+
+    results, threads = concurrent_gets(cache, 8)
+    wait_for(lambda: cache.stats.coalesced == 7)
+    fetch.release()
+    for thread in threads:
+        thread.join(5)
+
+    assert fetch.calls == [URL]
+    assert (cache.stats.misses, cache.stats.coalesced) == (1, 7)
+    infos = {info for info, _ in results}
+    assert len(infos) == 1
+    if isinstance(result, Exception):
+        assert infos.pop().status is DriverInfoStatus.NETWORK_ERROR
+    else:
+        assert infos == {INFO}
+    # Only the request that fetched reports an uncached answer
+    assert sorted(cached for _, cached in results) == [False] + [True] * 7
+
+
+def test_ttl():
+    clock = FakeClock()
+    fetch = BlockingFetch()
+    cache = SingleFlightCache(fetch, ttl=60, clock=clock)
+    assert cache.get(URL) == (INFO, False)
+    clock.now += 59
+    assert cache.get(URL) == (INFO, True)
+    clock.now += 1
+    assert cache.get(URL) == (INFO, False)
+    assert len(fetch.calls) == 2
+    assert cache.stats.hits == 1
+
+
+def test_failures_are_cached_shorter():
+    clock = FakeClock()
+    fetch = BlockingFetch(CurrentDriverInfo.failed(DriverInfoStatus.PARSE_ERROR))
+    cache = SingleFlightCache(fetch, ttl=60, error_ttl=5, clock=clock)
+    cache.get(URL)
+    clock.now += 4
+    assert cache.get(URL)[1]
+    clock.now += 1
+    fetch.result = INFO
+    assert cache.get(URL) == (INFO, False)
+
+
+def test_eviction():
+    clock = FakeClock()
+    cache = SingleFlightCache(BlockingFetch(), ttl=60, max_entries=2, clock=clock)
+    for page in range(3):
+        cache.get(f"{URL}?page={page}")
+    assert list(cache._entries) == [f"{URL}?page=1", f"{URL}?page=2"]
+
+
+@pytest.fixture
+def proxy():
+    fetch = BlockingFetch()
+    server = CheckProxyServer(("127.0.0.1", 0), cache=SingleFlightCache(fetch))
+    threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+    ).start()
+    host, port = server.server_address[:2]
+    server.base_url = f"http://{host}:{port}"
+    server.fetch = fetch
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_latest(proxy):
+    response = requests.get(f"{proxy.base_url}/latest", params={"dl_link": URL})
+    assert response.status_code == 200
+    assert response.json() == {**INFO.to_dict(), "dl_link": URL, "cached": False}
+    assert response.headers["Cache-Control"] == f"max-age={int(proxy.cache.ttl)}"
+
+    response = requests.get(f"{proxy.base_url}/latest", params={"dl_link": URL})
+    assert response.json()["cached"] is True
+    assert proxy.fetch.calls == [URL]
+
+    health = requests.get(f"{proxy.base_url}/healthz").json()
+    assert health == {"status": "ok", "hits": 1, "misses": 1, "coalesced": 0}
+
+
+def test_latest_by_selection(proxy):
+    dd = DropdownData()
+    path, dl_link = next(
+        (record.path, record.download_url)
+        for record in dd.catalog
+        if record.download_url.startswith("https://www.nvidia.com/")
+    )
+    params = dict(zip(("dtcid", "psid", "pfid", "osid", "dtid", "lid"), path))
+    response = requests.get(f"{proxy.base_url}/latest", params=params)
+    assert response.json()["dl_link"] == dl_link
+    assert proxy.fetch.calls == [dl_link]
+
+
+@pytest.mark.parametrize(
+    "params, status, error",
+    [
+        (
+            {"dl_link": "https://example.com/Download/driverResults.aspx/1/en-us"},
+            400,
+            "is not allowed",
+        ),
+        ({"dl_link": "file:///etc/passwd"}, 400, "is not allowed"),
+        ({"dtcid": "1", "psid": "127"}, 400, "required"),
+        (dict.fromkeys(CATALOG_LEVELS, "1"), 404, "No driver for this selection"),
+        ({"dl_link": NOT_FOUND_URL}, 404, "No driver for this selection"),
+    ],
+)
+def test_rejected_requests(proxy, monkeypatch, params, status, error):
+    # The catalog has no driver for any selection
+    monkeypatch.setattr(proxy, "_download_link", lambda path: NOT_FOUND_URL)
+    response = requests.get(f"{proxy.base_url}/latest", params=params)
+    assert response.status_code == status
+    assert error in response.json()["error"]
+    assert proxy.fetch.calls == []
+
+
+def test_unknown_path(proxy):
+    assert requests.get(f"{proxy.base_url}/latest/").status_code == 404
+
+
+def test_client_asks_proxy(proxy, tmp_path):
+    cache = DriverInfoCache(cache_file=tmp_path / "cache.pkl")
+    for _ in range(2):
+        info = get_current_driver_version(URL, cache=cache, proxy=proxy.base_url)
+        assert info == INFO
+    # The second check is answered by the client cache
+    assert proxy.cache.stats.misses == 1
+    assert proxy.cache.stats.hits == 0
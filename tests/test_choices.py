@@ -0,0 +1,100 @@
+import pytest
+
+from pyvidia_update.source.catalog import DriverCatalog
+from pyvidia_update.source.choices import EMPTY_CHOICES, ChoiceList, ChoiceListCache
+
+NESTED = {
+    "1": {
+        "verbose_name": "GeForce",
+        "127": {"verbose_name": "GeForce RTX 40 Series"},
+        "129": {"verbose_name": "GeForce RTX 40 Series (Notebooks)"},
+    },
+    "3": {
+        "verbose_name": "NVIDIA RTX / Quadro",
+        "122": {"verbose_name": "NVIDIA RTX Series"},
+    },
+    "11": {"verbose_name": "TITAN"},
+}
+
+
+class CountingCatalog:
+    """Catalog recording the paths whose children are looked up."""
+
+    def __init__(self, catalog: DriverCatalog):
+        self.catalog = catalog
+        self.lookups: list[tuple[str, ...]] = []
+
+    def has_path(self, path: tuple[str, ...]) -> bool:
+        return self.catalog.has_path(path)
+
+    def children(self, path: tuple[str, ...]):
+        self.lookups.append(path)
+        return self.catalog.children(path)
+
+
+@pytest.fixture
+def catalog() -> CountingCatalog:
+    return CountingCatalog(DriverCatalog.from_nested_dict(NESTED))
+
+
+def test_choice_list():
+    choices = ChoiceList.from_children({"1": "GeForce", "3": "NVIDIA RTX / Quadro"})
+    assert choices.labels == ("GeForce", "NVIDIA RTX / Quadro")
+    assert choices.id_by_label["NVIDIA RTX / Quadro"] == "3"
+    assert choices.index_of("3") == 1
+    assert choices.index_of("7") == 0
+    assert choices.index_of(None, default=-1) == -1
+    assert choices.id_at(1) == "3"
+    assert choices.id_at(2) is None
+    assert choices.id_at(-1) is None
+    assert EMPTY_CHOICES.labels == ()
+
+
+def test_hit(catalog):
+    cache = ChoiceListCache(catalog)
+    first = cache.get(("1",))
+    assert first.labels == (
+        "GeForce RTX 40 Series",
+        "GeForce RTX 40 Series (Notebooks)",
+    )
+    assert cache.get(("1",)) is first
+    assert catalog.lookups == [("1",)]
+
+
+def test_miss(catalog):
+    cache = ChoiceListCache(catalog)
+    assert cache.get().ids == ("1", "3", "11")
+    assert cache.get(("3",)).ids == ("122",)
+    assert cache.get(("11",)) == EMPTY_CHOICES
+    assert catalog.lookups == [(), ("3",), ("11",)]
+
+
+def test_unknown_path_is_not_cached(catalog):
+    cache = ChoiceListCache(catalog)
+    for _ in range(2):
+        with pytest.raises(ValueError, match="does not exist"):
+            cache.get(("2",))
+    assert catalog.lookups == []
+
+
+def test_least_recently_used_is_evicted(catalog):
+    cache = ChoiceListCache(catalog, maxsize=2)
+    cache.get(("1",))
+    cache.get(("3",))
+    cache.get(("1",))  # Now ("3",) is the least recently used
+    cache.get(())
+    assert catalog.lookups == [("1",), ("3",), ()]
+
+    cache.get(("1",))
+    cache.get(())
+    assert len(catalog.lookups) == 3
+    cache.get(("3",))
+    assert catalog.lookups[3:] == [("3",)]
+
+
+def test_clear(catalog):
+    cache = ChoiceListCache(catalog)
+    cache.get(("1",))
+    cache.clear()
+    cache.get(("1",))
+    assert catalog.lookups == [("1",), ("1",)]
@@ -0,0 +1,108 @@
+import json
+
+import pytest
+
+from pyvidia_update import cli
+from pyvidia_update.cli import _selections_from_args, build_parser
+from pyvidia_update.source import user_saved_data
+from pyvidia_update.source.user_saved_data import SelectedDrivers, load_profiles
+
+URL_A = "https://www.nvidia.com/Download/driverResults.aspx/228212/en-us"
+URL_B = "https://www.nvidia.com/Download/driverResults.aspx/227999/en-us"
+
+
+@pytest.fixture
+def user_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(user_saved_data, "user_dir", str(tmp_path))
+    monkeypatch.setattr(
+        user_saved_data, "_profiles_file", tmp_path / "saved_profiles.pkl"
+    )
+    monkeypatch.setattr(
+        SelectedDrivers, "_pickle_file", tmp_path / "saved_selected_config.pkl"
+    )
+    return tmp_path
+
+
+def saved_links() -> list[str | None]:
+    return [selection.dl_link for selection in load_profiles()]
+
+
+def test_selected_drivers_from_dict():
+    data = {
+        "product_type": "1",
+        "product_series": "127",
+        "product": "995",
+        "os": "57",
+        "dt": "1",
+        "language": "1",
+        "dl_link": "https://www.nvidia.com/Download/driverResults.aspx/228212/en-us",
+    }
+    assert SelectedDrivers.from_dict(data).to_dict() == data
+    assert SelectedDrivers.from_dict({}).to_dict() == dict.fromkeys(data)
+
+
+def test_selections_from_args():
+    args = build_parser().parse_args(["check", "--dl-link", "https://example.com/1"])
+    [selection] = _selections_from_args(args)
+    assert selection.dl_link == "https://example.com/1"
+    assert selection.product is None
+
+    args = build_parser().parse_args(
+        ["check", "--dtcid", "1", "--psid", "127", "--pfid", "995"]
+    )
+    [selection] = _selections_from_args(args)
+    assert (selection.product_type, selection.product_series, selection.product) == (
+        "1",
+        "127",
+        "995",
+    )
+    assert selection.dl_link is None
+
+
+def test_repeated_dl_links():
+    args = build_parser().parse_args(
+        ["check", "--dl-link", URL_A, "--dl-link", URL_B, "--max-workers", "2"]
+    )
+    assert [selection.dl_link for selection in _selections_from_args(args)] == [
+        URL_A,
+        URL_B,
+    ]
+    assert args.max_workers == 2
+
+
+def test_saved_profiles_are_checked(user_dir):
+    args = build_parser().parse_args(["check"])
+    assert [selection.dl_link for selection in _selections_from_args(args)] == [None]
+
+    cli.main(["profiles", "add", "--dl-link", URL_A, "--dl-link", URL_B])
+    assert saved_links() == [URL_A, URL_B]
+    assert [selection.dl_link for selection in _selections_from_args(args)] == [
+        URL_A,
+        URL_B,
+    ]
+
+
+def test_profiles_add_and_remove(user_dir, capsys):
+    gui_selection = SelectedDrivers.from_dict({"product": "995", "dl_link": URL_A})
+    gui_selection.save_as_pkl()
+
+    # The selection of the config window becomes the first profile
+    assert cli.main(["profiles", "add", "--dl-link", URL_B]) == 0
+    assert saved_links() == [URL_A, URL_B]
+    assert cli.main(["profiles", "add", "--dtcid", "1", "--pfid", "1000"]) == 0
+    assert [selection.product for selection in load_profiles()] == [
+        "995",
+        None,
+        "1000",
+    ]
+
+    assert cli.main(["profiles", "remove", "0", "2"]) == 0
+    assert saved_links() == [URL_B]
+    assert cli.main(["profiles", "remove", "5"]) == 1
+    assert saved_links() == [URL_B]
+    assert cli.main(["profiles", "add"]) == 1
+
+    capsys.readouterr()
+    assert cli.main(["profiles", "list"]) == 0
+    [profile] = json.loads(capsys.readouterr().out)
+    assert (profile["index"], profile["dl_link"]) == (0, URL_B)
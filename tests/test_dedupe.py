@@ -0,0 +1,96 @@
+import os
+import pickle
+from dataclasses import dataclass
+
+import pytest
+
+from pyvidia_update.source.catalog import iter_catalog_leaves
+from scraper.dedupe import group_lookups, infer_urls
+
+DATA_FILE = os.path.join(
+    os.path.dirname(__file__), "..", "data", "nvidia-dropdown-values.pkl"
+)
+
+GRD_URL = "https://www.nvidia.com/Download/driverResults.aspx/228213/en-us"
+SD_URL = "https://www.nvidia.com/Download/driverResults.aspx/226795/en-us"
+# GeForce RTX 3080 Ti Laptop GPU: no Windows 7 drivers
+RTX_3080_TI_LAPTOP = {
+    ("1", "123", "976", "57", "1", "1"): GRD_URL,
+    ("1", "123", "976", "135", "1", "1"): GRD_URL,
+    ("1", "123", "976", "19", "1", "1"): "not_found",
+    ("1", "123", "976", "57", "18", "1"): SD_URL,
+    ("1", "123", "976", "135", "18", "1"): SD_URL,
+    ("1", "123", "976", "19", "18", "1"): "not_found",
+}
+# GeForce RTX 4090 Laptop GPU, all OS share one url
+RTX_4090_LAPTOP = {
+    ("1", "129", "1004", "57", "1", "1"): GRD_URL,
+    ("1", "129", "1004", "135", "1", "1"): GRD_URL,
+}
+
+
+@dataclass(frozen=True)
+class Lookup:
+    path: tuple[str, ...]
+
+    def key(self) -> tuple[str, ...]:
+        return self.path
+
+
+def resolve(truth: dict[tuple[str, ...], str]) -> tuple[dict, int]:
+    """Urls of all lookups in ``truth`` through dedupe, and the requests it took."""
+    groups = group_lookups([Lookup(path) for path in truth])
+    probes = [probe for group in groups for probe in group.probes]
+    urls = {probe.key(): truth[probe.key()] for probe in probes}
+    inferred, remaining = infer_urls(groups, urls)
+    requests = len(probes) + len(remaining)
+    urls.update((lookup.key(), truth[lookup.key()]) for lookup in remaining)
+    urls.update((lookup.key(), url) for lookup, url in inferred)
+    return urls, requests
+
+
+def with_languages(truth: dict, languages: dict[str, set]) -> dict:
+    """``truth`` for more languages, ``languages`` maps a lid to the osid it lacks."""
+    result = dict(truth)
+    for path, url in truth.items():
+        for lid, missing_osids in languages.items():
+            missing = url == "not_found" or path[3] in missing_osids
+            result[(*path[:5], lid)] = "not_found" if missing else url
+    return result
+
+
+def test_not_found_os_is_never_inferred():
+    urls, requests = resolve(RTX_3080_TI_LAPTOP)
+    assert urls == RTX_3080_TI_LAPTOP
+    assert requests == len(RTX_3080_TI_LAPTOP)
+
+
+def test_shared_url_is_inferred_for_languages():
+    truth = with_languages(RTX_4090_LAPTOP, {"2": set(), "9": set()})
+    urls, requests = resolve(truth)
+    assert urls == truth
+    # Both OS and all three languages probed, the other languages of 135 inferred
+    assert requests == len(truth) - 2
+
+
+def test_language_missing_for_one_os_falls_back_to_every_member():
+    truth = with_languages(RTX_3080_TI_LAPTOP, {"2": {"135"}, "9": set()})
+    urls, requests = resolve(truth)
+    assert urls == truth
+    assert requests == len(truth)
+
+
+def test_other_products_url_is_never_inferred():
+    truth = {**RTX_4090_LAPTOP, **RTX_3080_TI_LAPTOP}
+    urls, _ = resolve(with_languages(truth, {"2": set()}))
+    assert urls == with_languages(truth, {"2": set()})
+
+
+def test_recorded_catalog():
+    if not os.path.exists(DATA_FILE):
+        pytest.skip("no recorded catalog")
+    with open(DATA_FILE, "rb") as f:
+        data = pickle.load(f)
+    truth = {leaf.path: leaf.node["download_url"] for leaf in iter_catalog_leaves(data)}
+    urls, _ = resolve(truth)
+    assert urls == truth
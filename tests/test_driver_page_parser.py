@@ -0,0 +1,60 @@
+import os
+
+import pytest
+
+from pyvidia_update.source.driver_page_parser import (
+    RELEASE_DATE_ID,
+    VERSION_ID,
+    extract_driver_fields,
+)
+from pyvidia_update.source.get_current_driver_version import (
+    _info_from_fields,
+    _parse_driver_info,
+)
+from scraper.replay import FixtureStore
+
+PAGE_FIXTURES = os.path.join(
+    os.path.dirname(__file__), "fixtures", "driver-pages.jsonl"
+)
+EXPECTED = {
+    "/download/driverresults.aspx/228212/en-us": ("555.85", "2024.5.21"),
+    "/download/driverresults.aspx/226795/en-us": ("552.44", "2024.5.8"),
+    "/download/driverresults.aspx/228213/en-us": ("555.85", "2024.5.21"),
+}
+
+
+def chunks(page: bytes, size: int):
+    return (page[start : start + size] for start in range(0, len(page), size))
+
+
+@pytest.mark.parametrize("key", EXPECTED)
+@pytest.mark.parametrize("chunk_size", [1000, 16 * 1024])
+def test_fixture_pages(key, chunk_size):
+    page = FixtureStore(PAGE_FIXTURES).get(key).body
+    streamed = _info_from_fields(extract_driver_fields(chunks(page, chunk_size)))
+    parsed = _parse_driver_info(page.decode("utf-8"))
+    assert (streamed.version, streamed.release_date) == EXPECTED[key]
+    assert streamed == parsed
+
+
+def test_stops_reading_once_found():
+    page = (
+        b"<table><tr><td id='tdVersion'>555.85 <b>WHQL</b></td>"
+        b"<td id='tdReleaseDate'>2024.5.21</td></tr></table>"
+    )
+    consumed = []
+
+    def stream():
+        for chunk in [page, b"<p>rest of the page</p>" * 100]:
+            consumed.append(chunk)
+            yield chunk
+
+    fields = extract_driver_fields(stream())
+    assert fields == {VERSION_ID: "555.85 WHQL", RELEASE_DATE_ID: "2024.5.21"}
+    assert len(consumed) == 1
+
+
+def test_multibyte_characters_split_across_chunks():
+    page = "<p>Größe</p><td id='tdVersion'>555.85</td><td id='tdReleaseDate'>ü</td>"
+    fields = extract_driver_fields(chunks(page.encode("utf-8"), 1))
+    assert fields == {VERSION_ID: "555.85", RELEASE_DATE_ID: "ü"}
@@ -0,0 +1,112 @@
+import pytest
+
+from pyvidia_update.source import get_current_driver_version as driver_version
+from pyvidia_update.source.driver_cache import DEFAULT_TTL, DriverInfoCache
+from pyvidia_update.source.get_current_driver_version import (
+    DriverInfoStatus,
+    get_current_driver_version,
+)
+from pyvidia_update.source.http_session import create_session
+from pyvidia_update.source.scheduler import DEFAULT_INTERVAL
+from scraper.replay import Fixture, FixtureStore
+
+PAGE_PATH = "/Download/driverResults.aspx/228212/en-us"
+
+
+def driver_page(version: str, release_date: str) -> bytes:
+    return (
+        "<!DOCTYPE html><html><body><table>"
+        f"<tr><td>Version:</td><td id='tdVersion'>{version} &nbsp;<b>WHQL</b></td></tr>"
+        f"<tr><td>Release Date:</td><td id='tdReleaseDate'>{release_date}</td></tr>"
+        "</table></body></html>"
+    ).encode()
+
+
+def page_fixture(version: str, etag: str) -> Fixture:
+    headers = {"Content-Type": "text/html; charset=utf-8", "ETag": etag}
+    return Fixture(PAGE_PATH.lower(), 200, headers, driver_page(version, "2024.5.21"))
+
+
+@pytest.fixture
+def store(tmp_path) -> FixtureStore:
+    store = FixtureStore(str(tmp_path / "fixtures.jsonl"))
+    store.add(page_fixture("555.85", '"v1"'))
+    return store
+
+
+@pytest.fixture
+def cache(tmp_path) -> DriverInfoCache:
+    return DriverInfoCache(cache_file=tmp_path / "cache.pkl")
+
+
+@pytest.fixture
+def session():
+    session = create_session(retries=0)
+    yield session
+    session.close()
+
+
+def check(server, session, cache, **kwargs):
+    return get_current_driver_version(
+        f"{server.base_url}{PAGE_PATH}",
+        session=session,
+        cache=cache,
+        proxy="",
+        **kwargs,
+    )
+
+
+def test_default_ttl_is_shorter_than_check_interval():
+    assert DEFAULT_TTL < DEFAULT_INTERVAL
+
+
+def test_fresh_cache_is_served_without_request(store, cache, session, replay_server):
+    server = replay_server(store)
+    assert check(server, session, cache).version == "555.85"
+    assert check(server, session, cache).version == "555.85"
+    assert server.stats.requests == 1
+
+
+def test_max_age_zero_revalidates(store, cache, session, replay_server):
+    server = replay_server(store)
+    check(server, session, cache)
+    fetched_at = cache.get(f"{server.base_url}{PAGE_PATH}").fetched_at
+
+    info = check(server, session, cache, max_age=0)
+    assert info.version == "555.85"
+    assert server.stats.requests == 2
+    assert cache.get(f"{server.base_url}{PAGE_PATH}").fetched_at >= fetched_at
+
+    store.add(page_fixture("560.70", '"v2"'))
+    assert check(server, session, cache).version == "555.85"
+    assert check(server, session, cache, max_age=0).version == "560.70"
+
+
+def test_missing_page(cache, session, tmp_path, replay_server):
+    server = replay_server(FixtureStore(str(tmp_path / "empty.jsonl")))
+    info = check(server, session, cache, max_age=0)
+    assert info.status is DriverInfoStatus.NOT_FOUND
+
+
+def test_page_without_driver_fields(cache, session, tmp_path, replay_server):
+    store = FixtureStore(str(tmp_path / "fixtures.jsonl"))
+    headers = {"Content-Type": "text/html"}
+    store.add(Fixture(PAGE_PATH.lower(), 200, headers, b"<html>Maintenance</html>"))
+    info = check(replay_server(store), session, cache)
+    assert info.status is DriverInfoStatus.PARSE_ERROR
+
+
+def test_unknown_charset_is_read_as_utf8(cache, session, tmp_path, replay_server):
+    store = FixtureStore(str(tmp_path / "fixtures.jsonl"))
+    headers = {"Content-Type": "text/html; charset=x-unknown"}
+    store.add(Fixture(PAGE_PATH.lower(), 200, headers, driver_page("555.85", "2024")))
+    assert check(replay_server(store), session, cache).version == "555.85"
+
+
+def test_unexpected_errors_propagate(store, cache, session, replay_server, monkeypatch):
+    def broken_parser(chunks, encoding):
+        raise TypeError("bug in the parser")
+
+    monkeypatch.setattr(driver_version, "extract_driver_fields", broken_parser)
+    with pytest.raises(TypeError):
+        check(replay_server(store), session, cache)
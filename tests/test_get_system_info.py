@@ -0,0 +1,148 @@
+import os
+import sys
+
+import pytest
+
+from pyvidia_update.source.get_system_info import (
+    NOT_FOUND_SYSTEM_VERSION,
+    GpuInfo,
+    SystemInfoProvider,
+    get_current_nvidia_driver_version,
+    get_nvidia_gpus,
+    set_system_info_provider,
+)
+
+OUTPUT = (
+    "1, NVIDIA GeForce RTX 3060, 555.85, 00000000:02:00.0\n"
+    "0, NVIDIA GeForce RTX 4090, 555.85, 00000000:01:00.0\n"
+)
+GPUS = [
+    GpuInfo(0, "NVIDIA GeForce RTX 4090", "555.85", "00000000:01:00.0"),
+    GpuInfo(1, "NVIDIA GeForce RTX 3060", "555.85", "00000000:02:00.0"),
+]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeNvidiaSmi:
+    """An ``nvidia-smi`` executable printing ``output`` and counting its calls."""
+
+    def __init__(self, directory):
+        script = os.path.join(directory, "nvidia_smi.py")
+        self._output = os.path.join(directory, "output.csv")
+        self._calls = os.path.join(directory, "calls")
+        self.output = OUTPUT
+        with open(script, "w", encoding="utf-8") as f:
+            f.write(
+                f"#!{sys.executable}\n"
+                "import sys\n"
+                f"open({self._calls!r}, 'a').write(' '.join(sys.argv[1:]) + '\\n')\n"
+                f"sys.stdout.write(open({self._output!r}).read())\n"
+            )
+        if sys.platform == "win32":
+            self.path = os.path.join(directory, "nvidia-smi.bat")
+            with open(self.path, "w", encoding="utf-8") as f:
+                f.write(f'@"{sys.executable}" "{script}" %*\n')
+        else:
+            self.path = script
+            os.chmod(self.path, 0o755)
+
+    @property
+    def output(self) -> str:
+        with open(self._output, encoding="utf-8") as f:
+            return f.read()
+
+    @output.setter
+    def output(self, value: str):
+        with open(self._output, "w", encoding="utf-8") as f:
+            f.write(value)
+
+    @property
+    def calls(self) -> list[str]:
+        if not os.path.exists(self._calls):
+            return []
+        with open(self._calls, encoding="utf-8") as f:
+            return f.read().splitlines()
+
+    def reinstall(self):
+        """Touch the executable like a driver install replacing it."""
+        stat = os.stat(self.path)
+        os.utime(self.path, (stat.st_atime, stat.st_mtime + 10))
+
+
+@pytest.fixture
+def nvidia_smi(tmp_path, monkeypatch) -> FakeNvidiaSmi:
+    fake = FakeNvidiaSmi(str(tmp_path))
+    monkeypatch.setenv("PYVIDIA_NVIDIA_SMI", fake.path)
+    set_system_info_provider(None)
+    yield fake
+    set_system_info_provider(None)
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+def test_one_call_for_all_fields(nvidia_smi):
+    assert get_nvidia_gpus() == GPUS
+    assert get_current_nvidia_driver_version() == "555.85"
+    assert nvidia_smi.calls == [
+        "--query-gpu=index,name,driver_version,pci.bus_id --format=csv,noheader"
+    ]
+
+
+def test_cached_until_ttl(nvidia_smi, clock):
+    provider = SystemInfoProvider(ttl=60, clock=clock)
+    assert provider.watch_paths == (nvidia_smi.path,)
+    provider.query()
+    nvidia_smi.output = OUTPUT.replace("555.85", "560.70")
+    clock.now += 59
+    assert provider.query().driver_version == "555.85"
+    assert len(nvidia_smi.calls) == 1
+
+    clock.now += 1
+    assert provider.query().driver_version == "560.70"
+    assert len(nvidia_smi.calls) == 2
+
+
+def test_driver_install_invalidates(nvidia_smi, clock):
+    provider = SystemInfoProvider(clock=clock)
+    provider.query()
+    nvidia_smi.output = OUTPUT.replace("555.85", "560.70")
+    nvidia_smi.reinstall()
+    assert provider.query().driver_version == "560.70"
+    assert len(nvidia_smi.calls) == 2
+
+
+def test_invalidate_and_force(nvidia_smi, clock):
+    provider = SystemInfoProvider(clock=clock)
+    provider.query()
+    provider.query(force=True)
+    provider.invalidate()
+    provider.query()
+    provider.query()
+    assert len(nvidia_smi.calls) == 3
+
+
+def test_missing_nvidia_smi(tmp_path, monkeypatch):
+    monkeypatch.setenv("PYVIDIA_NVIDIA_SMI", str(tmp_path / "missing"))
+    set_system_info_provider(None)
+    try:
+        assert get_nvidia_gpus() == []
+        assert get_current_nvidia_driver_version() == NOT_FOUND_SYSTEM_VERSION
+    finally:
+        set_system_info_provider(None)
+
+
+def test_unexpected_output(nvidia_smi, clock):
+    nvidia_smi.output = "No devices were found\n"
+    provider = SystemInfoProvider(clock=clock)
+    assert provider.query().gpus == ()
+    assert provider.query().driver_version is None
@@ -0,0 +1,248 @@
+import asyncio
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from scraper.http_engine import (
+    HttpDropdownEngine,
+    LookupRequestError,
+    ScrapeFilter,
+    parse_lookup_values,
+)
+from scraper.replay import Fixture, FixtureStore, fixture_key
+
+LOOKUP_PATH = "/Download/API/lookupValueSearch.aspx"
+
+DESKTOP_OPTIONS = {
+    "osid": {"57": "Windows 10 64-bit", "135": "Windows 11", "12": "Linux 64-bit"},
+    "dtid": {"1": "Game Ready Driver (GRD)", "18": "Studio Driver (SD)"},
+    "lid": {"1": "English (US)", "9": "Deutsch"},
+}
+NOTEBOOK_OPTIONS = {
+    "osid": {"135": "Windows 11"},
+    "dtid": {"1": "Game Ready Driver (GRD)"},
+    "lid": {"1": "English (US)"},
+}
+# Options of the driver page dropdowns: product types, series and products by id,
+# the OS, download type and language options per product
+DRIVER_PAGE = {
+    "1": (
+        "GeForce",
+        {
+            "127": (
+                "GeForce RTX 40 Series",
+                {
+                    "995": ("NVIDIA GeForce RTX 4090", DESKTOP_OPTIONS),
+                    "1041": ("NVIDIA GeForce RTX 4080 SUPER", DESKTOP_OPTIONS),
+                },
+            ),
+            "129": (
+                "GeForce RTX 40 Series (Notebooks)",
+                {"1004": ("GeForce RTX 4090 Laptop GPU", NOTEBOOK_OPTIONS)},
+            ),
+        },
+    ),
+    "7": (
+        "Data Center / Tesla",
+        {"118": ("A-Series", {"1001": ("NVIDIA A100", DESKTOP_OPTIONS)})},
+    ),
+}
+TYPE_IDS = {"dtcid": 1, "psid": 2, "pfid": 3, "osid": 4, "lid": 5, "dtid": 6}
+# Dropdown element ids of the driver page
+ELEMENT_LEVELS = {
+    "selProductSeriesType": "dtcid",
+    "selProductSeries": "psid",
+    "selProductFamily": "pfid",
+    "selOperatingSystem": "osid",
+    "ddlDownloadTypeCrdGrd": "dtid",
+    "ddlLanguage": "lid",
+}
+
+
+def lookup_xml(options: dict[str, str], parent_id: str | None = None) -> str:
+    root = ET.Element("LookupValueSearch")
+    values = ET.SubElement(root, "LookupValues")
+    for option_id, name in options.items():
+        value = ET.SubElement(values, "LookupValue", ParentID=parent_id or "0")
+        ET.SubElement(value, "Name").text = name
+        ET.SubElement(value, "Value").text = option_id
+    return ET.tostring(root, encoding="unicode")
+
+
+def add_lookup(store: FixtureStore, level: str, parent_id: str | None, options: dict):
+    query = f"TypeID={TYPE_IDS[level]}"
+    if parent_id is not None:
+        query += f"&ParentID={parent_id}"
+    body = lookup_xml(options, parent_id).encode("utf-8")
+    key = fixture_key(f"{LOOKUP_PATH}?{query}")
+    store.add(Fixture(key, 200, {"Content-Type": "text/xml"}, body))
+
+
+def driver_page_store(path) -> FixtureStore:
+    """Lookup responses of ``DRIVER_PAGE``."""
+    store = FixtureStore(str(path))
+    add_lookup(store, "dtcid", None, {k: v[0] for k, v in DRIVER_PAGE.items()})
+    for dtcid, (_, series) in DRIVER_PAGE.items():
+        add_lookup(store, "psid", dtcid, {k: v[0] for k, v in series.items()})
+        for psid, (_, products) in series.items():
+            add_lookup(store, "pfid", psid, {k: v[0] for k, v in products.items()})
+            for pfid, (_, options) in products.items():
+                for level, level_options in options.items():
+                    add_lookup(store, level, pfid, level_options)
+    return store
+
+
+def expected_tree() -> dict:
+    """``DRIVER_PAGE`` as scraped with the default filter."""
+    tree = {}
+    for dtcid, (type_name, series) in DRIVER_PAGE.items():
+        if type_name != "GeForce":
+            continue
+        tree[dtcid] = {"verbose_name": type_name}
+        for psid, (series_name, products) in series.items():
+            tree[dtcid][psid] = {"verbose_name": series_name}
+            for pfid, (name, options) in products.items():
+                product = tree[dtcid][psid][pfid] = {"verbose_name": name}
+                for osid, os_name in options["osid"].items():
+                    if "Windows" not in os_name:
+                        continue
+                    product[osid] = {"verbose_name": os_name}
+                    for dtid, dt_name in options["dtid"].items():
+                        product[osid][dtid] = {
+                            "verbose_name": dt_name,
+                            "1": {"verbose_name": "English (US)"},
+                        }
+    return tree
+
+
+def build(server, **kwargs) -> tuple[dict, HttpDropdownEngine]:
+    engine = HttpDropdownEngine(
+        lookup_url=f"{server.base_url}{LOOKUP_PATH}",
+        requests_per_second=1000,
+        **kwargs,
+    )
+    return asyncio.run(engine.build()), engine
+
+
+def test_parse_lookup_values():
+    body = lookup_xml({"127": "GeForce RTX 40 Series", "129": "Notebooks"}, "1")
+    assert parse_lookup_values(body) == {
+        "127": "GeForce RTX 40 Series",
+        "129": "Notebooks",
+    }
+    with pytest.raises(LookupRequestError):
+        parse_lookup_values("<html>Access Denied")
+
+
+def test_build(tmp_path, replay_server):
+    server = replay_server(driver_page_store(tmp_path / "fixtures.jsonl"))
+    tree, engine = build(server)
+    assert tree == expected_tree()
+    assert engine.failed_lookups == []
+    # Every (TypeID, ParentID) pair once: 1 + 1 + 2 + 3 products x 3 levels
+    assert engine.requests_sent == 13
+    assert server.stats.misses == 0
+
+
+def test_build_all_languages_and_os(tmp_path, replay_server):
+    server = replay_server(driver_page_store(tmp_path / "fixtures.jsonl"))
+    tree, _ = build(server, scrape_filter=ScrapeFilter(os_limit="all"))
+    assert set(tree["1"]["127"]["995"]) == {"verbose_name", "57", "135", "12"}
+
+    tree, _ = build(server, scrape_filter=ScrapeFilter(skip_languages=False))
+    assert set(tree["1"]["127"]["995"]["57"]["1"]) == {"verbose_name", "1", "9"}
+
+
+def test_missing_lookup_is_reported(tmp_path, replay_server):
+    store = FixtureStore(str(tmp_path / "fixtures.jsonl"))
+    add_lookup(store, "dtcid", None, {"1": "GeForce"})
+    server = replay_server(store)
+    tree, engine = build(server, retries=0)
+    assert tree == {"1": {"verbose_name": "GeForce"}}
+    assert engine.failed_lookups == ["2:1"]
+
+
+class FakeOption:
+    def __init__(self, value: str, text: str):
+        self.value = value
+        self.text = text
+
+    def get_property(self, name: str) -> str:
+        assert name == "value"
+        return self.value
+
+
+class FakeSelect:
+    def __init__(self, page: "FakeDriverPage", level: str):
+        self.page = page
+        self.level = level
+
+    def find_elements(self, by, value) -> list[FakeOption]:
+        return [FakeOption(k, v) for k, v in self.page.options(self.level).items()]
+
+    def select(self, value: str, by_name: bool) -> bool:
+        options = self.page.options(self.level)
+        if by_name:
+            value = next(k for k, name in options.items() if name == value)
+        if value not in options:
+            return False
+        self.page.selected[self.level] = value
+        return True
+
+
+class FakeDriverPage:
+    """Cascading dropdowns of ``DRIVER_PAGE`` in place of a Selenium webdriver."""
+
+    def __init__(self):
+        self.selected: dict[str, str] = {}
+
+    def get(self, url: str):
+        pass
+
+    def find_element(self, by, element_id: str) -> FakeSelect:
+        return FakeSelect(self, ELEMENT_LEVELS[element_id])
+
+    def options(self, level: str) -> dict[str, str]:
+        if level == "dtcid":
+            return {k: v[0] for k, v in DRIVER_PAGE.items()}
+        series = DRIVER_PAGE[self.selected["dtcid"]][1]
+        if level == "psid":
+            return {k: v[0] for k, v in series.items()}
+        products = series[self.selected["psid"]][1]
+        if level == "pfid":
+            return {k: v[0] for k, v in products.items()}
+        return products[self.selected["pfid"]][1][level]
+
+
+def test_matches_selenium_walk(tmp_path, replay_server, monkeypatch):
+    pytest.importorskip("selenium")
+    from scraper.nvidia_driver_dropdowns import NvidiaDriverScraper
+
+    async def fetch_urls(self, url_lookup):
+        pass
+
+    def init_driver(self):
+        self.driver = FakeDriverPage()
+
+    monkeypatch.setattr(
+        NvidiaDriverScraper, "json_file_path", str(tmp_path / "dropdowns.json")
+    )
+    monkeypatch.setattr(NvidiaDriverScraper, "_init_driver", init_driver)
+    monkeypatch.setattr(NvidiaDriverScraper, "_fetch_urls", fetch_urls)
+    monkeypatch.setattr(
+        NvidiaDriverScraper,
+        "_select_option",
+        staticmethod(
+            lambda element, value, by_name=False: element.select(value, by_name)
+        ),
+    )
+    scraper = NvidiaDriverScraper()
+    scraper.use_json = False
+    scraper.json_output = {}
+    scraper.scrape_drivers()
+    scraper.journal.close()
+
+    server = replay_server(driver_page_store(tmp_path / "fixtures.jsonl"))
+    engine = scraper._http_engine(f"{server.base_url}/Download/")
+    engine.requests_per_second = 1000
+    assert asyncio.run(engine.build()) == scraper.json_output == expected_tree()
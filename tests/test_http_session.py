@@ -0,0 +1,147 @@
+import pytest
+import requests
+
+from pyvidia_update.source import http_session
+from pyvidia_update.source.driver_cache import DriverInfoCache
+from pyvidia_update.source.get_current_driver_version import (
+    DriverInfoStatus,
+    get_current_driver_version,
+)
+from pyvidia_update.source.http_session import (
+    USER_AGENT,
+    create_session,
+    get_session,
+    set_session,
+)
+from scraper.replay import Fixture, FixtureStore, ReplayFaults, fixture_key
+
+PAGE_PATH = "/Download/driverResults.aspx/228212/en-us"
+PAGE = (
+    b"<html><body><table><tr><td id='tdVersion'>555.85 WHQL</td></tr>"
+    b"<tr><td id='tdReleaseDate'>2024.5.21</td></tr></table></body></html>"
+)
+
+
+@pytest.fixture
+def store(tmp_path) -> FixtureStore:
+    store = FixtureStore(str(tmp_path / "fixtures.jsonl"))
+    headers = {
+        "Content-Type": "text/html",
+        "ETag": '"v1"',
+        "Last-Modified": "Tue, 21 May 2024 12:00:00 GMT",
+    }
+    store.add(Fixture(fixture_key(PAGE_PATH), 200, headers, PAGE))
+    return store
+
+
+@pytest.fixture
+def session():
+    session = create_session(retries=0)
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def shared_session():
+    """Restore the shared session after the test."""
+    previous = http_session._session
+    yield
+    set_session(previous)
+
+
+def sent_requests(session) -> list:
+    """Record the (request headers, status) of every response of ``session``."""
+    responses = []
+    session.hooks["response"].append(
+        lambda response, *args, **kwargs: responses.append(
+            (response.request.headers, response.status_code)
+        )
+    )
+    return responses
+
+
+def test_shared_session(shared_session):
+    set_session(None)
+    session = get_session()
+    assert get_session() is session
+    assert session.headers["User-Agent"] == USER_AGENT
+
+    replacement = create_session()
+    set_session(replacement)
+    assert get_session() is replacement
+
+
+def test_set_session_closes_the_replaced_session(shared_session, monkeypatch):
+    session = create_session()
+    set_session(session)
+    closed = []
+    monkeypatch.setattr(session, "close", lambda: closed.append(session))
+    set_session(session)
+    assert closed == []
+    set_session(create_session())
+    assert closed == [session]
+
+
+def test_connections_are_pooled(store, session, replay_server, monkeypatch):
+    server = replay_server(store)
+    connections = []
+    process_request = server.process_request
+
+    def count_connection(request, client_address):
+        connections.append(client_address)
+        process_request(request, client_address)
+
+    monkeypatch.setattr(server, "process_request", count_connection)
+    for _ in range(5):
+        assert session.get(f"{server.base_url}{PAGE_PATH}").content == PAGE
+    assert server.stats.requests == 5
+    assert len(connections) == 1
+
+
+def test_conditional_get(tmp_path, store, session, replay_server):
+    server = replay_server(store)
+    cache = DriverInfoCache(cache_file=tmp_path / "cache.pkl")
+    responses = sent_requests(session)
+    url = f"{server.base_url}{PAGE_PATH}"
+
+    for _ in range(2):
+        info = get_current_driver_version(
+            url, session=session, cache=cache, proxy="", max_age=0
+        )
+        assert info.status is DriverInfoStatus.OK
+        assert info.version == "555.85"
+
+    (first_headers, first_status), (headers, status) = responses
+    assert first_status == 200
+    assert "If-None-Match" not in first_headers
+    assert status == 304
+    assert headers["If-None-Match"] == '"v1"'
+    assert headers["If-Modified-Since"] == "Tue, 21 May 2024 12:00:00 GMT"
+    assert cache.get(url).etag == '"v1"'
+
+
+def test_changed_page_is_downloaded_again(tmp_path, store, session, replay_server):
+    server = replay_server(store)
+    cache = DriverInfoCache(cache_file=tmp_path / "cache.pkl")
+    responses = sent_requests(session)
+    url = f"{server.base_url}{PAGE_PATH}"
+    get_current_driver_version(url, session=session, cache=cache, proxy="")
+
+    newer = PAGE.replace(b"555.85", b"560.70")
+    store.add(Fixture(fixture_key(PAGE_PATH), 200, {"ETag": '"v2"'}, newer))
+    info = get_current_driver_version(
+        url, session=session, cache=cache, proxy="", max_age=0
+    )
+    assert info.version == "560.70"
+    assert [status for _, status in responses] == [200, 200]
+    assert cache.get(url).etag == '"v2"'
+
+
+def test_failed_requests_are_retried(store, replay_server):
+    server = replay_server(store, ReplayFaults(error_rate=1))
+    with (
+        create_session(retries=2, backoff_factor=0) as session,
+        pytest.raises(requests.exceptions.RetryError),
+    ):
+        session.get(f"{server.base_url}{PAGE_PATH}")
+    assert server.stats.errors == 3
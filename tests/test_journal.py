@@ -0,0 +1,147 @@
+import asyncio
+import os
+import pickle
+
+import pytest
+
+from pyvidia_update.source.http_session import NVIDIA_BASE_URL_ENV
+from scraper.journal import ScrapeJournal
+from scraper.replay import Fixture, FixtureStore, fixture_key
+
+LOOKUPS = [
+    ("1", "127", "995", "57", "1", "1"),
+    ("1", "127", "995", "135", "1", "1"),
+    ("1", "127", "1000", "57", "1", "1"),
+]
+SERIES_TREE = {"verbose_name": "GeForce RTX 40 Series", "995": {"verbose_name": "4090"}}
+
+
+def download_url(key: tuple[str, ...]) -> str:
+    return f"https://www.nvidia.com/Download/driverResults.aspx/{key[2]}{key[3]}/en-us"
+
+
+def process_driver_path(key: tuple[str, ...]) -> str:
+    dtcid, psid, pfid, osid, dtid, lid = key
+    return (
+        f"/Download/processDriver.aspx?dtcid={dtcid}&psid={psid}&pfid={pfid}"
+        f"&osid={osid}&dtid={dtid}&lid={lid}"
+    )
+
+
+@pytest.fixture
+def journal(tmp_path):
+    with ScrapeJournal(str(tmp_path / "dropdowns.journal.jsonl")) as journal:
+        yield journal
+
+
+def lines(journal: ScrapeJournal) -> list[str]:
+    with open(journal.path, encoding="utf-8") as f:
+        return f.readlines()
+
+
+def test_records_are_written_immediately(journal):
+    assert len(journal.load()) == 0
+    journal.record_download_url([1, 127, 995, 57, 1, 1], download_url(LOOKUPS[0]))
+    journal.record_series(("1", "127"), SERIES_TREE)
+
+    # Readable while the journal is still open, as after a crash
+    state = ScrapeJournal(journal.path).load()
+    assert state.download_urls == {LOOKUPS[0]: download_url(LOOKUPS[0])}
+    assert state.series == {("1", "127"): SERIES_TREE}
+    assert len(lines(journal)) == 2
+
+
+def test_truncated_last_line_is_ignored(journal):
+    journal.record_download_url(LOOKUPS[0], download_url(LOOKUPS[0]))
+    journal.close()
+    with open(journal.path, "a", encoding="utf-8") as f:
+        f.write('{"kind":"download_url","key":["1","127",')
+
+    assert journal.load().download_urls == {LOOKUPS[0]: download_url(LOOKUPS[0])}
+    # The next record starts on a fresh line instead of extending the broken one
+    journal.record_download_url(LOOKUPS[1], download_url(LOOKUPS[1]))
+    assert journal.load().download_urls == {
+        key: download_url(key) for key in LOOKUPS[:2]
+    }
+
+
+def test_compact_keeps_the_latest_record_of_every_key(journal):
+    journal.record_download_url(LOOKUPS[0], "access_denied")
+    journal.record_download_url(LOOKUPS[1], download_url(LOOKUPS[1]))
+    journal.record_download_url(LOOKUPS[0], download_url(LOOKUPS[0]))
+    journal.record_series(("1", "127"), {"verbose_name": "old"})
+    journal.record_series(("1", "127"), SERIES_TREE)
+    journal.close()
+    with open(journal.path, "a", encoding="utf-8") as f:
+        f.write('{"kind":"series"')
+    before = journal.load()
+
+    state = journal.compact()
+    assert state == before
+    assert journal.load() == before
+    assert len(lines(journal)) == 3
+    assert not os.path.exists(f"{journal.path}.tmp")
+
+    journal.record_download_url(LOOKUPS[2], download_url(LOOKUPS[2]))
+    assert len(journal.load().download_urls) == 3
+
+
+def test_compact_and_discard_without_journal(journal):
+    assert len(journal.compact()) == 0
+    assert not os.path.exists(journal.path)
+    journal.record_download_url(LOOKUPS[0], download_url(LOOKUPS[0]))
+    journal.discard()
+    assert not os.path.exists(journal.path)
+
+
+def test_interrupted_fetch_resumes_from_journal(tmp_path, monkeypatch, replay_server):
+    pytest.importorskip("selenium")
+    from scraper.nvidia_driver_dropdowns import (
+        NvidiaDriverScraper,
+        NvidiaUrlLookupParameter,
+    )
+
+    store = FixtureStore(str(tmp_path / "fixtures.jsonl"))
+    for key in LOOKUPS:
+        store.add(
+            Fixture(
+                fixture_key(process_driver_path(key)),
+                200,
+                {},
+                download_url(key).removeprefix("https:").encode(),
+            )
+        )
+    server = replay_server(store)
+    monkeypatch.setenv(NVIDIA_BASE_URL_ENV, server.base_url)
+    monkeypatch.setattr(
+        NvidiaDriverScraper, "json_file_path", str(tmp_path / "dropdowns.json")
+    )
+    scraper = NvidiaDriverScraper()
+    for key in LOOKUPS:
+        node = scraper.json_output
+        for level_id in key:
+            node = node.setdefault(level_id, {"verbose_name": level_id})
+
+    # An interrupted run found the first url, the server would answer differently
+    journaled_url = f"{download_url(LOOKUPS[0])}?journaled"
+    scraper.journal.record_download_url(LOOKUPS[0], journaled_url)
+    scraper.journal.close()
+
+    lookups = [NvidiaUrlLookupParameter.from_path(key) for key in LOOKUPS]
+    asyncio.run(scraper._fetch_urls(lookups))
+    assert server.stats.requests == len(LOOKUPS) - 1
+    with open(scraper.pickle_file_path, "rb") as f:
+        tree = pickle.load(f)
+    found = {}
+    for key in LOOKUPS:
+        node = tree
+        for level_id in key:
+            node = node[level_id]
+        found[key] = node["download_url"]
+    assert found == {
+        LOOKUPS[0]: journaled_url,
+        LOOKUPS[1]: download_url(LOOKUPS[1]),
+        LOOKUPS[2]: download_url(LOOKUPS[2]),
+    }
+    # Everything is in the final files, the journal is gone
+    assert not os.path.exists(scraper.journal_file_path)
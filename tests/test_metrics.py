@@ -0,0 +1,136 @@
+import pytest
+
+from pyvidia_update.source import metrics as metrics_module
+from pyvidia_update.source.metrics import Histogram, MetricsRegistry
+
+
+class FakeClock:
+    """perf_counter advancing by the next of ``steps`` on every call."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.steps: list[float] = []
+
+    def __call__(self) -> float:
+        if self.steps:
+            self.now += self.steps.pop(0)
+        return self.now
+
+
+@pytest.fixture
+def registry() -> MetricsRegistry:
+    return MetricsRegistry(enabled=True)
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(metrics_module.time, "perf_counter", clock)
+    return clock
+
+
+def test_disabled_registry_records_nothing():
+    registry = MetricsRegistry()
+    registry.count("driver_checks_total", status="ok")
+    registry.observe("driver_check_seconds", 0.1)
+    with registry.span("driver_check_seconds"):
+        pass
+    assert registry.snapshot() == {"enabled": False, "counters": [], "histograms": []}
+    assert registry.to_prometheus() == "\n"
+
+
+def test_histogram_buckets_and_quantiles():
+    histogram = Histogram(buckets=(0.1, 1.0))
+    assert histogram.quantile(0.5) is None
+    for value in (0.05, 0.1, 0.5, 0.7, 3.0):
+        histogram.observe(value)
+    assert histogram.counts == [2, 2, 1]
+    assert histogram.cumulative() == [("0.1", 2), ("1.0", 4), ("+Inf", 5)]
+    assert histogram.quantile(0.4) == 0.1
+    assert histogram.quantile(0.5) == 1.0
+    assert histogram.quantile(1.0) == float("inf")
+    assert histogram.total == pytest.approx(4.35)
+
+
+def test_snapshot(registry, clock):
+    registry.count("driver_checks_total", status="ok")
+    registry.count("driver_checks_total", status="ok")
+    registry.count("driver_checks_total", status="not_found")
+    registry.count("catalog_lookups_total", value=3)
+    clock.steps = [0.0, 0.2]
+    with registry.span("driver_check_seconds", source="download"):
+        pass
+    registry.observe("driver_check_seconds", 0.002, source="download")
+
+    snapshot = registry.snapshot()
+    assert snapshot["enabled"] is True
+    assert snapshot["counters"] == [
+        {"name": "catalog_lookups_total", "labels": {}, "value": 3},
+        {"name": "driver_checks_total", "labels": {"status": "not_found"}, "value": 1},
+        {"name": "driver_checks_total", "labels": {"status": "ok"}, "value": 2},
+    ]
+    [histogram] = snapshot["histograms"]
+    assert histogram["name"] == "driver_check_seconds"
+    assert histogram["labels"] == {"source": "download"}
+    assert histogram["count"] == 2
+    assert histogram["sum"] == pytest.approx(0.202)
+    assert histogram["p50"] == 0.005
+    assert histogram["p95"] == 0.25
+    assert histogram["buckets"]["0.001"] == 0
+    assert histogram["buckets"]["0.005"] == 1
+    assert histogram["buckets"]["0.25"] == 2
+    assert histogram["buckets"]["+Inf"] == 2
+
+    registry.reset()
+    assert registry.snapshot()["counters"] == []
+
+
+def test_timed(registry, clock):
+    @registry.timed("parse_seconds", parser="soup")
+    def parse(page: str) -> str:
+        clock.steps.append(0.03)
+        return page.upper()
+
+    clock.steps = [0.0]
+    assert parse("page") == "PAGE"
+    assert parse.__name__ == "parse"
+    [histogram] = registry.snapshot()["histograms"]
+    assert (histogram["count"], histogram["sum"]) == (1, pytest.approx(0.03))
+
+    registry.disable()
+    assert parse("page") == "PAGE"
+    assert registry.snapshot()["histograms"][0]["count"] == 1
+
+
+def test_prometheus_counters(registry):
+    registry.count("driver_checks_total", status="ok")
+    registry.count("driver_checks_total", 2, status="network_error")
+    registry.count("requests_total", 1.5, url='C:\\"x"')
+    assert registry.to_prometheus() == (
+        "# TYPE pyvidia_driver_checks_total counter\n"
+        'pyvidia_driver_checks_total{status="network_error"} 2\n'
+        'pyvidia_driver_checks_total{status="ok"} 1\n'
+        "# TYPE pyvidia_requests_total counter\n"
+        'pyvidia_requests_total{url="C:\\\\\\"x\\""} 1.5\n'
+    )
+
+
+def test_prometheus_histograms(registry):
+    registry.observe("driver_check_seconds", 0.003, source="cache")
+    registry.observe("driver_check_seconds", 0.3, source="cache")
+    registry.observe("driver_check_seconds", 20)
+    lines = registry.to_prometheus().splitlines()
+
+    assert lines.count("# TYPE pyvidia_driver_check_seconds histogram") == 1
+    assert 'pyvidia_driver_check_seconds_bucket{le="0.001"} 0' in lines
+    assert 'pyvidia_driver_check_seconds_bucket{le="+Inf"} 1' in lines
+    assert "pyvidia_driver_check_seconds_count 1" in lines
+    assert "pyvidia_driver_check_seconds_sum 20" in lines
+    assert 'pyvidia_driver_check_seconds_bucket{source="cache",le="0.001"} 0' in lines
+    assert 'pyvidia_driver_check_seconds_bucket{source="cache",le="0.005"} 1' in lines
+    assert 'pyvidia_driver_check_seconds_bucket{source="cache",le="0.5"} 2' in lines
+    assert 'pyvidia_driver_check_seconds_bucket{source="cache",le="+Inf"} 2' in lines
+    assert 'pyvidia_driver_check_seconds_sum{source="cache"} 0.303' in lines
+    assert 'pyvidia_driver_check_seconds_count{source="cache"} 2' in lines
+    # Every bucket plus +Inf, sum and count per label set, one TYPE line
+    assert len(lines) == 1 + 2 * (len(metrics_module.DEFAULT_BUCKETS) + 3)
@@ -0,0 +1,166 @@
+import pytest
+
+from pyvidia_update.source.catalog import DriverCatalog
+from pyvidia_update.source.get_system_info import GpuInfo
+from pyvidia_update.source.name_index import (
+    FORM_FACTOR_PENALTY,
+    ProductNameIndex,
+    detect_selections,
+    normalize_name,
+    selection_for_product,
+)
+
+DESKTOP = ("1", "127")
+NOTEBOOK = ("1", "129")
+PRODUCTS = {
+    DESKTOP: (
+        "GeForce RTX 40 Series",
+        {
+            "1015": "NVIDIA GeForce RTX 4070",
+            "1001": "NVIDIA GeForce RTX 4070 Ti",
+            "1040": "NVIDIA GeForce RTX 4070 Ti SUPER",
+            "995": "NVIDIA GeForce RTX 4090",
+        },
+    ),
+    NOTEBOOK: (
+        "GeForce RTX 40 Series (Notebooks)",
+        {
+            "1006": "GeForce RTX 4070 Laptop GPU",
+            "1003": "GeForce RTX 4080 Laptop GPU",
+        },
+    ),
+    ("1", "All"): ("Show all Product Series", {"1015": "NVIDIA GeForce RTX 4070"}),
+}
+DOWNLOAD_URL = "https://www.nvidia.com/Download/driverResults.aspx/{pfid}/en-us"
+
+
+def gpu(name: str, index: int = 0) -> GpuInfo:
+    return GpuInfo(index, name, "550.54", f"00000000:0{index + 1}:00.0")
+
+
+@pytest.fixture(scope="module")
+def catalog() -> DriverCatalog:
+    series = {}
+    for (_, psid), (series_name, products) in PRODUCTS.items():
+        series[psid] = {"verbose_name": series_name}
+        for pfid, name in products.items():
+            series[psid][pfid] = {
+                "verbose_name": name,
+                **{
+                    osid: {
+                        "verbose_name": os_name,
+                        "1": {
+                            "verbose_name": "Game Ready Driver (GRD)",
+                            "1": {
+                                "verbose_name": "English (US)",
+                                "download_url": DOWNLOAD_URL.format(pfid=pfid),
+                            },
+                        },
+                    }
+                    for osid, os_name in (
+                        ("57", "Windows 10 64-bit"),
+                        ("135", "Win 11"),
+                    )
+                },
+            }
+    return DriverCatalog.from_nested_dict({"1": {"verbose_name": "GeForce", **series}})
+
+
+@pytest.fixture(scope="module")
+def index(catalog) -> ProductNameIndex:
+    return ProductNameIndex.from_catalog(catalog)
+
+
+def test_normalize_name():
+    name = normalize_name("NVIDIA GeForce RTX 4070 Ti SUPER 16GB Laptop GPU")
+    assert name.tokens == ("geforce", "rtx", "4070", "ti", "super")
+    assert name.mobile
+    assert name.model_tokens == {"4070", "ti", "super"}
+    assert not normalize_name("Quadro P5000").mobile
+    assert normalize_name("Quadro P5000 with Max-Q Design").mobile
+
+
+def test_skipped_series_are_not_indexed(index):
+    assert len(index) == 6
+
+
+@pytest.mark.parametrize(
+    "gpu_name, path",
+    [
+        ("NVIDIA GeForce RTX 4070", (*DESKTOP, "1015")),
+        ("NVIDIA GeForce RTX 4070 Ti", (*DESKTOP, "1001")),
+        ("NVIDIA GeForce RTX 4070 Ti SUPER", (*DESKTOP, "1040")),
+        ("NVIDIA GeForce RTX 4090", (*DESKTOP, "995")),
+        ("NVIDIA GeForce RTX 4070 Laptop GPU", (*NOTEBOOK, "1006")),
+    ],
+)
+def test_match(index, gpu_name, path):
+    match = index.match(gpu_name)
+    assert match is not None
+    assert match.path == path
+    assert match.score == pytest.approx(1.0)
+
+
+def test_model_numbers_match_exactly():
+    # Only variants of the 4070 are left, none of them is a 4070
+    index = ProductNameIndex(
+        (path, name, False)
+        for path, name in [
+            ((*DESKTOP, "1001"), "NVIDIA GeForce RTX 4070 Ti"),
+            ((*DESKTOP, "1040"), "NVIDIA GeForce RTX 4070 Ti SUPER"),
+        ]
+    )
+    assert index.search("NVIDIA GeForce RTX 4070") == []
+    assert [m.path[2] for m in index.search("NVIDIA GeForce RTX 4070 Ti")] == ["1001"]
+
+
+@pytest.mark.parametrize(
+    "gpu_name",
+    [
+        "NVIDIA GeForce RTX 5090",
+        "Microsoft Basic Display",
+        "",
+    ],
+)
+def test_no_match(index, gpu_name):
+    assert index.match(gpu_name) is None
+
+
+def test_form_factor_penalty(index):
+    desktop, notebook = index.search("NVIDIA GeForce RTX 4070")
+    assert desktop.path == (*DESKTOP, "1015")
+    assert notebook.path == (*NOTEBOOK, "1006")
+    assert notebook.score == pytest.approx(desktop.score * FORM_FACTOR_PENALTY)
+
+    notebook, desktop = index.search("NVIDIA GeForce RTX 4070 Laptop GPU")
+    assert notebook.path == (*NOTEBOOK, "1006")
+    assert desktop.score == pytest.approx(notebook.score * FORM_FACTOR_PENALTY)
+    # The other form factor is the fallback if the catalog lacks the GPU's own
+    assert index.match("NVIDIA GeForce RTX 4080").path == (*NOTEBOOK, "1003")
+    assert index.match("NVIDIA GeForce RTX 4090 Laptop GPU").path == (*DESKTOP, "995")
+    assert index.match("NVIDIA GeForce RTX 4080", min_score=0.9) is None
+
+
+def test_selection_for_product(catalog):
+    selection = selection_for_product(catalog, (*DESKTOP, "1001"))
+    assert selection.to_dict() == {
+        "product_type": "1",
+        "product_series": "127",
+        "product": "1001",
+        "os": "57",
+        "dt": "1",
+        "language": "1",
+        "dl_link": DOWNLOAD_URL.format(pfid="1001"),
+    }
+    assert selection_for_product(catalog, (*DESKTOP, "9999")) is None
+
+
+def test_detect_selections(catalog, index):
+    gpus = [
+        gpu("NVIDIA GeForce RTX 4070 Ti", 0),
+        gpu("NVIDIA GeForce RTX 4070 Ti", 1),
+        gpu("NVIDIA GeForce RTX 5090", 2),
+        gpu("NVIDIA GeForce RTX 4070 Laptop GPU", 3),
+    ]
+    selections = detect_selections(catalog, gpus, index)
+    assert [selection.product for selection in selections] == ["1001", "1006"]
@@ -0,0 +1,206 @@
+import asyncio
+import random
+
+import aiohttp
+import pytest
+
+from pyvidia_update.source.http_session import NVIDIA_BASE_URL_ENV
+from scraper import rate_limit
+from scraper.rate_limit import AimdLimiter, Outcome, TokenBucket, retry_delay
+from scraper.replay import Fixture, FixtureStore, fixture_key
+
+LOOKUP = ("1", "127", "995", "57", "1", "1")
+PROCESS_DRIVER_PATH = (
+    "/Download/processDriver.aspx?dtcid=1&psid=127&pfid=995&osid=57&dtid=1&lid=1"
+)
+DRIVER_PAGE_URL = "https://www.nvidia.com/Download/driverResults.aspx/228212/en-us"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class ScriptedFaults:
+    """Replay faults in the given order: "error", "access_denied" or None."""
+
+    def __init__(self, *faults: str | None):
+        self.faults = list(faults)
+
+    def draw(self) -> tuple[float, str | None]:
+        return 0.0, self.faults.pop(0) if self.faults else None
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limit.asyncio, "sleep", clock.sleep)
+    return clock
+
+
+def test_token_bucket_burst_then_rate(clock):
+    # Rates with exact binary fractions, the fake clock does not round
+    bucket = TokenBucket(rate=4, capacity=2, clock=clock)
+
+    async def acquire(count: int):
+        for _ in range(count):
+            await bucket.acquire()
+
+    asyncio.run(acquire(2))
+    assert clock.sleeps == []
+    asyncio.run(acquire(4))
+    assert clock.sleeps == [0.25] * 4
+    assert clock.now == 1001.0
+
+    # Idle time refills up to the capacity only
+    clock.now += 60
+    clock.sleeps.clear()
+    asyncio.run(acquire(3))
+    assert clock.sleeps == [0.25]
+
+
+def test_aimd_limiter_backs_off_on_throttling():
+    clock = FakeClock()
+    limiter = AimdLimiter(initial=8, maximum=10, cooldown=2.0, clock=clock)
+    limiter.record(Outcome.THROTTLED)
+    assert limiter.limit == 4
+    # Requests in flight during the same throttling are not counted again
+    limiter.record(Outcome.THROTTLED)
+    assert limiter.limit == 4
+    clock.now += 2
+    limiter.record(Outcome.THROTTLED)
+    limiter.record(Outcome.FAILED)
+    assert limiter.limit == 2
+
+    for _ in range(4):
+        limiter.record(Outcome.SUCCESS)
+    assert 3 < limiter.limit < 4
+
+    for _ in range(8):
+        clock.now += 2
+        limiter.record(Outcome.THROTTLED)
+    assert limiter.limit == limiter.minimum
+    for _ in range(200):
+        limiter.record(Outcome.SUCCESS)
+    assert limiter.limit == limiter.maximum
+
+
+def test_aimd_limiter_limits_requests_in_flight():
+    limiter = AimdLimiter(initial=3)
+    in_flight = []
+
+    async def request():
+        async with limiter:
+            in_flight.append(limiter.in_flight)
+            await asyncio.sleep(0.001)
+
+    async def run():
+        await asyncio.gather(*(request() for _ in range(12)))
+
+    asyncio.run(run())
+    assert max(in_flight) == 3
+    assert limiter.in_flight == 0
+
+
+def test_retry_delay():
+    rng = random.Random(1)
+    for attempt in range(10):
+        delays = [retry_delay(attempt, base=1.0, cap=60.0, rng=rng) for _ in range(50)]
+        assert all(0 <= delay <= min(60.0, 2**attempt) for delay in delays)
+    assert retry_delay(3, rng=random.Random(1)) == retry_delay(3, rng=random.Random(1))
+
+
+@pytest.fixture
+def url_store(tmp_path) -> FixtureStore:
+    store = FixtureStore(str(tmp_path / "fixtures.jsonl"))
+    body = b"driverResults.aspx/228212/en-us"
+    store.add(Fixture(fixture_key(PROCESS_DRIVER_PATH), 200, {}, body))
+    return store
+
+
+@pytest.fixture
+def scraper(tmp_path, monkeypatch):
+    """A scraper with a tree for ``LOOKUP``, fetching from the replay server."""
+    pytest.importorskip("selenium")
+    from scraper import nvidia_driver_dropdowns
+    from scraper.nvidia_driver_dropdowns import NvidiaDriverScraper
+
+    def start(server):
+        monkeypatch.setenv(NVIDIA_BASE_URL_ENV, server.base_url)
+        monkeypatch.setattr(
+            NvidiaDriverScraper, "json_file_path", str(tmp_path / "dropdowns.json")
+        )
+        monkeypatch.setattr(nvidia_driver_dropdowns, "retry_delay", lambda *a: 0)
+        scraper = NvidiaDriverScraper()
+        node = scraper.json_output = {}
+        for level_id in LOOKUP:
+            node = node.setdefault(level_id, {"verbose_name": level_id})
+        return scraper
+
+    return start
+
+
+async def fetch(scraper, limiter: AimdLimiter) -> str | None:
+    from scraper.nvidia_driver_dropdowns import NvidiaUrlLookupParameter
+
+    async with aiohttp.ClientSession() as session:
+        return await scraper._add_download_url(
+            NvidiaUrlLookupParameter.from_path(LOOKUP),
+            session,
+            TokenBucket(1000),
+            limiter,
+        )
+
+
+@pytest.mark.parametrize(
+    "fault, outcome, url",
+    [
+        (None, Outcome.SUCCESS, DRIVER_PAGE_URL),
+        ("access_denied", Outcome.THROTTLED, "access_denied"),
+        ("error", Outcome.FAILED, None),
+    ],
+)
+def test_request_outcome(url_store, replay_server, scraper, fault, outcome, url):
+    from scraper.nvidia_driver_dropdowns import NvidiaUrlLookupParameter
+
+    scraper = scraper(replay_server(url_store, ScriptedFaults(fault)))
+
+    async def request():
+        async with aiohttp.ClientSession() as session:
+            return await scraper._request_download_url(
+                NvidiaUrlLookupParameter.from_path(LOOKUP), session
+            )
+
+    assert asyncio.run(request()) == (outcome, url)
+    scraper.journal.close()
+
+
+def test_throttled_requests_are_retried(url_store, replay_server, scraper):
+    server = replay_server(url_store, ScriptedFaults("access_denied", "access_denied"))
+    scraper = scraper(server)
+    limiter = AimdLimiter(initial=8, cooldown=0)
+
+    assert asyncio.run(fetch(scraper, limiter)) == DRIVER_PAGE_URL
+    assert server.stats.access_denied == 2
+    # Halved twice, then one success
+    assert limiter.limit == pytest.approx(2.5)
+    assert scraper.journal.load().download_urls == {LOOKUP: DRIVER_PAGE_URL}
+    scraper.journal.close()
+
+
+def test_throttled_url_is_not_journaled(url_store, replay_server, scraper):
+    server = replay_server(url_store, ScriptedFaults(*["access_denied"] * 5))
+    scraper = scraper(server)
+
+    assert asyncio.run(fetch(scraper, AimdLimiter())) == "access_denied"
+    assert server.stats.requests == scraper.max_retries + 1
+    assert scraper.journal.load().download_urls == {}
+    scraper.journal.close()
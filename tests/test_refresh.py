@@ -0,0 +1,173 @@
+from scraper.http_engine import LOOKUP_LEVELS, fingerprint, lookup_key
+from scraper.refresh import (
+    CatalogMeta,
+    EntryMeta,
+    apply_plan,
+    build_changelog,
+    full_scrape_meta,
+    plan_refresh,
+    updated_meta,
+)
+
+TTL = 100.0
+NOW = 10_000.0
+RTX_4090 = ("1", "127", "995", "57", "1", "1")
+RTX_4080 = ("1", "127", "999", "57", "1", "1")
+RTX_4070 = ("1", "127", "1000", "57", "1", "1")
+# Fingerprints of the option lists by lookup key, 1000 is a product added later
+LOOKUPS = {
+    lookup_key(level.type_id, pfid): f"{level.level} options of {pfid}"
+    for pfid in ("995", "999")
+    for level in LOOKUP_LEVELS.values()
+    if level.parent == "pfid"
+} | {
+    lookup_key(1, None): "product types",
+    lookup_key(2, "1"): "series of 1",
+    lookup_key(3, "127"): "products of 127",
+}
+
+
+def url(path: tuple[str, ...], version: str = "1") -> str:
+    return f"https://www.nvidia.com/Download/driverResults.aspx/{path[2]}{version}"
+
+
+def tree(urls: dict[tuple[str, ...], str | None]) -> dict:
+    root: dict = {}
+    for path, download_url in urls.items():
+        node = root
+        for level_id in path:
+            node = node.setdefault(level_id, {"verbose_name": level_id})
+        if download_url is not None:
+            node["download_url"] = download_url
+    return root
+
+
+def leaf(root: dict, path: tuple[str, ...]) -> dict:
+    for level_id in path:
+        root = root[level_id]
+    return root
+
+
+def meta(fetched_at: float, *paths: tuple[str, ...]) -> CatalogMeta:
+    return CatalogMeta(
+        lookups=dict(LOOKUPS),
+        entries={
+            "/".join(path): EntryMeta(fetched_at, fingerprint(url(path)))
+            for path in paths
+        },
+    )
+
+
+def plan(old_urls: dict, new_paths, catalog_meta: CatalogMeta, lookups=LOOKUPS):
+    return plan_refresh(
+        tree(old_urls),
+        tree(dict.fromkeys(new_paths)),
+        catalog_meta,
+        lookups,
+        LOOKUP_LEVELS,
+        ttl=TTL,
+        now=NOW,
+    )
+
+
+def test_fresh_entries_are_reused():
+    old = {RTX_4090: url(RTX_4090), RTX_4080: url(RTX_4080)}
+    result = plan(old, old, meta(NOW - TTL / 2, RTX_4090, RTX_4080))
+    assert result.reuse == old
+    assert result.fetch == []
+    assert result.changed_lookups == set()
+
+
+def test_expired_entries_are_fetched():
+    old = {RTX_4090: url(RTX_4090), RTX_4080: url(RTX_4080)}
+    catalog_meta = meta(NOW - TTL / 2, RTX_4090)
+    catalog_meta.entries["/".join(RTX_4080)] = EntryMeta(NOW - TTL, "expired")
+    result = plan(old, old, catalog_meta)
+    assert result.reuse == {RTX_4090: url(RTX_4090)}
+    assert result.fetch == [RTX_4080]
+
+
+def test_throttled_and_unknown_entries_are_fetched():
+    old = {RTX_4090: "access_denied", RTX_4080: url(RTX_4080)}
+    # No meta entry for RTX_4080, e.g. after an interrupted refresh
+    result = plan(old, old, meta(NOW, RTX_4090))
+    assert result.reuse == {}
+    assert result.fetch == [RTX_4090, RTX_4080]
+
+
+def test_changed_lookup_forces_fetch_below_it():
+    old = {RTX_4090: url(RTX_4090), RTX_4080: url(RTX_4080)}
+    changed_os_list = lookup_key(LOOKUP_LEVELS["osid"].type_id, "995")
+    lookups = {**LOOKUPS, changed_os_list: "new os options of 995"}
+    result = plan(old, old, meta(NOW, RTX_4090, RTX_4080), lookups)
+    assert result.changed_lookups == {changed_os_list}
+    assert result.fetch == [RTX_4090]
+    assert result.reuse == {RTX_4080: url(RTX_4080)}
+
+
+def test_new_and_removed_nodes():
+    old = {RTX_4090: url(RTX_4090), RTX_4080: url(RTX_4080)}
+    result = plan(old, [RTX_4090, RTX_4070], meta(NOW, RTX_4090, RTX_4080))
+    assert result.reuse == {RTX_4090: url(RTX_4090)}
+    assert result.fetch == [RTX_4070]
+
+    new_tree = tree(dict.fromkeys([RTX_4090, RTX_4070]))
+    apply_plan(new_tree, result)
+    assert leaf(new_tree, RTX_4090)["download_url"] == url(RTX_4090)
+    assert "download_url" not in leaf(new_tree, RTX_4070)
+
+
+def test_updated_meta():
+    old_meta = meta(NOW - 50, RTX_4090, RTX_4080)
+    old = {RTX_4090: url(RTX_4090), RTX_4080: url(RTX_4080)}
+    new_urls = {RTX_4090: url(RTX_4090), RTX_4070: url(RTX_4070)}
+    result = plan(old, new_urls, old_meta)
+    # The fingerprints of this refresh's option lists replace the stored ones
+    old_meta.lookups = {"stale": "lookup"}
+    new_tree = tree({RTX_4090: None, RTX_4070: url(RTX_4070)})
+    apply_plan(new_tree, result)
+
+    new_meta = updated_meta(new_tree, old_meta, result, LOOKUPS, now=NOW)
+    assert new_meta.lookups == LOOKUPS
+    assert new_meta.entries == {
+        "/".join(RTX_4090): old_meta.entries["/".join(RTX_4090)],
+        "/".join(RTX_4070): EntryMeta(NOW, fingerprint(url(RTX_4070))),
+    }
+
+    # Throttled fetches get no entry, so the next refresh fetches them again
+    leaf(new_tree, RTX_4070)["download_url"] = "access_denied"
+    new_meta = updated_meta(new_tree, old_meta, result, LOOKUPS, now=NOW)
+    assert "/".join(RTX_4070) not in new_meta.entries
+
+
+def test_full_scrape_meta():
+    urls = {RTX_4090: url(RTX_4090), RTX_4080: url(RTX_4080)}
+    full_meta = full_scrape_meta(tree(urls), LOOKUPS, now=NOW)
+    assert full_meta == meta(NOW, RTX_4090, RTX_4080)
+
+
+def test_changelog():
+    old = tree(
+        {RTX_4090: url(RTX_4090), RTX_4080: url(RTX_4080), RTX_4070: url(RTX_4070)}
+    )
+    new = tree(
+        {
+            RTX_4090: url(RTX_4090),
+            RTX_4070: url(RTX_4070, version="2"),
+            ("1", "127", "1001", "57", "1", "1"): "https://example.com/new",
+        }
+    )
+    changelog = build_changelog(old, new)
+    assert changelog.added == [
+        {
+            "path": ("1", "127", "1001", "57", "1", "1"),
+            "download_url": "https://example.com/new",
+        }
+    ]
+    assert changelog.removed == [{"path": RTX_4080, "download_url": url(RTX_4080)}]
+    assert changelog.changed == [
+        {"path": RTX_4070, "old": url(RTX_4070), "new": url(RTX_4070, version="2")}
+    ]
+    assert changelog.summary() == "1 added, 1 removed, 1 changed download urls"
+    assert set(changelog.to_dict()) == {"generated_at", "added", "removed", "changed"}
+    assert not build_changelog(old, old)
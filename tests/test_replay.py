@@ -0,0 +1,202 @@
+import json
+import logging
+import socket
+import struct
+import time
+
+import pytest
+import requests
+
+from pyvidia_update.source.driver_cache import DriverInfoCache
+from pyvidia_update.source.get_current_driver_version import (
+    DriverInfoStatus,
+    get_current_driver_version,
+)
+from pyvidia_update.source.http_session import (
+    NVIDIA_BASE_URL,
+    NVIDIA_BASE_URL_ENV,
+    nvidia_base_url,
+    rebase_nvidia_url,
+)
+from scraper.replay import (
+    ACCESS_DENIED_BODY,
+    Fixture,
+    FixtureStore,
+    ReplayFaults,
+    ReplayServer,
+    fixture_key,
+)
+
+PAGE_PATH = "/Download/driverResults.aspx/228212/en-us"
+PAGE = (
+    b"<html><body><table><tr><td id='tdVersion'>555.85 WHQL</td></tr>"
+    b"<tr><td id='tdReleaseDate'>2024.5.21</td></tr></table></body></html>"
+)
+
+
+@pytest.fixture
+def store(tmp_path) -> FixtureStore:
+    store = FixtureStore(str(tmp_path / "fixtures.jsonl"))
+    headers = {"Content-Type": "text/html", "ETag": '"v1"'}
+    store.add(Fixture(fixture_key(PAGE_PATH), 200, headers, PAGE))
+    return store
+
+
+def test_fixture_key_ignores_case_and_query_order():
+    assert fixture_key("/Download/processDriver.aspx?pfid=995&lid=1&osid=57") == (
+        "/download/processdriver.aspx?lid=1&osid=57&pfid=995"
+    )
+    assert fixture_key(PAGE_PATH) == PAGE_PATH.lower()
+
+
+def test_store_round_trip(tmp_path, store):
+    binary = Fixture("/logo.png", 200, {"Content-Type": "image/png"}, b"\x89PNG\xff")
+    store.add(binary)
+    store.add(Fixture(fixture_key(PAGE_PATH), 200, {}, b"newer"))
+    with open(store.path, "a", encoding="utf-8") as f:
+        f.write('{"key": "/cut-off", "sta')
+
+    loaded = FixtureStore(store.path)
+    assert len(loaded) == 2
+    assert loaded.get("/logo.png") == binary
+    # The last record of a key wins
+    assert loaded.get(fixture_key(PAGE_PATH)).body == b"newer"
+
+    # A record after a cut off line starts on a fresh line
+    loaded.add(Fixture("/after", 200, {}, b""))
+    with open(store.path, encoding="utf-8") as f:
+        assert json.loads(f.readlines()[-1])["key"] == "/after"
+
+
+def test_serve(store, replay_server):
+    server = replay_server(store)
+    with requests.Session() as session:
+        response = session.get(f"{server.base_url}{PAGE_PATH.upper()}")
+        assert response.status_code == 200
+        assert response.content == PAGE
+        assert response.headers["ETag"] == '"v1"'
+
+        response = session.get(
+            f"{server.base_url}{PAGE_PATH}", headers={"If-None-Match": '"v1"'}
+        )
+        assert response.status_code == 304
+        assert response.content == b""
+
+        response = session.get(f"{server.base_url}/Download/unknown.aspx")
+        assert response.status_code == 404
+    assert (server.stats.requests, server.stats.hits, server.stats.misses) == (3, 2, 1)
+
+
+@pytest.mark.parametrize(
+    "faults, status, body",
+    [
+        (ReplayFaults(error_rate=1), 503, b"Service Unavailable"),
+        (ReplayFaults(access_denied_rate=1), 403, ACCESS_DENIED_BODY),
+    ],
+)
+def test_faults(store, replay_server, faults, status, body):
+    server = replay_server(store, faults)
+    response = requests.get(f"{server.base_url}{PAGE_PATH}")
+    assert response.status_code == status
+    assert response.content == body
+
+
+def test_faults_are_reproducible():
+    def draws(seed):
+        faults = ReplayFaults(jitter=0.01, error_rate=0.3, seed=seed)
+        return [faults.draw() for _ in range(20)]
+
+    assert draws(1) == draws(1)
+    assert draws(1) != draws(2)
+
+
+def test_record(tmp_path, store, replay_server):
+    upstream = replay_server(store)
+    recorded = FixtureStore(str(tmp_path / "recorded.jsonl"))
+    server = replay_server(recorded, upstream=upstream.base_url)
+
+    response = requests.get(f"{server.base_url}{PAGE_PATH}")
+    assert response.content == PAGE
+    assert FixtureStore(recorded.path).get(fixture_key(PAGE_PATH)).body == PAGE
+    # Missing upstream pages are recorded as well
+    requests.get(f"{server.base_url}/Download/unknown.aspx")
+    assert server.stats.recorded == 2
+
+    requests.get(f"{server.base_url}{PAGE_PATH}")
+    assert upstream.stats.requests == 2
+
+
+@pytest.mark.parametrize("faults", [{"error_rate": 1}, {"access_denied_rate": 1}])
+def test_throttled_and_failed_responses_are_not_recorded(
+    tmp_path, store, replay_server, faults
+):
+    upstream = replay_server(store, ReplayFaults(**faults))
+    recorded = FixtureStore(str(tmp_path / "recorded.jsonl"))
+    server = replay_server(recorded, upstream=upstream.base_url)
+
+    assert requests.get(f"{server.base_url}{PAGE_PATH}").status_code in (403, 503)
+    assert len(recorded) == 0
+    assert server.stats.recorded == 0
+
+
+def test_nvidia_base_url(monkeypatch):
+    url = "https://www.nvidia.com/Download/driverResults.aspx/228212/en-us?lang=en"
+    monkeypatch.delenv(NVIDIA_BASE_URL_ENV, raising=False)
+    assert nvidia_base_url() == NVIDIA_BASE_URL
+    assert rebase_nvidia_url(url) == url
+
+    monkeypatch.setenv(NVIDIA_BASE_URL_ENV, "http://127.0.0.1:8080/")
+    assert nvidia_base_url() == "http://127.0.0.1:8080"
+    assert rebase_nvidia_url(url) == (
+        "http://127.0.0.1:8080/Download/driverResults.aspx/228212/en-us?lang=en"
+    )
+    # Only nvidia.com urls are rebased
+    other = "https://us.download.nvidia.com/Windows/555.85/555.85-desktop.exe"
+    assert rebase_nvidia_url(other) == other
+
+
+def test_driver_check_against_replay_server(
+    tmp_path, store, replay_server, monkeypatch
+):
+    server = replay_server(store)
+    monkeypatch.setenv(NVIDIA_BASE_URL_ENV, server.base_url)
+    cache = DriverInfoCache(cache_file=tmp_path / "cache.pkl")
+
+    info = get_current_driver_version(
+        f"https://www.nvidia.com{PAGE_PATH}", cache=cache, proxy=""
+    )
+    assert info.status is DriverInfoStatus.OK
+    assert info.version == "555.85"
+    assert server.stats.hits == 1
+
+
+def test_reset_connections_are_not_errors(store, replay_server, caplog, capsys):
+    caplog.set_level(logging.DEBUG, logger="scraper.replay")
+    server = replay_server(store)
+    with socket.create_connection(server.server_address[:2]) as client:
+        client.sendall(f"GET {PAGE_PATH} HTTP/1.1\r\nHost: replay\r\n\r\n".encode())
+        assert client.recv(65536).startswith(b"HTTP/1.1 200")
+        # Close with a reset while the server waits for the next request
+        client.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+    deadline = time.monotonic() + 5
+    while not caplog.records and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    [record] = caplog.records
+    assert record.levelno == logging.DEBUG
+    assert "closed the connection" in record.getMessage()
+    assert "Traceback" not in capsys.readouterr().err
+
+
+def test_handler_errors_are_logged(store, caplog):
+    server = ReplayServer(("127.0.0.1", 0), store)
+    try:
+        try:
+            raise ValueError("broken handler")
+        except ValueError:
+            server.handle_error(None, ("127.0.0.1", 12345))
+    finally:
+        server.server_close()
+    [record] = caplog.records
+    assert record.levelno == logging.ERROR
+    assert record.exc_info[0] is ValueError
@@ -0,0 +1,180 @@
+import random
+import threading
+
+import pytest
+
+from pyvidia_update.source.get_current_driver_version import (
+    CurrentDriverInfo,
+    DriverInfoStatus,
+)
+from pyvidia_update.source.scheduler import (
+    Clock,
+    NetworkMonitor,
+    NotificationThrottle,
+    UpdateScheduler,
+)
+
+
+class FakeClock(Clock):
+    """
+    Time only moves when waited on. ``resume_after`` simulates system sleep: the
+    wait that reaches it advances the wall clock by ``sleep`` extra seconds.
+    """
+
+    def __init__(self):
+        self.now = 1000.0
+        self.wall_offset = 0.0
+        self.waits: list[float] = []
+        self.resume_after: float | None = None
+        self.sleep = 0.0
+        # Set the event of a wait once it reached this time
+        self.wake_at: float | None = None
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def time(self) -> float:
+        return self.now + self.wall_offset
+
+    def wait(self, event: threading.Event, timeout: float) -> bool:
+        self.waits.append(timeout)
+        if event.is_set():
+            return True
+        self.now += timeout
+        if self.resume_after is not None and self.now >= self.resume_after:
+            self.resume_after = None
+            self.wall_offset += self.sleep
+        if self.wake_at is not None and self.now >= self.wake_at:
+            self.wake_at = None
+            event.set()
+        return event.is_set()
+
+
+def scheduler(check, clock, **kwargs) -> UpdateScheduler:
+    return UpdateScheduler(
+        check,
+        interval=3600,
+        jitter=0.1,
+        initial_backoff=60,
+        max_backoff=3600,
+        clock=clock,
+        rng=random.Random(1),
+        **kwargs,
+    )
+
+
+def test_next_delay_is_jittered_interval():
+    s = scheduler(lambda: True, FakeClock())
+    delays = [s.next_delay() for _ in range(100)]
+    assert all(3240 <= delay <= 3960 for delay in delays)
+    assert len(set(delays)) > 1
+
+
+def test_failures_back_off_exponentially():
+    results = iter([False, False, False, False, False, False, False, True])
+    s = scheduler(lambda: next(results), FakeClock())
+    delays = []
+    for _ in range(7):
+        assert not s.run_once()
+        delays.append(s.next_delay())
+    assert delays == [60, 120, 240, 480, 960, 1920, 3600]
+    assert s.run_once()
+    assert s.failures == 0
+    assert 3240 <= s.next_delay() <= 3960
+
+
+def test_raising_check_counts_as_failure():
+    def check():
+        raise RuntimeError("broken")
+
+    s = scheduler(check, FakeClock())
+    assert not s.run_once()
+    assert s.failures == 1
+
+
+def test_idle_check_does_not_back_off():
+    # What the app's check returns without a selected driver
+    idle = CurrentDriverInfo.failed(DriverInfoStatus.NOT_FOUND)
+    s = scheduler(lambda: not idle.retryable, FakeClock())
+    for _ in range(3):
+        s.run_once()
+    assert s.failures == 0
+    assert s.next_delay() >= 3240
+
+
+def test_wait_runs_out():
+    clock = FakeClock()
+    s = scheduler(lambda: True, clock, poll_interval=60)
+    s._wait(150)
+    assert clock.now == 1150
+    assert clock.waits == [60, 60, 30]
+
+
+def test_wake_ends_wait():
+    clock = FakeClock()
+    s = scheduler(lambda: True, clock, poll_interval=60)
+    clock.wake_at = 1120
+    s._wait(3600)
+    assert clock.now == 1120
+    assert not s._wake_event.is_set()
+
+
+def test_resume_from_sleep_ends_wait():
+    clock = FakeClock()
+    s = scheduler(lambda: True, clock, poll_interval=60, sleep_threshold=120)
+    clock.resume_after = 1180
+    clock.sleep = 8 * 3600
+    s._wait(3600)
+    assert clock.now == 1180
+
+
+def test_stop_ends_thread():
+    checks = threading.Event()
+
+    def check():
+        checks.set()
+        return True
+
+    s = UpdateScheduler(check, interval=3600, run_immediately=True)
+    s.start()
+    assert checks.wait(5)
+    s.stop(timeout=5)
+    assert s._thread is None
+
+
+def test_notification_throttle():
+    clock = FakeClock()
+    throttle = NotificationThrottle(min_interval=600, clock=clock)
+    assert throttle.should_notify("555.85")
+    assert not throttle.should_notify("555.85")
+    assert throttle.should_notify("560.70")
+    clock.now += 601
+    assert throttle.should_notify("560.70")
+
+
+@pytest.mark.parametrize(
+    "addresses, wakes",
+    [
+        (["10.0.0.2", "10.0.0.2"], 0),
+        ([None, "10.0.0.2"], 1),
+        (["10.0.0.2", None, "10.0.0.2"], 1),
+        (["10.0.0.2", "192.168.1.5"], 1),
+    ],
+)
+def test_network_monitor(addresses, wakes):
+    resolved = iter(addresses)
+    woken = []
+    monitor = NetworkMonitor(lambda: woken.append(True), resolve=lambda: next(resolved))
+    monitor.address = next(resolved)
+    for _ in addresses[1:]:
+        monitor.poll()
+    assert len(woken) == wakes
+
+
+def test_network_monitor_wakes_scheduler():
+    s = UpdateScheduler(lambda: True, interval=3600)
+    addresses = iter([None, "10.0.0.2"])
+    monitor = NetworkMonitor(s.wake, resolve=lambda: next(addresses, "10.0.0.2"))
+    monitor.address = next(addresses)
+    monitor.poll()
+    assert s._wake_event.is_set()